@@ -0,0 +1,76 @@
+"""
+CertifyMe Replica Affinity
+Consistent-hash ring mapping each repository to one ai-services replica, so
+resubmissions of a repo land on the node whose in-process caches are already warm.
+Adding or removing a replica only moves about 1/N of the repos.
+
+REPLICA_NODES lists every replica's base URL (identical on all nodes), REPLICA_SELF
+names this one. AFFINITY_MODE:
+  off      — serve everything locally
+  header   — serve locally, but return the owning replica in X-CertifyMe-Affinity
+             so a load balancer or the backend can route the next request there
+  redirect — answer 307 to the owning replica (method and body are preserved)
+"""
+
+import os
+import bisect
+import hashlib
+from sources import parse_github_url
+
+REPLICA_NODES = [node.strip().rstrip("/") for node in os.getenv("REPLICA_NODES", "").split(",") if node.strip()]
+REPLICA_SELF = os.getenv("REPLICA_SELF", "").rstrip("/")
+AFFINITY_MODE = os.getenv("AFFINITY_MODE", "off").lower()
+# Points per replica on the ring; more points = more even load
+AFFINITY_VNODES = int(os.getenv("AFFINITY_VNODES", "160"))
+
+AFFINITY_HEADER = "X-CertifyMe-Affinity"
+# Set by a proxy that already routed the request; the receiver then always serves it
+ROUTED_HEADER = "X-CertifyMe-Routed"
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, nodes: list, vnodes: int = AFFINITY_VNODES):
+        self.nodes = sorted(set(nodes))
+        ring = sorted((_point(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def node_for(self, key: str) -> str | None:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+
+def repo_key(github_url: str) -> str:
+    """Routing key for a submission: owner/repo, case-insensitive."""
+    owner, repo = parse_github_url(github_url)
+    return f"{owner}/{repo}".lower()
+
+
+_ring = HashRing(REPLICA_NODES)
+
+
+def route(github_url: str, headers) -> tuple[str | None, dict]:
+    """
+    Decide where a verification should run.
+    Returns (redirect_url or None, extra response headers).
+    """
+    if AFFINITY_MODE == "off" or not REPLICA_SELF or len(_ring.nodes) < 2:
+        return None, {}
+    try:
+        owner = _ring.node_for(repo_key(github_url))
+    except ValueError:
+        return None, {}
+    if owner is None:
+        return None, {}
+    response_headers = {AFFINITY_HEADER: owner}
+    if AFFINITY_MODE == "redirect" and owner != REPLICA_SELF and not headers.get(ROUTED_HEADER.lower()):
+        return f"{owner}/api/verify-code", response_headers
+    return None, response_headers
@@ -0,0 +1,207 @@
+"""
+CertifyMe Analysis Cache
+Memoizes per-file analysis results by git blob SHA within a repo and remembers the
+last verified tree of each repo, so a resubmission only re-scores the files that
+actually changed.
+
+Two tiers: an in-process LRU, backed by an optional shared cache_backend so
+replicas reuse each other's work. The shared tier is best-effort — an unreachable
+backend degrades to the local LRU, never to a failed verification. Backend calls
+block (up to the backend's socket timeout), so async code goes through offload().
+"""
+
+import asyncio
+import copy
+import json
+import threading
+from collections import OrderedDict
+from cache_backend import CACHE_TTL_SECONDS, get_cache_backend
+
+# Bump when the analysis prompt or per-file schema changes so stale scores are not reused
+PROMPT_VERSION = "2"
+# Bump when local_analysis metrics change
+STATIC_VERSION = "1"
+
+MAX_FILE_ENTRIES = 50_000
+MAX_SNAPSHOT_ENTRIES = 5_000
+# Prefetched file contents (webhook pushes), at most MAX_FILE_CHARS each
+MAX_CONTENT_ENTRIES = 20_000
+
+
+class _LRU:
+    """Small thread-safe LRU map."""
+
+    def __init__(self, max_entries: int):
+        self._data = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AnalysisCache:
+    """
+    Three maps:
+      - file analyses keyed by (owner/repo, blob_sha, skill, prompt version); scoped to
+        the repo so a clone or fork of a scored repo still gets its own review
+      - last verified snapshot keyed by (owner/repo, skill):
+        {"tree_sha", "blobs": {path: blob_sha}, "result": <verify_code result>}
+      - prefetched file contents keyed by blob_sha
+    All read through to, and write through to, the shared backend if one is set.
+    """
+
+    def __init__(self, max_files: int = MAX_FILE_ENTRIES, max_snapshots: int = MAX_SNAPSHOT_ENTRIES,
+                 backend=None, ttl: int = CACHE_TTL_SECONDS, max_contents: int = MAX_CONTENT_ENTRIES):
+        self._files = _LRU(max_files)
+        self._snapshots = _LRU(max_snapshots)
+        self._contents = _LRU(max_contents)
+        self.backend = backend
+        self.ttl = ttl
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def _shared_get(self, key: str) -> dict | None:
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            print(f"Warning: shared cache read failed ({self.backend.name}): {e}")
+            return None
+
+    def _shared_put(self, key: str, value: dict) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, json.dumps(value, separators=(",", ":")).encode(), self.ttl)
+        except Exception as e:
+            print(f"Warning: shared cache write failed ({self.backend.name}): {e}")
+
+    def _get(self, lru: _LRU, key: tuple) -> dict | None:
+        value = lru.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+        value = self._shared_get(":".join(("cv",) + key))
+        if value is not None:
+            self.stats["shared_hits"] += 1
+            lru.put(key, value)
+            return value
+        self.stats["misses"] += 1
+        return None
+
+    def _put(self, lru: _LRU, key: tuple, value: dict) -> None:
+        lru.put(key, value)
+        self._shared_put(":".join(("cv",) + key), value)
+
+    async def offload(self, fn, *args):
+        """
+        Await a cache call from the event loop. With a shared backend the call may
+        block on the network, so it runs in a worker thread instead of stalling every
+        in-flight verification; without one it is a dict lookup and runs inline.
+        """
+        if self.backend is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    def get_file(self, repo_key: str, blob_sha: str, skill: str) -> dict | None:
+        return self._get(self._files, ("file", PROMPT_VERSION, skill, repo_key.lower(), blob_sha))
+
+    def put_file(self, repo_key: str, blob_sha: str, skill: str, analysis: dict) -> None:
+        self._put(self._files, ("file", PROMPT_VERSION, skill, repo_key.lower(), blob_sha), dict(analysis))
+
+    def get_files(self, repo_key: str, blobs: dict, skill: str) -> dict:
+        """get_file for each {path: blob_sha}; returns {path: analysis} for the cached ones."""
+        found = {}
+        for path, blob_sha in blobs.items():
+            analysis = self.get_file(repo_key, blob_sha, skill)
+            if analysis is not None:
+                found[path] = analysis
+        return found
+
+    def put_files(self, repo_key: str, analyses: dict, skill: str) -> None:
+        """put_file for each {blob_sha: analysis}."""
+        for blob_sha, analysis in analyses.items():
+            self.put_file(repo_key, blob_sha, skill, analysis)
+
+    def get_static(self, blob_sha: str) -> dict | None:
+        """Static (local_analysis) metrics are skill-independent: keyed by blob only."""
+        return self._get(self._files, ("static", STATIC_VERSION, blob_sha))
+
+    def put_static(self, blob_sha: str, metrics: dict) -> None:
+        self._put(self._files, ("static", STATIC_VERSION, blob_sha), dict(metrics))
+
+    def get_statics(self, blobs: dict) -> dict:
+        """get_static for each {path: blob_sha}; returns {path: metrics} for the cached ones."""
+        found = {}
+        for path, blob_sha in blobs.items():
+            metrics = self.get_static(blob_sha)
+            if metrics is not None:
+                found[path] = metrics
+        return found
+
+    def put_statics(self, metrics: dict) -> None:
+        """put_static for each {blob_sha: metrics}."""
+        for blob_sha, entry in metrics.items():
+            self.put_static(blob_sha, entry)
+
+    def get_content(self, blob_sha: str) -> str | None:
+        """File content fetched ahead of time (blob SHAs are content addresses, so never stale)."""
+        entry = self._get(self._contents, ("content", blob_sha))
+        return entry["text"] if entry is not None else None
+
+    def put_content(self, blob_sha: str, text: str) -> None:
+        self._put(self._contents, ("content", blob_sha), {"text": text})
+
+    def get_contents(self, blobs: dict) -> dict:
+        """get_content for each {path: blob_sha}; returns {path: text} for the cached ones."""
+        found = {}
+        for path, blob_sha in blobs.items():
+            text = self.get_content(blob_sha)
+            if text is not None:
+                found[path] = text
+        return found
+
+    def put_contents(self, contents: dict) -> None:
+        """put_content for each {blob_sha: text}."""
+        for blob_sha, text in contents.items():
+            self.put_content(blob_sha, text)
+
+    def get_snapshot(self, repo_key: str, skill: str) -> dict | None:
+        snapshot = self._get(self._snapshots, ("snapshot", PROMPT_VERSION, skill, repo_key.lower()))
+        return copy.deepcopy(snapshot) if snapshot is not None else None
+
+    def put_snapshot(self, repo_key: str, skill: str, tree_sha: str, blobs: dict, result: dict) -> None:
+        self._put(
+            self._snapshots,
+            ("snapshot", PROMPT_VERSION, skill, repo_key.lower()),
+            {"tree_sha": tree_sha, "blobs": dict(blobs), "result": copy.deepcopy(result)},
+        )
+
+
+def diff_blobs(previous: dict, current: dict) -> dict:
+    """Compare two {path: blob_sha} maps; returns added / modified / removed / unchanged path lists."""
+    added = [p for p in current if p not in previous]
+    removed = [p for p in previous if p not in current]
+    modified = [p for p in current if p in previous and previous[p] != current[p]]
+    unchanged = [p for p in current if p in previous and previous[p] == current[p]]
+    return {"added": added, "modified": modified, "removed": removed, "unchanged": unchanged}
+
+
+# Process-wide cache used by verify_code (shared tier from CACHE_BACKEND)
+analysis_cache = AnalysisCache(backend=get_cache_backend())
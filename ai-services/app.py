@@ -3,13 +3,44 @@ CertifyMe AI Verification Service
 Flask server exposing code verification endpoints.
 """
 
+import warmup  # first: marks service start for cold-start metrics
 import os
+import hmac
+
+
+def _load_env() -> None:
+    """Load .env before any module reads configuration; python-dotenv is only imported if a file exists."""
+    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+    if os.path.exists(env_path) or os.path.exists(".env"):
+        from dotenv import load_dotenv
+        load_dotenv(env_path if os.path.exists(env_path) else ".env")
+
+
+# code_verifier reads OPENROUTER_* at import time, so the environment must be loaded first
+_load_env()
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from dotenv import load_dotenv
-from code_verifier import verify_code
+from code_verifier import verify_code_async
+from async_runtime import run_sync
+from skills_registry import get_registry
+from evidence import evidence_store
+from attestation import get_batcher
+from history_store import get_history
+import affinity
+from webhooks import handle_webhook
+from deadline import parse_deadline_ms
+from token_ledger import get_ledger, parse_tenant
 
-load_dotenv()
+# Attach an oracle attestation (batched Merkle-root signature) to each successful verdict
+ATTEST_VERDICTS = os.getenv("ATTEST_VERDICTS", "true").lower() == "true"
+# Verdicts accepted per /api/attest call
+MAX_ATTEST_VERDICTS = 1000
+# Shared key callers of /api/attest send as X-API-Key; the endpoint is disabled while unset
+ATTEST_API_KEY = os.getenv("ATTEST_API_KEY", "")
+
+# Clients may reuse /api/skills for this long before revalidating with If-None-Match
+SKILLS_MAX_AGE = int(os.getenv("SKILLS_CACHE_MAX_AGE", "60"))
 
 app = Flask(__name__)
 CORS(app)
@@ -21,61 +52,256 @@ def health():
     return jsonify({"status": "ok", "service": "certifyme-ai-verification"})
 
 
-@app.route("/api/verify-code", methods=["POST"])
-def verify_code_endpoint():
+@app.route("/ready", methods=["GET"])
+def ready():
     """
-    Verify a code submission against a claimed skill.
+    Readiness probe: 503 until warm-up (client construction, DNS/TLS pre-connect)
+    has finished, then 200 with warm-up timings and time-to-first-verification.
+    """
+    state = warmup.readiness()
+    return jsonify(state), 200 if state["ready"] else 503
 
-    Request body:
-    {
-        "github_url": "https://github.com/user/repo",
-        "claimed_skill": "React Development",
-        "submission_type": "code"
-    }
 
-    Returns verification result with AI score and detailed analysis.
+async def handle_verify(data: dict | None, headers) -> tuple[dict, int, dict]:
+    """
+    Shared /api/verify-code handler for the Flask (WSGI) and native ASGI servers.
+    Returns (response_body, http_status, extra_response_headers).
     """
-    data = request.get_json()
-
     if not data:
-        return jsonify({"error": "Request body is required"}), 400
+        return {"error": "Request body is required"}, 400, {}
 
     github_url = data.get("github_url")
     claimed_skill = data.get("claimed_skill", "General Programming")
 
     if not github_url:
-        return jsonify({"error": "github_url is required"}), 400
+        return {"error": "github_url is required"}, 400, {}
 
     # Validate URL format
     if "github.com" not in github_url:
-        return jsonify({"error": "Please provide a valid GitHub URL"}), 400
+        return {"error": "Please provide a valid GitHub URL"}, 400, {}
+
+    # Repo affinity: send the request to the replica whose caches hold this repo
+    redirect_url, response_headers = affinity.route(github_url, headers)
+    if redirect_url:
+        return {"redirect": redirect_url}, 307, {**response_headers, "Location": redirect_url}
 
     try:
-        result = verify_code(github_url, claimed_skill)
-        return jsonify(result)
+        result = await verify_code_async(
+            github_url,
+            claimed_skill,
+            data.get("cohort"),
+            deadline_ms=parse_deadline_ms(headers, data),
+            tenant=parse_tenant(headers, data),
+        )
+        # Provisional pre-scores (token budget exhausted) are not verdicts and are never attested
+        if "error" not in result.get("analysis", {}) and not result.get("provisional"):
+            warmup.record_verification_success()
+            if ATTEST_VERDICTS:
+                result["attestation"] = await get_batcher().submit({
+                    "github_url": github_url,
+                    "skill": claimed_skill,
+                    "wallet_address": data.get("wallet_address"),
+                    "ai_score": result["ai_score"],
+                    "recommendation": result["recommendation"],
+                    "evidence_hash": result.get("evidence_hash"),
+                })
+        return result, 200, response_headers
     except Exception as e:
-        return jsonify({
+        return {
             "error": str(e),
             "verified": False,
             "ai_score": 0,
             "recommendation": "REJECT",
-        }), 500
+        }, 500, response_headers
+
+
+@app.route("/api/verify-code", methods=["POST"])
+def verify_code_endpoint():
+    """
+    Verify a code submission against a claimed skill.
+
+    Request body:
+    {
+        "github_url": "https://github.com/user/repo",
+        "claimed_skill": "React Development",
+        "submission_type": "code",
+        "cohort": "campus-2026",           (optional, for /api/percentile)
+        "tenant": "campus-a",              (optional; or the X-CertifyMe-Tenant header, for token budgets;
+                                            needs the tenant's key in X-CertifyMe-Tenant-Key)
+        "deadline_ms": 20000               (optional; or the X-Request-Deadline-Ms header)
+    }
+
+    Returns verification result with AI score and detailed analysis.
+    """
+    body, status, headers = run_sync(handle_verify(request.get_json(silent=True), request.headers))
+    return jsonify(body), status, headers
 
 
 @app.route("/api/skills", methods=["GET"])
 def get_available_skills():
-    """Returns the list of skills available for verification"""
-    skills = [
-        {"name": "React Development", "category": "Frontend", "min_score": 45},
-        {"name": "Python Backend", "category": "Backend", "min_score": 45},
-        {"name": "Machine Learning", "category": "AI/ML", "min_score": 50},
-        {"name": "UI/UX Design", "category": "Design", "min_score": 45},
-        {"name": "Blockchain Development", "category": "Web3", "min_score": 50},
-        {"name": "Full Stack Development", "category": "Full Stack", "min_score": 45},
-        {"name": "Data Structures & Algorithms", "category": "CS Fundamentals", "min_score": 50},
-        {"name": "Mobile Development", "category": "Mobile", "min_score": 45},
-    ]
-    return jsonify(skills)
+    """
+    Returns the list of skills available for verification.
+    Served with an ETag; a matching If-None-Match gets 304 Not Modified.
+    """
+    registry = get_registry()
+    response = jsonify(registry.skills)
+    response.set_etag(registry.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = SKILLS_MAX_AGE
+    return response.make_conditional(request)
+
+
+@app.route("/api/evidence/<root>", methods=["GET"])
+def get_evidence(root):
+    """Evidence bundle manifest (every leaf entry) for an evidence_hash."""
+    manifest = evidence_store.manifest(root.lower())
+    if manifest is None:
+        return jsonify({"error": "Unknown evidence_hash"}), 404
+    return jsonify(manifest)
+
+
+@app.route("/api/evidence/<root>/proof", methods=["GET"])
+def get_evidence_proof(root):
+    """
+    Inclusion proof for one bundle entry: ?path=<file path> or ?index=<leaf index>.
+    Verify offline with evidence.verify_entry_proof (no need to download the bundle).
+    """
+    index = request.args.get("index", type=int)
+    proof = evidence_store.proof(root.lower(), path=request.args.get("path"), index=index)
+    if proof is None:
+        return jsonify({"error": "Unknown evidence_hash or entry"}), 404
+    return jsonify(proof)
+
+
+def stored_verdict(evidence_hash: str, wallet_address: str | None) -> dict | None:
+    """
+    The verdict this service produced for an evidence_hash, rebuilt from its persisted
+    evidence bundle; None if the hash is unknown or was only a provisional pre-score.
+    """
+    manifest = evidence_store.manifest(evidence_hash.lower())
+    if manifest is None:
+        return None
+    meta, verdict = manifest["entries"][0], manifest["entries"][-1]
+    if verdict.get("recommendation") == "PROVISIONAL":
+        return None
+    return {
+        "github_url": meta["github_url"],
+        "skill": meta["skill"],
+        "wallet_address": wallet_address,
+        "ai_score": verdict["ai_score"],
+        "recommendation": verdict["recommendation"],
+        "evidence_hash": manifest["root"],
+    }
+
+
+@app.route("/api/attest", methods=["POST"])
+def attest_verdicts():
+    """
+    Attest a cohort of verdicts before minting. Requires the X-API-Key header
+    (ATTEST_API_KEY). Only verdicts this service produced are attested: each is
+    looked up by its evidence_hash, and its scores come from the stored evidence,
+    never from the request.
+
+    Request body: {"verdicts": [{"evidence_hash": "...", "wallet_address": "..."}, ...]}
+    Returns {"attestations": [...]} in request order; each carries the signed batch
+    header and its Merkle inclusion proof (check with attestation.verify_attestation).
+    """
+    if not ATTEST_API_KEY:
+        return jsonify({"error": "Attestation is disabled; set ATTEST_API_KEY"}), 503
+    if not hmac.compare_digest(request.headers.get("X-API-Key", "").encode(), ATTEST_API_KEY.encode()):
+        return jsonify({"error": "Invalid or missing X-API-Key"}), 401
+
+    requested = (request.get_json(silent=True) or {}).get("verdicts")
+    if (not isinstance(requested, list) or not requested
+            or not all(isinstance(v, dict) and isinstance(v.get("evidence_hash"), str) for v in requested)):
+        return jsonify({"error": "verdicts must be a non-empty list of objects with an evidence_hash"}), 400
+    if len(requested) > MAX_ATTEST_VERDICTS:
+        return jsonify({"error": f"At most {MAX_ATTEST_VERDICTS} verdicts per request"}), 413
+
+    verdicts = [stored_verdict(v["evidence_hash"], v.get("wallet_address")) for v in requested]
+    unknown = [v["evidence_hash"] for v, verdict in zip(requested, verdicts) if verdict is None]
+    if unknown:
+        return jsonify({"error": "No verdict from this service for these evidence hashes", "unknown": unknown}), 404
+
+    async def submit_all():
+        return await get_batcher().submit_many(verdicts)
+
+    return jsonify({"attestations": run_sync(submit_all())})
+
+
+@app.route("/api/history", methods=["GET"])
+def get_verification_history():
+    """
+    Past verifications, newest first.
+
+    Query params: repo=owner/repo, skill=<name>, limit (max 500), before=<id> for the next page.
+    Each row has scores, model, tree SHA, stage timings and token usage.
+    """
+    rows = get_history().history(
+        repo=request.args.get("repo"),
+        skill=request.args.get("skill"),
+        limit=request.args.get("limit", 50, type=int),
+        before_id=request.args.get("before", type=int),
+    )
+    return jsonify({"verifications": rows, "next_before": rows[-1]["id"] if rows else None})
+
+
+@app.route("/api/percentile", methods=["GET"])
+def get_percentile():
+    """
+    Where a score stands among verified submissions for a skill.
+
+    Query params: skill (required), score, cohort, bucket (histogram width, default 10).
+    Answered from per-skill/cohort score histograms, independent of verdict count.
+    """
+    skill = request.args.get("skill")
+    if not skill:
+        return jsonify({"error": "skill is required"}), 400
+    rankings = get_history().rankings
+    report = rankings.report(
+        skill,
+        score=request.args.get("score", type=int),
+        cohort=request.args.get("cohort"),
+        bucket_width=request.args.get("bucket", 10, type=int),
+    )
+    report["cohorts"] = rankings.cohorts(skill)
+    return jsonify(report)
+
+
+@app.route("/api/token-usage", methods=["GET"])
+def get_token_usage():
+    """
+    LLM token spend over the rolling budget window, per scope (global, tenant, skill, model).
+
+    Query params: tenant, skill (narrow the tenant/skill scopes listed).
+    Each scope has prompt/completion totals, budget, utilization, burn rate (tokens/minute)
+    and projected seconds until the budget is exhausted; plus admission decision counts.
+    """
+    return jsonify(get_ledger().report(tenant=request.args.get("tenant"), skill=request.args.get("skill")))
+
+
+@app.route("/api/github-webhook", methods=["POST"])
+def github_webhook():
+    """
+    GitHub webhook receiver (content type application/json, secret GITHUB_WEBHOOK_SECRET).
+    Push events for registered repos prefetch the new tree into the caches in the
+    background; responds 202 when work was queued.
+    """
+    body = request.get_data()
+    body_json, status = handle_webhook(
+        request.headers.get("X-GitHub-Event", ""),
+        request.headers.get("X-GitHub-Delivery"),
+        body,
+        request.headers.get("X-Hub-Signature-256"),
+        request.get_json(silent=True),
+    )
+    return jsonify(body_json), status
+
+
+# Warm up in the background at import so gunicorn/flask workers get it too
+# (under asgi.py the server's own event loop is warmed in the lifespan startup instead)
+if os.getenv("WARMUP_ON_START", "true").lower() == "true" and os.getenv("CERTIFYME_SERVER") != "asgi":
+    warmup.start_warmup()
 
 
 if __name__ == "__main__":
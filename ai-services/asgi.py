@@ -0,0 +1,89 @@
+"""
+CertifyMe AI Verification Service — ASGI entry point
+Serves /api/verify-code natively on the event loop, so one process keeps hundreds
+of verifications in flight; every other route is delegated to the Flask app.
+
+Run: uvicorn asgi:application --host 0.0.0.0 --port 5001
+"""
+
+import os
+import json
+import asyncio
+
+# Tell app.py not to warm the sync wrapper's loop; the server loop is warmed on lifespan startup
+os.environ["CERTIFYME_SERVER"] = "asgi"
+
+import warmup
+from asgiref.wsgi import WsgiToAsgi
+from app import app, handle_verify
+
+MAX_BODY_BYTES = 1 << 20
+
+_flask = WsgiToAsgi(app)
+_background_tasks = set()
+
+
+async def _read_body(receive) -> bytes | None:
+    """Read the full request body; None if it exceeds MAX_BODY_BYTES."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send_json(send, status: int, body: dict, headers: dict | None = None) -> None:
+    payload = json.dumps(body).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+            (b"access-control-allow-origin", b"*"),
+        ] + [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in (headers or {}).items()],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _verify_code(scope, receive, send) -> None:
+    raw = await _read_body(receive)
+    if raw is None:
+        await _send_json(send, 413, {"error": "Request body too large"})
+        return
+    try:
+        data = json.loads(raw) if raw else None
+    except json.JSONDecodeError:
+        data = None
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+    body, status, response_headers = await handle_verify(data, headers)
+    await _send_json(send, status, body, response_headers)
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if os.getenv("WARMUP_ON_START", "true").lower() == "true":
+                task = asyncio.create_task(warmup.warm_up_async())
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif scope["type"] == "http" and scope["path"] == "/api/verify-code" and scope["method"] == "POST":
+        await _verify_code(scope, receive, send)
+    else:
+        await _flask(scope, receive, send)
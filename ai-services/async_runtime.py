@@ -0,0 +1,115 @@
+"""
+CertifyMe Async Runtime
+A shared background event loop for synchronous callers (Flask workers, CLI tools)
+and per-loop singletons for the pooled HTTP clients and concurrency semaphores,
+which are bound to the event loop that created them. LLM priority is process-wide:
+background work on one loop backs off while interactive calls on any loop saturate
+their slots (llm_busy).
+"""
+
+import os
+import asyncio
+import contextlib
+import contextvars
+import threading
+import weakref
+
+# Concurrent GitHub requests / LLM calls per event loop (i.e. per process for a given server)
+GITHUB_CONCURRENCY = int(os.getenv("GITHUB_CONCURRENCY", "32"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+
+_loop = None
+_loop_lock = threading.Lock()
+_per_loop = weakref.WeakKeyDictionary()
+# Interactive LLM calls holding or waiting for a slot, summed over every loop
+_interactive_llm_calls = 0
+_interactive_lock = threading.Lock()
+_low_priority = contextvars.ContextVar("low_priority", default=False)
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro, timeout: float | None = None):
+    """
+    Run a coroutine on the shared background loop and block for its result.
+    All sync callers share one loop, so pooled connections and semaphores are shared too.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("run_sync() called from a running event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
+
+
+def submit(coro):
+    """Schedule a coroutine on the shared background loop without waiting (returns a concurrent Future)."""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop())
+
+
+def loop_local(name: str, factory):
+    """Per-event-loop singleton: returns factory() created once for the running loop."""
+    loop = asyncio.get_running_loop()
+    values = _per_loop.get(loop)
+    if values is None:
+        values = _per_loop[loop] = {}
+    if name not in values:
+        values[name] = factory()
+    return values[name]
+
+
+def github_semaphore() -> asyncio.Semaphore:
+    """Bounds concurrent GitHub requests on the running loop."""
+    return loop_local("github_semaphore", lambda: asyncio.Semaphore(GITHUB_CONCURRENCY))
+
+
+def llm_semaphore() -> asyncio.Semaphore:
+    """Bounds concurrent LLM calls on the running loop."""
+    return loop_local("llm_semaphore", lambda: asyncio.Semaphore(LLM_CONCURRENCY))
+
+
+@contextlib.contextmanager
+def low_priority():
+    """Mark LLM calls made in this context as background work, left out of llm_busy()."""
+    token = _low_priority.set(True)
+    try:
+        yield
+    finally:
+        _low_priority.reset(token)
+
+
+@contextlib.asynccontextmanager
+async def llm_slot():
+    """
+    Hold an LLM slot on the running loop. Interactive calls are also counted
+    process-wide: the semaphore is per loop, so background work on the shared loop
+    could not otherwise see interactive traffic on the server's loop.
+    """
+    global _interactive_llm_calls
+    interactive = not _low_priority.get()
+    if interactive:
+        with _interactive_lock:
+            _interactive_llm_calls += 1
+    try:
+        async with llm_semaphore():
+            yield
+    finally:
+        if interactive:
+            with _interactive_lock:
+                _interactive_llm_calls -= 1
+
+
+def llm_busy() -> bool:
+    """True while interactive LLM calls, on any loop, hold or wait for LLM_CONCURRENCY slots or more."""
+    return _interactive_llm_calls >= LLM_CONCURRENCY
@@ -0,0 +1,235 @@
+"""
+CertifyMe Verdict Attestation
+Oracle signatures over verdicts, one signature per batch: verdicts are collected
+into size- or time-bounded batches, hashed as canonical-JSON leaves of a Merkle
+tree, and only the root is signed. Each verdict gets the signed batch header plus
+its inclusion proof, which verify_attestation checks without the rest of the batch.
+
+Signing uses the backend's oracle key (ORACLE_PRIVATE_KEY, hex; its first 32 bytes
+are the Ed25519 seed; needs the `cryptography` package) or, without a key, the demo
+HMAC secret. Verifiers must bring their own trust anchor: the oracle's Ed25519
+public key, or the HMAC secret (the public demo secret only in demo mode).
+"""
+
+import os
+import time
+import hmac
+import uuid
+import asyncio
+import hashlib
+import threading
+from async_runtime import loop_local, run_sync
+from evidence import canonical
+from merkle import MerkleTree, leaf_hash, verify_inclusion
+
+# Seal a batch when it reaches this many verdicts ...
+ATTEST_MAX_BATCH = int(os.getenv("ATTEST_MAX_BATCH", "256"))
+# ... or this long after its first verdict arrived
+ATTEST_MAX_WAIT_MS = int(os.getenv("ATTEST_MAX_WAIT_MS", "50"))
+
+# Same demo secret as backend/services/oracle.js
+DEMO_ORACLE_SECRET = b"certifyme-demo-oracle-secret"
+BATCH_DOMAIN = "CertifyMe-batch-v1"
+VERDICT_DOMAIN = "CertifyMe-verdict-v1"
+
+
+def verdict_leaf(verdict: dict) -> bytes:
+    """Leaf hash of a verdict's canonical encoding (domain-separated from other leaf kinds)."""
+    return leaf_hash(canonical({"domain": VERDICT_DOMAIN, **verdict}))
+
+
+def batch_message(header: dict) -> bytes:
+    """The bytes the oracle signs for a batch: its header without the signature."""
+    return canonical({k: v for k, v in header.items() if k != "signature"})
+
+
+class HmacSigner:
+    """HMAC-SHA256 with a shared secret (demo mode; verifiers need the secret)."""
+
+    algorithm = "hmac-sha256"
+
+    def __init__(self, secret: bytes = DEMO_ORACLE_SECRET, key_id: str = "demo-oracle-public-key"):
+        self._secret = secret
+        self.key_id = key_id
+
+    def sign(self, message: bytes) -> str:
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def verify(self, message: bytes, signature: str) -> bool:
+        return hmac.compare_digest(self.sign(message), signature)
+
+
+def oracle_demo_mode() -> bool:
+    """Demo mode: no oracle key configured, so batches are signed with the public demo secret."""
+    return not os.getenv("ORACLE_PRIVATE_KEY", "")
+
+
+class Ed25519Signer:
+    """
+    Ed25519 with the oracle key. key_id is derived like the backend's ORACLE_PUBLIC_KEY
+    (sha256 of the whole key, see backend/scripts/generate_oracle_keys.js);
+    public_key is the hex Ed25519 key that verifiers pin.
+    """
+
+    algorithm = "ed25519"
+
+    def __init__(self, private_key_hex: str):
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+        from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+        key = bytes.fromhex(private_key_hex)
+        self._key = Ed25519PrivateKey.from_private_bytes(key[:32])
+        self.key_id = hashlib.sha256(key).hexdigest()
+        self.public_key = self._key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw).hex()
+
+    def sign(self, message: bytes) -> str:
+        return self._key.sign(message).hex()
+
+    def verify(self, message: bytes, signature: str) -> bool:
+        return verify_ed25519(self.public_key, message, signature)
+
+
+def verify_ed25519(public_key_hex: str, message: bytes, signature: str) -> bool:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+    try:
+        Ed25519PublicKey.from_public_bytes(bytes.fromhex(public_key_hex)).verify(bytes.fromhex(signature), message)
+        return True
+    except (InvalidSignature, ValueError):
+        return False
+
+
+_signer = None
+_signer_lock = threading.Lock()
+
+
+def get_signer():
+    """Process-wide oracle signer from ORACLE_PRIVATE_KEY (demo HMAC when unset)."""
+    global _signer
+    if _signer is None:
+        with _signer_lock:
+            if _signer is None:
+                key = os.getenv("ORACLE_PRIVATE_KEY", "")
+                _signer = Ed25519Signer(key) if key else HmacSigner()
+    return _signer
+
+
+def seal_batch(verdicts: list, signer=None) -> list:
+    """Build the Merkle tree over verdicts, sign the root once, return one attestation per verdict."""
+    signer = signer or get_signer()
+    tree = MerkleTree([verdict_leaf(v) for v in verdicts])
+    header = {
+        "domain": BATCH_DOMAIN,
+        "batch_id": uuid.uuid4().hex,
+        "root": tree.root().hex(),
+        "size": tree.size,
+        "sealed_at": int(time.time()),
+        "algorithm": signer.algorithm,
+        "key_id": signer.key_id,
+    }
+    if getattr(signer, "public_key", None):
+        header["public_key"] = signer.public_key
+    header["signature"] = signer.sign(batch_message(header))
+    return [
+        {
+            "verdict": verdict,
+            "batch": header,
+            "index": index,
+            "proof": [h.hex() for h in tree.inclusion_proof(index)],
+        }
+        for index, verdict in enumerate(verdicts)
+    ]
+
+
+def verify_attestation(attestation: dict, trusted_key: str | bytes) -> bool:
+    """
+    Check a verdict's inclusion proof against its batch root, then the root's signature
+    against the caller's trust anchor, never a key taken from the attestation itself:
+    trusted_key is the oracle's hex Ed25519 public key for ed25519 batches, or the
+    shared secret (bytes) for HMAC batches. The demo secret is refused outside demo mode.
+    """
+    try:
+        header = attestation["batch"]
+        if header.get("domain") != BATCH_DOMAIN:
+            return False
+        included = verify_inclusion(
+            verdict_leaf(attestation["verdict"]),
+            int(attestation["index"]),
+            int(header["size"]),
+            [bytes.fromhex(h) for h in attestation["proof"]],
+            bytes.fromhex(header["root"]),
+        )
+        if not included:
+            return False
+        message = batch_message(header)
+        if header["algorithm"] == Ed25519Signer.algorithm and isinstance(trusted_key, str):
+            return verify_ed25519(trusted_key, message, header["signature"])
+        if header["algorithm"] == HmacSigner.algorithm and isinstance(trusted_key, bytes):
+            if hmac.compare_digest(trusted_key, DEMO_ORACLE_SECRET) and not oracle_demo_mode():
+                return False
+            return HmacSigner(trusted_key).verify(message, header["signature"])
+        return False
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+class VerdictBatcher:
+    """
+    Collects verdicts on one event loop and seals them in batches of at most
+    max_batch, or max_wait_ms after the first verdict of a batch, whichever comes first.
+    """
+
+    def __init__(self, signer=None, max_batch: int = ATTEST_MAX_BATCH, max_wait_ms: int = ATTEST_MAX_WAIT_MS):
+        self.signer = signer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []
+        self._timer = None
+        self.batches_sealed = 0
+
+    async def submit(self, verdict: dict) -> dict:
+        """Queue a verdict and wait for its attestation."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((verdict, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    async def submit_many(self, verdicts: list) -> list:
+        return list(await asyncio.gather(*(self.submit(v) for v in verdicts)))
+
+    def flush(self) -> None:
+        """Seal whatever is pending now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            attestations = seal_batch([verdict for verdict, _ in pending], self.signer)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches_sealed += 1
+        for (_, future), attestation in zip(pending, attestations):
+            if not future.done():
+                future.set_result(attestation)
+
+
+def get_batcher() -> VerdictBatcher:
+    """Batcher bound to the running event loop."""
+    return loop_local("verdict_batcher", VerdictBatcher)
+
+
+def attest(verdicts: list) -> list:
+    """Synchronous helper: attest verdicts on the shared background loop."""
+    async def submit_all():
+        return await get_batcher().submit_many(verdicts)
+    return run_sync(submit_all())
@@ -0,0 +1,313 @@
+"""
+CertifyMe Shared Cache Backends
+Byte-valued key/value stores that let several ai-services replicas share memoized
+analyses: a filesystem directory (shared volume), a SQLite file, or any server
+speaking the Redis protocol (RESP). A local stand-in RESP server is included for
+development and tests.
+
+Select with CACHE_BACKEND=memory|fs|sqlite|redis and CACHE_BACKEND_URL
+(<dir>, <file.sqlite3>, or redis://host:port/db). "memory" means no shared tier.
+"""
+
+import os
+import time
+import hashlib
+import threading
+
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(30 * 86400)))
+
+
+class CacheBackend:
+    """Interface: get returns bytes or None; set stores bytes with an optional TTL in seconds."""
+
+    name = "base"
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class FilesystemBackend(CacheBackend):
+    """
+    One file per key under <root>/<2 hex>/<sha256 of key>, written atomically
+    (temp file + rename) so readers on other replicas never see a partial value.
+    The first 8 bytes of each file hold the expiry time (0 = none).
+    """
+
+    name = "fs"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        expires = int.from_bytes(data[:8], "big")
+        if expires and expires < time.time():
+            return None
+        return data[8:]
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        expires = int(time.time() + ttl) if ttl else 0
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(expires.to_bytes(8, "big") + value)
+        os.replace(tmp, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteBackend(CacheBackend):
+    """Key/value table in a SQLite file (WAL), safe for several processes on one host."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        row = self._conn().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else None),
+            )
+
+    def delete(self, key: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class RespError(Exception):
+    pass
+
+
+def _encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("RESP connection closed")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise RespError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise RespError(f"Unexpected RESP reply: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal RESP client (GET / SET EX / DEL) with one persistent connection per thread;
+    works against Redis, Valkey, KeyDB or RespStandInServer.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", timeout: float = 2.0):
+        from urllib.parse import urlparse
+
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import socket
+
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self._call(b"AUTH", self.password)
+            if self.db:
+                self._call(b"SELECT", self.db)
+        return conn
+
+    def _call(self, *args):
+        sock, reader = self._connection()
+        try:
+            sock.sendall(_encode_command(*args))
+            return _read_reply(reader)
+        except (OSError, ConnectionError):
+            # Drop the broken connection; the next call reconnects
+            self._local.conn = None
+            sock.close()
+            raise
+
+    def get(self, key: str) -> bytes | None:
+        return self._call(b"GET", key)
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        if ttl:
+            self._call(b"SET", key, value, b"EX", int(ttl))
+        else:
+            self._call(b"SET", key, value)
+
+    def delete(self, key: str) -> None:
+        self._call(b"DEL", key)
+
+
+class RespStandInServer:
+    """
+    In-process RESP server implementing PING, GET, SET [EX], DEL, SELECT, AUTH and
+    FLUSHALL over one shared dict — a stand-in for Redis in development and tests.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        import socketserver
+
+        data = {}
+        lock = threading.Lock()
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        request = _read_reply(self.rfile)
+                    except (ConnectionError, RespError, ValueError):
+                        return
+                    self.wfile.write(self.server.execute(request))
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+            def execute(self, request) -> bytes:
+                command = request[0].upper()
+                with lock:
+                    if command == b"PING":
+                        return b"+PONG\r\n"
+                    if command in (b"SELECT", b"AUTH"):
+                        return b"+OK\r\n"
+                    if command == b"FLUSHALL":
+                        data.clear()
+                        return b"+OK\r\n"
+                    if command == b"GET":
+                        entry = data.get(request[1])
+                        if entry is None or (entry[1] and entry[1] < time.time()):
+                            return b"$-1\r\n"
+                        return b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+                    if command == b"SET":
+                        expires = 0
+                        if len(request) >= 5 and request[3].upper() == b"EX":
+                            expires = time.time() + int(request[4])
+                        data[request[1]] = (request[2], expires)
+                        return b"+OK\r\n"
+                    if command == b"DEL":
+                        removed = sum(data.pop(key, None) is not None for key in request[1:])
+                        return b":%d\r\n" % removed
+                return b"-ERR unknown command '%s'\r\n" % command
+
+        self._server = Server((host, port), Handler)
+        self.address = self._server.server_address
+        self.url = f"redis://{self.address[0]}:{self.address[1]}/0"
+        self._thread = None
+
+    def start(self) -> "RespStandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="resp-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_backend(kind: str, url: str = "") -> CacheBackend | None:
+    """Build a backend by name; "memory" returns None (process-local caches only)."""
+    kind = kind.lower()
+    if kind == "memory":
+        return None
+    if kind == "fs":
+        return FilesystemBackend(url or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache"))
+    if kind == "sqlite":
+        return SQLiteBackend(url or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache.sqlite3"))
+    if kind == "redis":
+        return RedisBackend(url or "redis://127.0.0.1:6379/0")
+    raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+
+
+def get_cache_backend() -> CacheBackend | None:
+    """Shared tier configured by CACHE_BACKEND / CACHE_BACKEND_URL."""
+    return make_backend(os.getenv("CACHE_BACKEND", "memory"), os.getenv("CACHE_BACKEND_URL", ""))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "serve":
+        print("Usage: python cache_backend.py serve [port]")
+        sys.exit(1)
+    server = RespStandInServer(port=int(sys.argv[2]) if len(sys.argv) > 2 else 6379)
+    print(f"RESP stand-in listening on {server.url}")
+    server.serve_forever()
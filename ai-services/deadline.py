@@ -0,0 +1,101 @@
+"""
+CertifyMe Request Deadlines
+Each verification carries an overall deadline (X-Request-Deadline-Ms header or
+deadline_ms body field, in milliseconds from receipt). Pipeline stages take their
+timeout from the time remaining instead of fixed per-call values, so the stages
+together can never outlast the caller. Stages that ran out of budget and continued
+with partial results are recorded as degraded.
+"""
+
+import os
+import time
+import contextlib
+import contextvars
+
+DEFAULT_DEADLINE_MS = int(os.getenv("VERIFY_DEADLINE_MS", "60000"))
+MAX_DEADLINE_MS = int(os.getenv("VERIFY_MAX_DEADLINE_MS", "300000"))
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+# Kept back from every stage for assembling and sending the response
+RESERVE_SECONDS = 0.25
+
+# Upper bound per stage (the former fixed timeouts; the LLM call previously had none)
+STAGE_CAPS = {
+    "fetch_tree": 15.0,
+    "validation": 5.0,
+    "fetch_contents": 10.0,
+    # Queueing for token budget (token_ledger.py); the LLM call still needs time after it
+    "admission": 30.0,
+    "llm": 120.0,
+    "static_analysis": 30.0,
+}
+# Fraction of the remaining time a stage may use, leaving room for the stages after it
+STAGE_SHARES = {
+    "fetch_tree": 0.25,
+    "validation": 0.15,
+    "fetch_contents": 0.35,
+    "admission": 0.25,
+    "llm": 1.0,
+    "static_analysis": 1.0,
+}
+
+
+class Deadline:
+    """Absolute expiry on the monotonic clock plus the list of degraded stages."""
+
+    def __init__(self, budget_ms: int):
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000
+        self.degraded = []
+
+    def remaining(self) -> float:
+        """Seconds left for work, after the response reserve."""
+        return max(0.0, self.expires_at - time.monotonic() - RESERVE_SECONDS)
+
+    def stage_budget(self, stage: str) -> float:
+        return min(STAGE_CAPS[stage], self.remaining() * STAGE_SHARES[stage])
+
+    def degrade(self, stage: str) -> None:
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+
+_current = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current() -> Deadline | None:
+    return _current.get()
+
+
+def stage_budget(stage: str) -> float:
+    """Timeout for a stage under the current deadline (its cap if there is none)."""
+    deadline = _current.get()
+    return deadline.stage_budget(stage) if deadline is not None else STAGE_CAPS[stage]
+
+
+def mark_degraded(stage: str) -> None:
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.degrade(stage)
+
+
+@contextlib.contextmanager
+def deadline_scope(budget_ms: int | None):
+    """Install a deadline for the enclosed work (and tasks it creates)."""
+    deadline = Deadline(budget_ms or DEFAULT_DEADLINE_MS)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def parse_deadline_ms(headers, body: dict | None) -> int:
+    """Deadline from the header or body (header wins), clamped to [1, MAX_DEADLINE_MS]."""
+    raw = headers.get(DEADLINE_HEADER) or headers.get(DEADLINE_HEADER.lower())
+    if raw is None and body:
+        raw = body.get("deadline_ms")
+    try:
+        value = int(float(raw))
+    except (TypeError, ValueError):
+        return DEFAULT_DEADLINE_MS
+    return max(1, min(MAX_DEADLINE_MS, value))
@@ -0,0 +1,196 @@
+"""
+CertifyMe Evidence Bundles
+Content-addressed record of a verification: what was analyzed (each file's git
+blob SHA), under which prompt/metric versions, and the verdict. Each entry is a
+canonical-JSON leaf of an RFC 6962 Merkle tree; the hex root is the certificate's
+evidence_hash, and any single entry can be proven with a log-size inclusion proof.
+
+Each file leaf records how the file fed the verdict:
+  reviewed  scored by the AI review of this verification
+  reused    scores carried over from an earlier review of the same blob in this repo
+  static    scored by the static pre-score only (provisional results)
+  skipped   listed in the tree but not analyzed (demo mode, or dropped at a deadline)
+
+A bundle is hashed and persisted in one streaming pass: each entry is written to the
+history database as it is added to the tree, and neither entries nor leaf hashes
+are held in memory. The root is only handed out once the bundle is committed, so
+proofs for a minted certificate survive restarts and can be served by any replica
+sharing that database. Proofs are computed from the stored leaf hashes, read in order.
+"""
+
+import json
+import asyncio
+from analysis_cache import PROMPT_VERSION, STATIC_VERSION
+from history_store import get_history
+from merkle import MerkleBuilder, MerkleTree, leaf_hash, streamed_inclusion_proof, verify_inclusion
+
+# Bump when the set or encoding of bundle entries changes
+EVIDENCE_VERSION = "2"
+
+VERDICT_FIELDS = ("code_quality", "complexity", "best_practices", "originality")
+
+
+def canonical(entry: dict) -> bytes:
+    """Deterministic encoding of an entry: sorted keys, no whitespace, UTF-8."""
+    return json.dumps(entry, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def bundle_entries(github_url: str, claimed_skill: str, tree: dict | None, result: dict,
+                   statuses: dict | None = None):
+    """
+    Yield the bundle's entries in leaf order: one meta entry, one entry per file of
+    the tree (sorted by path, with its status from statuses, default skipped), then
+    the verdict.
+    """
+    statuses = statuses or {}
+    tree = tree or {}
+    yield {
+        "kind": "meta",
+        "evidence_version": EVIDENCE_VERSION,
+        "prompt_version": PROMPT_VERSION,
+        "static_version": STATIC_VERSION,
+        "github_url": github_url,
+        "repo": f"{tree['owner']}/{tree['repo']}" if tree else None,
+        "ref": tree.get("ref"),
+        "tree_sha": tree.get("tree_sha"),
+        "skill": claimed_skill,
+    }
+    for path in sorted(tree.get("blobs", {})):
+        yield {"kind": "file", "path": path, "blob_sha": tree["blobs"][path],
+               "status": statuses.get(path, "skipped")}
+
+    analysis = result.get("analysis", {})
+    yield {
+        "kind": "verdict",
+        "ai_score": result.get("ai_score"),
+        "skill_level": result.get("skill_level"),
+        "verified": result.get("verified"),
+        "recommendation": result.get("recommendation"),
+        "scores": {k: analysis.get(k) for k in VERDICT_FIELDS},
+        "evidence_summary": result.get("evidence_summary"),
+    }
+
+
+def build_bundle(entries, writer=None) -> dict:
+    """
+    Hash entries into the Merkle tree as they stream in, handing each to writer (a
+    history_store.EvidenceWriter) instead of keeping it; the builder needs O(log n)
+    memory. Returns {"root", "leaf_count"}.
+    """
+    builder = MerkleBuilder()
+    for entry in entries:
+        data = canonical(entry)
+        leaf = builder.add(data)
+        if writer is not None:
+            writer.add(data.decode("utf-8"), leaf, entry.get("path") if entry.get("kind") == "file" else None)
+    root = builder.root().hex()
+    if writer is not None:
+        writer.seal(root)
+    return {"root": root, "leaf_count": builder.size}
+
+
+class EvidenceStore:
+    """
+    Bundles by root, so auditors can fetch a manifest or a single proof, read back
+    from the history store (so any replica sharing the database can serve them).
+    """
+
+    def __init__(self, history=None):
+        self._history = history
+
+    def history(self):
+        return self._history if self._history is not None else get_history()
+
+    def put(self, entries) -> dict:
+        """Hash and persist a bundle's entries in one pass (blocks on the write); returns build_bundle's result."""
+        with self.history().evidence_writer() as writer:
+            return build_bundle(entries, writer)
+
+    def manifest(self, root: str) -> dict | None:
+        entries = self.history().evidence(root)
+        if entries is None or build_bundle(entries)["root"] != root:
+            return None
+        return {
+            "root": root,
+            "evidence_version": EVIDENCE_VERSION,
+            "leaf_count": len(entries),
+            "entries": entries,
+        }
+
+    def proof(self, root: str, path: str | None = None, index: int | None = None) -> dict | None:
+        """
+        Inclusion proof for one entry: a file by path, or any entry by leaf index.
+        Returns None if the bundle or entry is unknown.
+        """
+        located = self.history().evidence_entry(root, index=index, path=path)
+        if located is None:
+            return self._whole_bundle_proof(root, path, index)
+        index, size, entry = located
+        proof = streamed_inclusion_proof(self.history().evidence_leaves(root), index, size)
+        return {"root": root, "index": index, "tree_size": size, "entry": entry, "proof": [h.hex() for h in proof]}
+
+    def _whole_bundle_proof(self, root: str, path: str | None, index: int | None) -> dict | None:
+        """Proof from a bundle stored whole (before entries were streamed), re-hashed in memory."""
+        entries = self.history().evidence(root)
+        if entries is None:
+            return None
+        tree = MerkleTree([leaf_hash(canonical(entry)) for entry in entries])
+        if tree.root().hex() != root:
+            return None
+        if path is not None:
+            index = next((i for i, e in enumerate(entries) if e["kind"] == "file" and e["path"] == path), None)
+        if index is None or not 0 <= index < tree.size:
+            return None
+        return {
+            "root": root,
+            "index": index,
+            "tree_size": tree.size,
+            "entry": entries[index],
+            "proof": [h.hex() for h in tree.inclusion_proof(index)],
+        }
+
+
+def verify_entry_proof(proof: dict) -> bool:
+    """Check a proof returned by EvidenceStore.proof against its root (no bundle needed)."""
+    try:
+        return verify_inclusion(
+            leaf_hash(canonical(proof["entry"])),
+            int(proof["index"]),
+            int(proof["tree_size"]),
+            [bytes.fromhex(h) for h in proof["proof"]],
+            bytes.fromhex(proof["root"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def attach_evidence(result: dict, github_url: str, claimed_skill: str, tree: dict | None,
+                    statuses: dict | None = None) -> dict:
+    """
+    Build and store the bundle for a finished verification, and set evidence_hash on
+    the result. statuses maps the paths that fed the verdict to their file status.
+    If the bundle cannot be stored the result gets no evidence_hash, rather than one
+    no proof can be served for.
+    """
+    try:
+        bundle = evidence_store.put(bundle_entries(github_url, claimed_skill, tree, result, statuses))
+    except Exception as e:
+        print(f"Warning: evidence bundle not stored: {e}")
+        return result
+    result["evidence_hash"] = bundle["root"]
+    result["evidence"] = {
+        "root": bundle["root"],
+        "leaf_count": bundle["leaf_count"],
+        "evidence_version": EVIDENCE_VERSION,
+        "hash": "sha256-rfc6962",
+    }
+    return result
+
+
+async def attach_evidence_async(*args, **kwargs) -> dict:
+    """attach_evidence from the event loop: the bundle write blocks on the database, so it runs in a thread."""
+    return await asyncio.to_thread(attach_evidence, *args, **kwargs)
+
+
+# Process-wide store used by the /api/evidence endpoints
+evidence_store = EvidenceStore()
@@ -0,0 +1,497 @@
+"""
+CertifyMe Verification History
+Embedded SQLite (WAL) record of every verification: repo, tree SHA, skill, model,
+scores, stage timings and token usage.
+
+Writes never touch the request path: record() enqueues a row and a background
+writer thread inserts queued rows in batched transactions. The same thread applies
+the retention policy (age and row cap) and compaction (collapsing repeat verdicts
+of an unchanged tree, then checkpointing the WAL and reclaiming free pages).
+Cohort percentile histograms (percentiles.py) are updated in the same transactions.
+
+Evidence bundles (evidence.py) are not queued: a bundle's root is committed on-chain
+as evidence_hash, so its entries are written directly, streamed in chunks within one
+transaction, before the root is handed out. Retention and compaction never delete them.
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+import contextlib
+from percentiles import CohortRankings
+
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "history.sqlite3"
+)
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+# Rows older than this are deleted (0 = keep forever)
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "365"))
+# Newest rows kept when the table grows past this (0 = unbounded)
+HISTORY_MAX_ROWS = int(os.getenv("HISTORY_MAX_ROWS", "5000000"))
+HISTORY_MAINTENANCE_SECONDS = int(os.getenv("HISTORY_MAINTENANCE_SECONDS", "3600"))
+
+# Rows per insert transaction, and how long the writer waits to fill a batch
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_WAIT = 0.2
+# Pending rows beyond this are dropped (and counted) rather than growing memory
+MAX_PENDING_WRITES = 50_000
+MAX_QUERY_LIMIT = 500
+# Evidence entries per insert while a bundle streams in
+EVIDENCE_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verifications (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    repo TEXT,
+    github_url TEXT NOT NULL,
+    tree_sha TEXT,
+    skill TEXT NOT NULL,
+    cohort TEXT,
+    tenant TEXT,
+    model TEXT,
+    ai_score INTEGER NOT NULL,
+    skill_level TEXT,
+    verified INTEGER NOT NULL,
+    recommendation TEXT,
+    code_quality INTEGER,
+    complexity INTEGER,
+    best_practices INTEGER,
+    originality INTEGER,
+    evidence_hash TEXT,
+    rescored_files INTEGER,
+    reused_files INTEGER,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL,
+    timings_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_verifications_repo_skill ON verifications (repo, skill, created_at);
+CREATE INDEX IF NOT EXISTS idx_verifications_skill ON verifications (skill, created_at);
+CREATE INDEX IF NOT EXISTS idx_verifications_tree ON verifications (tree_sha, skill);
+CREATE INDEX IF NOT EXISTS idx_verifications_created ON verifications (created_at);
+CREATE TABLE IF NOT EXISTS evidence_bundles (
+    root TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    entries_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evidence_logs (
+    id INTEGER PRIMARY KEY,
+    root TEXT UNIQUE,
+    created_at REAL NOT NULL,
+    leaf_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS evidence_entries (
+    log_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    path TEXT,
+    entry_json TEXT NOT NULL,
+    leaf BLOB NOT NULL,
+    PRIMARY KEY (log_id, idx)
+);
+"""
+
+COLUMNS = (
+    "created_at", "repo", "github_url", "tree_sha", "skill", "cohort", "tenant", "model", "ai_score", "skill_level",
+    "verified",
+    "recommendation", "code_quality", "complexity", "best_practices", "originality", "evidence_hash",
+    "rescored_files", "reused_files", "prompt_tokens", "completion_tokens", "total_tokens", "total_ms",
+    "timings_json", "error",
+)
+# Columns added after the first release, applied to existing databases on open
+MIGRATIONS = (
+    ("cohort", "ALTER TABLE verifications ADD COLUMN cohort TEXT"),
+    ("tenant", "ALTER TABLE verifications ADD COLUMN tenant TEXT"),
+)
+_SKILL, _COHORT, _SCORE, _TREE, _RECOMMENDATION, _ERROR = (
+    COLUMNS.index(c) for c in ("skill", "cohort", "ai_score", "tree_sha", "recommendation", "error")
+)
+INSERT_SQL = f"INSERT INTO verifications ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+EVIDENCE_ENTRY_SQL = "INSERT INTO evidence_entries (log_id, idx, path, entry_json, leaf) VALUES (?, ?, ?, ?, ?)"
+
+
+class EvidenceWriter:
+    """One bundle being persisted: add() its entries in leaf order, then seal() it with its root."""
+
+    def __init__(self, conn: sqlite3.Connection | None = None, log_id: int | None = None):
+        self._conn = conn
+        self._log_id = log_id
+        self._pending = []
+        self.size = 0
+        self.root = None
+
+    def add(self, entry_json: str, leaf: bytes, path: str | None = None) -> None:
+        self._pending.append((self._log_id, self.size, path, entry_json, leaf))
+        self.size += 1
+        if len(self._pending) >= EVIDENCE_CHUNK:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._conn is not None and self._pending:
+            self._conn.executemany(EVIDENCE_ENTRY_SQL, self._pending)
+        self._pending = []
+
+    def seal(self, root: str) -> None:
+        self.root = root
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # auto_vacuum only takes effect on a new database, so it must precede the WAL switch
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def history_row(github_url: str, claimed_skill: str, result: dict, trace: dict) -> tuple:
+    """Flatten a verify_code result and its trace (timings, usage, model, tree) into a row."""
+    analysis = result.get("analysis", {})
+    incremental = result.get("incremental", {})
+    usage = trace.get("usage", {})
+    timings = trace.get("timings_ms", {})
+    row = {
+        "created_at": time.time(),
+        "repo": trace.get("repo"),
+        "github_url": github_url,
+        "tree_sha": trace.get("tree_sha"),
+        "skill": claimed_skill,
+        "cohort": trace.get("cohort"),
+        "tenant": trace.get("tenant"),
+        "model": trace.get("model"),
+        "ai_score": int(result.get("ai_score", 0)),
+        "skill_level": result.get("skill_level"),
+        "verified": int(bool(result.get("verified"))),
+        "recommendation": result.get("recommendation"),
+        "code_quality": analysis.get("code_quality"),
+        "complexity": analysis.get("complexity"),
+        "best_practices": analysis.get("best_practices"),
+        "originality": analysis.get("originality"),
+        "evidence_hash": result.get("evidence_hash"),
+        "rescored_files": incremental.get("rescored_files"),
+        "reused_files": incremental.get("reused_files"),
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "total_tokens": usage.get("total_tokens", 0),
+        "total_ms": timings.get("total"),
+        "timings_json": json.dumps(timings, sort_keys=True),
+        "error": analysis.get("error"),
+    }
+    return tuple(row[c] for c in COLUMNS)
+
+
+class HistoryStore:
+    """SQLite-backed verification history with a batched background writer."""
+
+    def __init__(self, path: str = HISTORY_DB_PATH, retention_days: int = HISTORY_RETENTION_DAYS,
+                 max_rows: int = HISTORY_MAX_ROWS, maintenance_seconds: int = HISTORY_MAINTENANCE_SECONDS):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.maintenance_seconds = maintenance_seconds
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=MAX_PENDING_WRITES)
+        self._conn = _connect(path)
+        self._conn.executescript(SCHEMA)
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(verifications)")}
+        for column, statement in MIGRATIONS:
+            if column not in existing:
+                self._conn.execute(statement)
+        self.rankings = CohortRankings()
+        self.rankings.load(self._conn)
+        self._conn.commit()
+        # Serializes the shared query connection (also the writer's, for :memory:)
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    # ── Writes ──
+
+    def record(self, github_url: str, claimed_skill: str, result: dict, trace: dict) -> None:
+        """Queue a verification for insertion; never blocks the caller."""
+        try:
+            self._queue.put_nowait(history_row(github_url, claimed_skill, result, trace))
+        except queue.Full:
+            self.dropped += 1
+
+    @contextlib.contextmanager
+    def evidence_writer(self):
+        """
+        Persist an evidence bundle while it is hashed: yields an EvidenceWriter whose
+        entries are inserted EVIDENCE_CHUNK at a time in one transaction, committed
+        when the block ends sealed (rolled back if it raises). Blocks for the write, so
+        call it off the event loop. A bundle whose root is already stored is the same
+        bundle, and the new copy is discarded.
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                log_id = conn.execute("INSERT INTO evidence_logs (created_at) VALUES (?)", (time.time(),)).lastrowid
+                writer = EvidenceWriter(conn, log_id)
+                yield writer
+                if writer.root is None:
+                    raise ValueError("Evidence bundle was not sealed")
+                writer.flush()
+                if conn.execute("SELECT 1 FROM evidence_logs WHERE root = ?", (writer.root,)).fetchone():
+                    conn.execute("ROLLBACK")
+                    return
+                conn.execute("UPDATE evidence_logs SET root = ?, leaf_count = ? WHERE id = ?",
+                             (writer.root, writer.size, log_id))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def flush(self) -> None:
+        """Block until every queued row is committed (tests, shutdown)."""
+        self._queue.join()
+
+    def _write_loop(self) -> None:
+        # The writer owns its own connection; reads use self._conn
+        conn = _connect(self.path) if self.path != ":memory:" else self._conn
+        last_maintenance = time.monotonic()
+        while True:
+            try:
+                batch = [self._queue.get(timeout=1.0)]
+            except queue.Empty:
+                batch = []
+            deadline = time.monotonic() + WRITE_BATCH_WAIT
+            while batch and len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with self._lock, conn:
+                        conn.executemany(INSERT_SQL, batch)
+                        # Only completed analyses count towards cohort rankings (not provisional pre-scores)
+                        self.rankings.apply(conn, [
+                            (row[_SKILL], row[_COHORT], row[_SCORE], row[_TREE]) for row in batch
+                            if row[_ERROR] is None and row[_RECOMMENDATION] != "PROVISIONAL"
+                        ])
+                    with self._lock:
+                        self.rankings.refresh(conn)
+                except Exception as e:
+                    print(f"Warning: history write failed ({len(batch)} rows): {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            if self.maintenance_seconds and time.monotonic() - last_maintenance >= self.maintenance_seconds:
+                last_maintenance = time.monotonic()
+                try:
+                    self.maintain(conn)
+                except Exception as e:
+                    print(f"Warning: history maintenance failed: {e}")
+
+    # ── Retention and compaction ──
+
+    def apply_retention(self, conn: sqlite3.Connection | None = None) -> int:
+        """Delete rows past the retention age, then the oldest rows beyond max_rows. Returns rows deleted."""
+        conn = conn or self._conn
+        deleted = 0
+        with self._lock, conn:
+            if self.retention_days:
+                cutoff = time.time() - self.retention_days * 86400
+                deleted += conn.execute("DELETE FROM verifications WHERE created_at < ?", (cutoff,)).rowcount
+            if self.max_rows:
+                deleted += conn.execute(
+                    "DELETE FROM verifications WHERE id <= "
+                    "(SELECT id FROM verifications ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_rows,),
+                ).rowcount
+        return deleted
+
+    def compact(self, conn: sqlite3.Connection | None = None) -> int:
+        """
+        Collapse repeat verifications of the same tree, skill and model to the newest row
+        (a resubmission of an unchanged repo carries no new information), then
+        checkpoint the WAL and return freed pages to the filesystem. Returns rows deleted.
+        """
+        conn = conn or self._conn
+        with self._lock:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM verifications WHERE tree_sha IS NOT NULL AND id NOT IN ("
+                    "SELECT MAX(id) FROM verifications WHERE tree_sha IS NOT NULL "
+                    "GROUP BY repo, tree_sha, skill, model)"
+                ).rowcount
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    def maintain(self, conn: sqlite3.Connection | None = None) -> dict:
+        return {"expired": self.apply_retention(conn), "compacted": self.compact(conn)}
+
+    # ── Queries ──
+
+    def _query(self, sql: str, params: tuple) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        out = []
+        for row in rows:
+            item = dict(row)
+            item["verified"] = bool(item["verified"])
+            item["timings_ms"] = json.loads(item.pop("timings_json") or "{}")
+            out.append(item)
+        return out
+
+    def history(self, repo: str | None = None, skill: str | None = None,
+                limit: int = 50, before_id: int | None = None) -> list:
+        """
+        Newest-first verifications, filtered by repo ("owner/repo") and/or skill.
+        Paginate with before_id = the last id of the previous page.
+        """
+        clauses, params = [], []
+        if repo:
+            clauses.append("repo = ?")
+            params.append(repo.lower())
+        if skill:
+            clauses.append("skill = ?")
+            params.append(skill)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # created_at and id increase together, so the (…, created_at) indexes serve this order
+        sql = f"SELECT * FROM verifications {where} ORDER BY created_at DESC, id DESC LIMIT ?"
+        return self._query(sql, (*params, max(1, min(limit, MAX_QUERY_LIMIT))))
+
+    def latest_for_tree(self, tree_sha: str, skill: str) -> dict | None:
+        """Most recent verification of an exact tree for a skill (dedupe lookups)."""
+        rows = self._query(
+            "SELECT * FROM verifications WHERE tree_sha = ? AND skill = ? ORDER BY id DESC LIMIT 1",
+            (tree_sha, skill),
+        )
+        return rows[0] if rows else None
+
+    def skills_for_repo(self, repo: str) -> list:
+        """Distinct skills a repo ("owner/repo") has been verified for, most recent first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT skill FROM verifications WHERE repo = ? GROUP BY skill ORDER BY MAX(id) DESC",
+                (repo.lower(),),
+            ).fetchall()
+        return [row["skill"] for row in rows]
+
+    def _evidence_log(self, root: str):
+        return self._conn.execute("SELECT id, leaf_count FROM evidence_logs WHERE root = ?", (root,)).fetchone()
+
+    def evidence(self, root: str) -> list | None:
+        """Entries of a persisted evidence bundle, in leaf order."""
+        with self._lock:
+            log = self._evidence_log(root)
+            if log is not None:
+                rows = self._conn.execute(
+                    "SELECT entry_json FROM evidence_entries WHERE log_id = ? ORDER BY idx", (log["id"],)
+                ).fetchall()
+                return [json.loads(row["entry_json"]) for row in rows]
+            # Bundles stored whole, before entries were streamed
+            row = self._conn.execute("SELECT entries_json FROM evidence_bundles WHERE root = ?", (root,)).fetchone()
+        return json.loads(row["entries_json"]) if row else None
+
+    def evidence_entry(self, root: str, index: int | None = None, path: str | None = None) -> tuple | None:
+        """
+        (index, leaf_count, entry) of one entry of a streamed bundle, by leaf index or
+        file path; None if the bundle or entry is unknown.
+        """
+        with self._lock:
+            log = self._evidence_log(root)
+            if log is None:
+                return None
+            if path is not None:
+                row = self._conn.execute(
+                    "SELECT idx, entry_json FROM evidence_entries WHERE log_id = ? AND path = ?", (log["id"], path)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT idx, entry_json FROM evidence_entries WHERE log_id = ? AND idx = ?", (log["id"], index)
+                ).fetchone()
+        return (row["idx"], log["leaf_count"], json.loads(row["entry_json"])) if row else None
+
+    def evidence_leaves(self, root: str):
+        """Leaf hashes of a streamed bundle in order, EVIDENCE_CHUNK rows per read."""
+        last = -1
+        while True:
+            with self._lock:
+                log = self._evidence_log(root)
+                if log is None:
+                    return
+                rows = self._conn.execute(
+                    "SELECT idx, leaf FROM evidence_entries WHERE log_id = ? AND idx > ? ORDER BY idx LIMIT ?",
+                    (log["id"], last, EVIDENCE_CHUNK),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield bytes(row["leaf"])
+            last = rows[-1]["idx"]
+
+    def token_usage_since(self, since: float) -> list:
+        """(created_at, tenant, skill, model, prompt_tokens, completion_tokens) of LLM-scored rows since a time."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT created_at, tenant, skill, model, prompt_tokens, completion_tokens FROM verifications "
+                "WHERE created_at >= ? AND total_tokens > 0 ORDER BY created_at",
+                (since,),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+
+class _DisabledHistory:
+    """Stand-in when HISTORY_ENABLED=false."""
+
+    def record(self, *args, **kwargs) -> None:
+        pass
+
+    @contextlib.contextmanager
+    def evidence_writer(self):
+        # Bundles are still hashed (evidence_hash) but not kept
+        yield EvidenceWriter()
+
+    def __init__(self):
+        self.rankings = CohortRankings()
+
+    def history(self, *args, **kwargs) -> list:
+        return []
+
+    def latest_for_tree(self, *args, **kwargs) -> None:
+        return None
+
+    def skills_for_repo(self, *args, **kwargs) -> list:
+        return []
+
+    def evidence(self, *args, **kwargs) -> None:
+        return None
+
+    def evidence_entry(self, *args, **kwargs) -> None:
+        return None
+
+    def evidence_leaves(self, *args, **kwargs):
+        return iter(())
+
+    def token_usage_since(self, *args, **kwargs) -> list:
+        return []
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    """Process-wide history store (opened on first use)."""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = HistoryStore() if HISTORY_ENABLED else _DisabledHistory()
+    return _history
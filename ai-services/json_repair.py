@@ -0,0 +1,168 @@
+"""
+CertifyMe JSON Repair
+Tolerant parsing of LLM replies that are *almost* JSON: prose around the object,
+markdown fences anywhere, trailing commas and objects cut off by max_tokens.
+"""
+
+import json
+import re
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+
+# How many times a truncated object is cut back to an earlier comma before giving up
+MAX_TRUNCATION_BACKOFF = 8
+
+
+def _fenced_blocks(text: str) -> list[str]:
+    """Return the bodies of all ``` fenced blocks (an unterminated last fence runs to EOF)."""
+    return [m.group(1) for m in _FENCE_RE.finditer(text)]
+
+
+def _extract_object(text: str) -> str | None:
+    """
+    Return the first top-level {...} in text, string-aware.
+    If the object never closes (truncated reply), returns everything from '{' on.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Remove commas directly followed by a closing bracket, ignoring string contents."""
+    out = []
+    in_string = escape = False
+    pending_comma = None
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if pending_comma is not None:
+            if ch.isspace():
+                pending_comma.append(ch)
+                continue
+            if ch not in "}]":
+                out.append(",")
+            out.extend(pending_comma)
+            pending_comma = None
+        if ch == ",":
+            pending_comma = []
+            continue
+        if ch == '"':
+            in_string = True
+        out.append(ch)
+    if pending_comma is not None:
+        out.append(",")
+        out.extend(pending_comma)
+    return "".join(out)
+
+
+def _close_truncated(fragment: str) -> tuple[str, int | None]:
+    """
+    Close an unterminated JSON fragment.
+    Returns (closed_text, last_comma_index) — the comma index is where the caller
+    can cut back to if the dangling tail is still not parseable.
+    """
+    stack = []
+    in_string = escape = False
+    last_comma = None
+    for i, ch in enumerate(fragment):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            last_comma = i
+
+    text = fragment
+    if in_string:
+        if escape:
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack)), last_comma
+
+
+def _loads_object(candidate: str) -> dict | None:
+    """Parse candidate into a dict, repairing trailing commas and truncation."""
+    fragment = _extract_object(candidate)
+    if fragment is None:
+        return None
+
+    for _ in range(MAX_TRUNCATION_BACKOFF):
+        closed, last_comma = _close_truncated(fragment)
+        try:
+            parsed = json.loads(_strip_trailing_commas(closed))
+        except json.JSONDecodeError:
+            if last_comma is None:
+                return None
+            # Drop the dangling tail (e.g. a key with no value) and retry
+            fragment = fragment[:last_comma]
+            continue
+        return parsed if isinstance(parsed, dict) else None
+    return None
+
+
+def parse_json_lenient(text: str) -> dict:
+    """
+    Parse a JSON object out of an LLM reply.
+    Tries strict parsing first, then every fenced block, then the raw text with repairs.
+    Raises json.JSONDecodeError when nothing usable can be recovered.
+    """
+    text = (text or "").strip()
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+
+    for candidate in [*_fenced_blocks(text), text]:
+        parsed = _loads_object(candidate)
+        if parsed is not None:
+            return parsed
+
+    raise json.JSONDecodeError("No JSON object could be recovered", text, 0)
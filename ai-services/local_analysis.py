@@ -0,0 +1,212 @@
+"""
+CertifyMe Local Analysis
+CPU-bound static analysis of fetched files (AST metrics for Python, token counts,
+SimHash fingerprints for near-duplicate detection), run in a managed process pool
+so it never contends for the GIL with request-serving threads.
+
+File contents are packed once into a shared-memory block; workers receive only
+(path, offset, length) tuples in chunks, so large repos are not pickled per task.
+"""
+
+import os
+import re
+import ast
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+# Workers are replaced after this many chunks to cap memory growth from parsed ASTs
+MAX_TASKS_PER_CHILD = int(os.getenv("LOCAL_ANALYSIS_MAX_TASKS_PER_CHILD", "200"))
+LOCAL_ANALYSIS_WORKERS = int(os.getenv("LOCAL_ANALYSIS_WORKERS") or max(1, (os.cpu_count() or 2) - 1))
+# Files per submitted task
+CHUNK_FILES = int(os.getenv("LOCAL_ANALYSIS_CHUNK_FILES", "32"))
+# Below this many bytes the IPC round trip costs more than the analysis; run inline
+INLINE_MAX_BYTES = int(os.getenv("LOCAL_ANALYSIS_INLINE_MAX_BYTES", "16384"))
+# SimHash Hamming distance at or below which two files count as near-duplicates
+NEAR_DUPLICATE_BITS = 6
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+|[^\sA-Za-z0-9_]")
+_BRANCH_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try, ast.With, ast.AsyncWith,
+                 ast.BoolOp, ast.IfExp, ast.comprehension, ast.ExceptHandler)
+
+
+def simhash(tokens: list, bits: int = 64) -> int:
+    """64-bit SimHash over token 3-shingles."""
+    if len(tokens) < 3:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2)]
+    weights = [0] * bits
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+
+def _python_metrics(content: str) -> dict:
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return {"parsed": False}
+    functions = [n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    return {
+        "parsed": True,
+        "functions": len(functions),
+        "classes": sum(isinstance(n, ast.ClassDef) for n in ast.walk(tree)),
+        "documented_functions": sum(ast.get_docstring(f) is not None for f in functions),
+        # McCabe-style: 1 + decision points, per function on average
+        "avg_complexity": round(
+            sum(1 + sum(isinstance(n, _BRANCH_NODES) for n in ast.walk(f)) for f in functions) / len(functions), 2
+        ) if functions else 0,
+    }
+
+
+def analyze_source(path: str, content: str) -> dict:
+    """Static metrics for one file. Pure function of its inputs (safe to run in any process)."""
+    lines = content.splitlines()
+    tokens = _TOKEN_RE.findall(content)
+    metrics = {
+        "lines": len(lines),
+        "code_lines": sum(1 for line in lines if line.strip() and not line.strip().startswith(("#", "//"))),
+        "tokens": len(tokens),
+        "simhash": f"{simhash(tokens):016x}",
+    }
+    if path.endswith(".py"):
+        metrics.update(_python_metrics(content))
+    return metrics
+
+
+def _analyze_chunk(shm_name: str, chunk: list) -> list:
+    """Worker entry point: decode each (path, offset, length) slice of the shared block and analyze it."""
+    # Spawned workers share the parent's resource tracker, which unlinks the block once
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        buf = shm.buf
+        return [
+            (path, analyze_source(path, bytes(buf[offset:offset + length]).decode("utf-8", errors="replace")))
+            for path, offset, length in chunk
+        ]
+    finally:
+        buf = None
+        shm.close()
+
+
+def near_duplicates(results: dict, max_bits: int = NEAR_DUPLICATE_BITS) -> list:
+    """Pairs of files whose SimHash fingerprints are within max_bits of each other."""
+    items = [(path, int(r["simhash"], 16)) for path, r in results.items() if r.get("tokens", 0) >= 20]
+    pairs = []
+    for i, (path_a, hash_a) in enumerate(items):
+        for path_b, hash_b in items[i + 1:]:
+            if bin(hash_a ^ hash_b).count("1") <= max_bits:
+                pairs.append([path_a, path_b])
+    return pairs
+
+
+def summarize(results: dict) -> dict:
+    """Repo-level summary of per-file static metrics."""
+    python = [r for r in results.values() if "parsed" in r]
+    functions = sum(r.get("functions", 0) for r in python)
+    return {
+        "files": len(results),
+        "lines": sum(r["lines"] for r in results.values()),
+        "code_lines": sum(r["code_lines"] for r in results.values()),
+        "python_files": len(python),
+        "python_parse_errors": sum(not r["parsed"] for r in python),
+        "functions": functions,
+        "documented_functions": sum(r.get("documented_functions", 0) for r in python),
+        "avg_complexity": round(
+            sum(r.get("avg_complexity", 0) * r.get("functions", 0) for r in python) / functions, 2
+        ) if functions else 0,
+        "near_duplicates": near_duplicates(results),
+    }
+
+
+class AnalysisPool:
+    """
+    Managed process pool for analyze_source.
+    Chunks are submitted CHUNK_FILES at a time; contents travel through one
+    shared-memory block. Workers are recycled by retiring the whole executor after
+    max_tasks_per_child chunks per worker (ProcessPoolExecutor's own
+    max_tasks_per_child can deadlock on Python 3.11).
+    """
+
+    def __init__(self, workers: int = LOCAL_ANALYSIS_WORKERS, max_tasks_per_child: int = MAX_TASKS_PER_CHILD,
+                 chunk_files: int = CHUNK_FILES, inline_max_bytes: int = INLINE_MAX_BYTES):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.chunk_files = chunk_files
+        self.inline_max_bytes = inline_max_bytes
+        self._executor = None
+        self._submitted = 0
+        self._lock = threading.Lock()
+
+    def _executor_for_submit(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._submitted >= self.max_tasks_per_child * self.workers:
+                if self._executor is not None:
+                    # In-flight chunks still complete; the old workers exit afterwards
+                    self._executor.shutdown(wait=False)
+                # spawn: forking a process that runs event-loop threads is unsafe
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+                self._submitted = 0
+            self._submitted += 1
+            return self._executor
+
+    def analyze_inline(self, files: dict) -> dict:
+        return {path: analyze_source(path, content) for path, content in files.items()}
+
+    def analyze(self, files: dict, force_pool: bool = False) -> dict:
+        """Analyze {path: content}; blocks the calling thread (but not the GIL) until done."""
+        if not files:
+            return {}
+        encoded = {path: content.encode("utf-8") for path, content in files.items()}
+        total = sum(len(data) for data in encoded.values())
+        if total <= self.inline_max_bytes and not force_pool:
+            return self.analyze_inline(files)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, total))
+        try:
+            offset = 0
+            entries = []
+            for path, data in encoded.items():
+                shm.buf[offset:offset + len(data)] = data
+                entries.append((path, offset, len(data)))
+                offset += len(data)
+            del encoded
+
+            chunks = [entries[i:i + self.chunk_files] for i in range(0, len(entries), self.chunk_files)]
+            futures = [self._executor_for_submit().submit(_analyze_chunk, shm.name, chunk) for chunk in chunks]
+            results = {}
+            for future in futures:
+                results.update(future.result())
+            return results
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def analyze_async(self, files: dict) -> dict:
+        """analyze() without blocking the event loop."""
+        return await asyncio.to_thread(self.analyze, files)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> AnalysisPool:
+    """Process-wide pool; worker processes start on first offloaded batch."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AnalysisPool()
+    return _pool
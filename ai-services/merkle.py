@@ -0,0 +1,162 @@
+"""
+CertifyMe Merkle Trees
+RFC 6962 (Certificate Transparency) Merkle hashing over SHA-256: domain-separated
+leaf (0x00) and node (0x01) hashes, a streaming root builder that keeps only
+O(log n) subtree roots, and log-size inclusion proofs (from a tree in memory or
+from leaves streamed past once) with a verifier.
+"""
+
+import hashlib
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+class MerkleBuilder:
+    """
+    Streaming root computation: add leaves one at a time; memory is one hash per
+    set bit of the leaf count. Produces the same root as MerkleTree over the same leaves.
+    """
+
+    def __init__(self):
+        # (subtree_size, root) pairs, sizes strictly decreasing powers of two
+        self._frontier = []
+        self.size = 0
+
+    def add(self, data: bytes) -> bytes:
+        """Append a leaf (raw data, hashed here); returns its leaf hash."""
+        return self.add_hash(leaf_hash(data))
+
+    def add_hash(self, leaf: bytes) -> bytes:
+        """Append an already-hashed leaf."""
+        size, node = 1, leaf
+        while self._frontier and self._frontier[-1][0] == size:
+            _, left = self._frontier.pop()
+            size, node = size * 2, node_hash(left, node)
+        self._frontier.append((size, node))
+        self.size += 1
+        return leaf
+
+    def root(self) -> bytes:
+        if not self._frontier:
+            return EMPTY_ROOT
+        # Fold right to left: RFC 6962 splits at the largest power of two below n
+        node = self._frontier[-1][1]
+        for _, left in reversed(self._frontier[:-1]):
+            node = node_hash(left, node)
+        return node
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly less than n (n >= 2)."""
+    k = 1
+    while k * 2 < n:
+        k *= 2
+    return k
+
+
+class MerkleTree:
+    """Tree over a list of leaf hashes, for producing inclusion proofs."""
+
+    def __init__(self, leaves: list):
+        self.leaves = list(leaves)
+        # Interior nodes by (start, end); the tree shape is fixed, so there are < 2n of them
+        self._nodes = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.leaves)
+
+    def root(self) -> bytes:
+        return self._subtree_root(0, len(self.leaves))
+
+    def _subtree_root(self, start: int, end: int) -> bytes:
+        n = end - start
+        if n == 0:
+            return EMPTY_ROOT
+        if n == 1:
+            return self.leaves[start]
+        node = self._nodes.get((start, end))
+        if node is None:
+            k = _split(n)
+            node = node_hash(self._subtree_root(start, start + k), self._subtree_root(start + k, end))
+            self._nodes[(start, end)] = node
+        return node
+
+    def inclusion_proof(self, index: int) -> list:
+        """Audit path for leaf index (RFC 6962 PATH), leaf-to-root order."""
+        if not 0 <= index < len(self.leaves):
+            raise IndexError(f"Leaf index {index} out of range for tree of size {len(self.leaves)}")
+        return [self._subtree_root(start, end) for start, end in reversed(_audit_ranges(index, len(self.leaves)))]
+
+
+def _audit_ranges(index: int, size: int) -> list:
+    """Leaf ranges [start, end) whose subtree roots form the audit path of index, root-to-leaf order."""
+    ranges = []
+    start, end = 0, size
+    while end - start > 1:
+        k = _split(end - start)
+        if index < start + k:
+            ranges.append((start + k, end))
+            end = start + k
+        else:
+            ranges.append((start, start + k))
+            start = start + k
+    return ranges
+
+
+def streamed_inclusion_proof(leaves, index: int, size: int) -> list:
+    """
+    MerkleTree(leaves).inclusion_proof(index) from leaf hashes read once in order,
+    without holding them: each sibling subtree is a contiguous range of leaves,
+    folded by its own MerkleBuilder as they go by (O(log² n) memory).
+    """
+    if not 0 <= index < size:
+        raise IndexError(f"Leaf index {index} out of range for tree of size {size}")
+    ranges = _audit_ranges(index, size)
+    builders = [MerkleBuilder() for _ in ranges]
+    seen = 0
+    for position, leaf in enumerate(leaves):
+        if position >= size:
+            break
+        seen += 1
+        for (start, end), builder in zip(ranges, builders):
+            if start <= position < end:
+                builder.add_hash(leaf)
+                break
+    if seen < size:
+        raise ValueError(f"Expected {size} leaves, got {seen}")
+    return [builder.root() for builder in reversed(builders)]
+
+
+def verify_inclusion(leaf: bytes, index: int, tree_size: int, proof: list, root: bytes) -> bool:
+    """Check an inclusion proof for a leaf hash (RFC 9162 section 2.1.3.2)."""
+    if not 0 <= index < tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    node = leaf
+    for sibling in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            node = node_hash(sibling, node)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            node = node_hash(node, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and node == root
@@ -0,0 +1,159 @@
+"""
+CertifyMe Cohort Percentiles
+Where a score stands within a skill, optionally within one cohort (campus, batch).
+
+ai_score is an integer in 0..100, so each (skill, cohort) keeps an exact 101-bucket
+count histogram instead of an approximate sketch: updates and queries cost O(101)
+regardless of how many verdicts have been seen, results are exact, and the state
+is a few hundred bytes. Histograms are persisted in the history database as
+per-score counts incremented in place, so workers sharing the database add to each
+other's counts. A tree is ranked once per skill; resubmitting it does not count again.
+"""
+
+import json
+import threading
+
+MAX_SCORE = 100
+# Cohort key for "everyone who verified this skill"
+ALL_COHORTS = ""
+
+HISTOGRAM_SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_buckets (
+    skill TEXT NOT NULL,
+    cohort TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (skill, cohort, score)
+);
+CREATE TABLE IF NOT EXISTS ranked_trees (
+    skill TEXT NOT NULL,
+    tree_sha TEXT NOT NULL,
+    PRIMARY KEY (skill, tree_sha)
+);
+"""
+BUCKET_INCREMENT_SQL = (
+    "INSERT INTO score_buckets (skill, cohort, score, count) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (skill, cohort, score) DO UPDATE SET count = count + excluded.count"
+)
+
+
+class ScoreHistogram:
+    """Exact distribution of integer scores 0..MAX_SCORE."""
+
+    def __init__(self, counts: list | None = None):
+        self.counts = list(counts) if counts else [0] * (MAX_SCORE + 1)
+        self.total = sum(self.counts)
+
+    def add(self, score: int, count: int = 1) -> None:
+        score = max(0, min(MAX_SCORE, int(score)))
+        self.counts[score] += count
+        self.total += count
+
+    def percentile_rank(self, score: int) -> float | None:
+        """Percent of the distribution below score, counting ties as half (None if empty)."""
+        if not self.total:
+            return None
+        score = max(0, min(MAX_SCORE, int(score)))
+        below = sum(self.counts[:score])
+        return round(100 * (below + 0.5 * self.counts[score]) / self.total, 2)
+
+    def quantile(self, q: float) -> int | None:
+        """Smallest score s with at least a q fraction of the distribution at or below s."""
+        if not self.total:
+            return None
+        target = q * self.total
+        running = 0
+        for score, count in enumerate(self.counts):
+            running += count
+            if running >= target and running:
+                return score
+        return MAX_SCORE
+
+    def buckets(self, width: int = 10) -> list:
+        """Counts grouped into [min, max] score ranges of the given width."""
+        width = max(1, min(MAX_SCORE + 1, int(width)))
+        return [
+            {"min": start, "max": min(start + width - 1, MAX_SCORE), "count": sum(self.counts[start:start + width])}
+            for start in range(0, MAX_SCORE + 1, width)
+        ]
+
+
+def _skill_key(skill: str) -> str:
+    return skill.strip().lower()
+
+
+class CohortRankings:
+    """In-memory (skill, cohort) histograms, read from the score_buckets table."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def load(self, conn) -> None:
+        conn.executescript(HISTOGRAM_SCHEMA)
+        self._migrate(conn)
+        self.refresh(conn)
+
+    def _migrate(self, conn) -> None:
+        """Move histograms from the old score_histograms table (whole-histogram JSON rows)."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            old = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'score_histograms'")
+            if old.fetchone():
+                for skill, cohort, counts_json, _ in conn.execute("SELECT * FROM score_histograms").fetchall():
+                    conn.executemany(BUCKET_INCREMENT_SQL, [
+                        (skill, cohort, score, count) for score, count in enumerate(json.loads(counts_json)) if count
+                    ])
+                conn.execute("DROP TABLE score_histograms")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def refresh(self, conn) -> None:
+        """Reload every histogram from the database, picking up other workers' counts."""
+        histograms = {}
+        for skill, cohort, score, count in conn.execute("SELECT skill, cohort, score, count FROM score_buckets"):
+            histograms.setdefault((skill, cohort), ScoreHistogram()).add(score, count)
+        with self._lock:
+            self._histograms = histograms
+
+    def apply(self, conn, verdicts: list) -> None:
+        """
+        Count (skill, cohort, score, tree_sha) verdicts into the overall and per-cohort
+        histograms, incrementing the stored counts in SQL; a tree already ranked for
+        the skill is skipped. Called inside the history writer's insert transaction, so
+        histograms and history rows commit together; refresh() after the commit.
+        """
+        for skill, cohort, score, tree_sha in verdicts:
+            skill = _skill_key(skill)
+            if tree_sha and not conn.execute(
+                "INSERT OR IGNORE INTO ranked_trees (skill, tree_sha) VALUES (?, ?)", (skill, tree_sha)
+            ).rowcount:
+                continue
+            score = max(0, min(MAX_SCORE, int(score)))
+            conn.executemany(BUCKET_INCREMENT_SQL, [(skill, c, score, 1) for c in {ALL_COHORTS, cohort or ALL_COHORTS}])
+
+    def histogram(self, skill: str, cohort: str | None = None) -> ScoreHistogram:
+        with self._lock:
+            found = self._histograms.get((_skill_key(skill), cohort or ALL_COHORTS))
+            return ScoreHistogram(found.counts) if found else ScoreHistogram()
+
+    def cohorts(self, skill: str) -> list:
+        with self._lock:
+            return sorted(c for s, c in self._histograms if s == _skill_key(skill) and c != ALL_COHORTS)
+
+    def report(self, skill: str, score: int | None = None, cohort: str | None = None, bucket_width: int = 10) -> dict:
+        """Percentile rank of score (if given), quartiles/deciles and a bucketed histogram."""
+        hist = self.histogram(skill, cohort)
+        report = {
+            "skill": skill,
+            "cohort": cohort or None,
+            "count": hist.total,
+            "quantiles": {f"p{p}": hist.quantile(p / 100) for p in (10, 25, 50, 75, 90)},
+            "histogram": hist.buckets(bucket_width),
+        }
+        if score is not None:
+            report["score"] = score
+            report["percentile_rank"] = hist.percentile_rank(score)
+        return report
@@ -0,0 +1,135 @@
+"""
+Benchmark: cache hit rate across replicas, with and without repo affinity and a shared cache.
+
+Starts N replica processes, each with its own AnalysisCache, and replays a synthetic
+stream of submissions (popular repos resubmitted often, a few files changing each
+time). Every file-score cache miss stands in for an LLM scoring call. Compares:
+
+  random routing, local caches only
+  affinity routing (consistent-hash ring), local caches only
+  random routing + shared backend
+  affinity routing + shared backend
+
+Usage: python scripts/bench_affinity.py [--replicas 4] [--submissions 4000] [--backend sqlite|fs|redis]
+"""
+
+import os
+import sys
+import random
+import argparse
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from affinity import HashRing  # noqa: E402
+from cache_backend import RespStandInServer, make_backend  # noqa: E402
+
+SKILL = "Python Backend"
+
+
+def make_workload(submissions: int, repos: int, files: int, seed: int = 7) -> list:
+    """[(repo, [blob_sha, ...])] with Zipf-ish repo popularity and ~1 changed file per resubmission."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(repos)]
+    trees = {f"student{r}/project": [f"r{r}f{f}v0" for f in range(files)] for r in range(repos)}
+    names = list(trees)
+    workload = []
+    for _ in range(submissions):
+        repo = rng.choices(names, weights)[0]
+        blobs = trees[repo]
+        if rng.random() < 0.5:
+            changed = rng.randrange(files)
+            version = int(blobs[changed].rsplit("v", 1)[1]) + 1
+            blobs[changed] = f"{blobs[changed].rsplit('v', 1)[0]}v{version}"
+        workload.append((repo, list(blobs)))
+    return workload
+
+
+def replica(inbox, results, backend_kind: str, backend_url: str) -> None:
+    from analysis_cache import AnalysisCache
+
+    cache = AnalysisCache(backend=make_backend(backend_kind, backend_url))
+    scored = 0
+    while True:
+        task = inbox.get()
+        if task is None:
+            break
+        repo, blobs = task
+        for blob in blobs:
+            if cache.get_file(repo, blob, SKILL) is None:
+                scored += 1  # an LLM call in the real pipeline
+                cache.put_file(repo, blob, SKILL, {"code_quality": 70})
+    results.put((scored, cache.stats))
+
+
+def run(workload: list, replicas: int, affinity: bool, backend_kind: str, backend_url: str) -> dict:
+    ctx = mp.get_context("spawn")
+    inboxes = [ctx.Queue() for _ in range(replicas)]
+    results = ctx.Queue()
+    procs = [ctx.Process(target=replica, args=(inbox, results, backend_kind, backend_url)) for inbox in inboxes]
+    for proc in procs:
+        proc.start()
+
+    nodes = [f"replica-{i}" for i in range(replicas)]
+    ring = HashRing(nodes)
+    rng = random.Random(11)
+    for repo, blobs in workload:
+        target = nodes.index(ring.node_for(repo)) if affinity else rng.randrange(replicas)
+        inboxes[target].put((repo, blobs))
+    for inbox in inboxes:
+        inbox.put(None)
+
+    scored = 0
+    stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+    for _ in procs:
+        replica_scored, replica_stats = results.get()
+        scored += replica_scored
+        for key in stats:
+            stats[key] += replica_stats[key]
+    for proc in procs:
+        proc.join()
+
+    lookups = sum(len(blobs) for _, blobs in workload)
+    return {"scored": scored, "hit_rate": 1 - scored / lookups, **stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--submissions", type=int, default=4000)
+    parser.add_argument("--repos", type=int, default=300)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "fs", "redis"])
+    args = parser.parse_args()
+
+    workload = make_workload(args.submissions, args.repos, args.files)
+    tmp = tempfile.mkdtemp(prefix="certifyme-bench-")
+    server = None
+    if args.backend == "redis":
+        server = RespStandInServer().start()
+
+    print(f"replicas={args.replicas} submissions={args.submissions} repos={args.repos} backend={args.backend}")
+    print(f"{'routing':<10} {'shared':<8} {'hit rate':>9} {'scored':>8} {'local':>8} {'shared':>8}")
+    try:
+        for shared in (False, True):
+            for affinity in (False, True):
+                if not shared:
+                    kind, url = "memory", ""
+                elif args.backend == "redis":
+                    kind, url = "redis", server.url
+                    # Fresh keyspace per run
+                    make_backend(kind, url)._call(b"FLUSHALL")
+                else:
+                    kind = args.backend
+                    url = os.path.join(tmp, f"{kind}-{int(affinity)}" + (".sqlite3" if kind == "sqlite" else ""))
+                row = run(workload, args.replicas, affinity, kind, url)
+                print(f"{'affinity' if affinity else 'random':<10} {'yes' if shared else 'no':<8} "
+                      f"{row['hit_rate']:>9.1%} {row['scored']:>8} {row['local_hits']:>8} {row['shared_hits']:>8}")
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
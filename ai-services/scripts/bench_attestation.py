@@ -0,0 +1,84 @@
+"""
+Benchmark: per-verdict oracle signatures vs. one signature per Merkle batch.
+
+Signs N synthetic verdicts both ways and reports throughput and the key operations
+used. Uses Ed25519 when `cryptography` is installed (pass --hmac to force the demo
+HMAC signer), and also runs the async VerdictBatcher under concurrent submission.
+
+Usage: python scripts/bench_attestation.py [--count 10000] [--batch 256] [--hmac]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attestation import HmacSigner, VerdictBatcher, seal_batch  # noqa: E402
+from evidence import canonical  # noqa: E402
+
+
+def make_verdicts(n: int) -> list:
+    return [
+        {"github_url": f"https://github.com/cohort/student{i}", "skill": "Python Backend",
+         "wallet_address": f"WALLET{i:052d}", "ai_score": 40 + i % 60, "recommendation": "ISSUE_CERTIFICATE"}
+        for i in range(n)
+    ]
+
+
+def make_signer(force_hmac: bool):
+    if not force_hmac:
+        try:
+            from attestation import Ed25519Signer
+            return Ed25519Signer(os.urandom(32).hex())
+        except ImportError:
+            print("cryptography not installed; using HMAC signer")
+    return HmacSigner()
+
+
+def per_verdict(signer, verdicts: list) -> int:
+    for verdict in verdicts:
+        signer.sign(canonical(verdict))
+    return len(verdicts)
+
+
+def batched(signer, verdicts: list, batch: int) -> int:
+    signatures = 0
+    for i in range(0, len(verdicts), batch):
+        seal_batch(verdicts[i:i + batch], signer)
+        signatures += 1
+    return signatures
+
+
+async def batcher_run(signer, verdicts: list, batch: int) -> int:
+    batcher = VerdictBatcher(signer, max_batch=batch, max_wait_ms=5)
+    await batcher.submit_many(verdicts)
+    return batcher.batches_sealed
+
+
+def timed(label: str, fn, n: int) -> None:
+    t0 = time.perf_counter()
+    signatures = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<22} {n / elapsed:>12,.0f} verdicts/s {signatures:>8} signatures {elapsed * 1e6 / n:>8.1f} us/verdict")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--hmac", action="store_true")
+    args = parser.parse_args()
+
+    signer = make_signer(args.hmac)
+    verdicts = make_verdicts(args.count)
+    print(f"signer={signer.algorithm} verdicts={args.count} batch={args.batch}")
+    timed("per-verdict", lambda: per_verdict(signer, verdicts), args.count)
+    timed("merkle batch", lambda: batched(signer, verdicts, args.batch), args.count)
+    timed("async batcher", lambda: asyncio.run(batcher_run(signer, verdicts, args.batch)), args.count)
+
+
+if __name__ == "__main__":
+    main()
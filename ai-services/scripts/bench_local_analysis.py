@@ -0,0 +1,113 @@
+"""
+Benchmark: local static analysis in-thread vs. in the process pool.
+
+For synthetic repos of 10, 100 and 1000 files, measures analysis throughput and how
+much a concurrent "request-serving" thread is delayed (its tick lag), which is the
+GIL contention the pool exists to remove.
+
+Usage: python scripts/bench_local_analysis.py [--workers N] [--sizes 10,100,1000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_analysis import AnalysisPool  # noqa: E402
+
+TEMPLATE = '''
+import os
+from typing import Optional
+
+
+class Service{n}:
+    """Synthetic service {n}."""
+
+    def __init__(self, name: str, retries: int = 3):
+        self.name = name
+        self.retries = retries
+
+    def handle(self, items: list, limit: Optional[int] = None) -> list:
+        out = []
+        for i, item in enumerate(items):
+            if limit is not None and i >= limit:
+                break
+            if item % {m} == 0 and item > 0:
+                out.append(item * {n})
+            elif item < 0:
+                out.append(-item)
+        return out
+
+    def retry(self, fn):
+        for attempt in range(self.retries):
+            try:
+                return fn()
+            except OSError as e:
+                if attempt == self.retries - 1:
+                    raise
+                print(f"retry {{attempt}}: {{e}}")
+'''
+
+
+def make_repo(n_files: int) -> dict:
+    # Files are truncated to 3000 chars before analysis in the real pipeline
+    return {f"pkg/service_{i}.py": (TEMPLATE.format(n=i, m=i % 7 + 2) * 3)[:3000] for i in range(n_files)}
+
+
+def tick_lag(stop: threading.Event, lags: list, interval: float = 0.001) -> None:
+    """Simulated request thread: records how late each 1 ms tick fires."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        time.sleep(interval)
+        lags.append(time.perf_counter() - t0 - interval)
+
+
+def run(label: str, fn, files: dict) -> dict:
+    lags = []
+    stop = threading.Event()
+    ticker = threading.Thread(target=tick_lag, args=(stop, lags), daemon=True)
+    ticker.start()
+    t0 = time.perf_counter()
+    fn(files)
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    ticker.join()
+    return {
+        "mode": label,
+        "files": len(files),
+        "seconds": round(elapsed, 3),
+        "files_per_s": round(len(files) / elapsed, 1),
+        "tick_lag_p99_ms": round(statistics.quantiles(lags, n=100)[98] * 1000, 2) if len(lags) >= 2 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--sizes", default="10,100,1000")
+    args = parser.parse_args()
+
+    pool = AnalysisPool(workers=args.workers)
+    # Start workers outside the measurement
+    pool.analyze(make_repo(args.workers * 2), force_pool=True)
+
+    print(f"{'mode':<8} {'files':>6} {'seconds':>8} {'files/s':>9} {'tick p99 ms':>12}")
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            files = make_repo(size)
+            for row in (
+                run("thread", pool.analyze_inline, files),
+                run("pool", lambda f: pool.analyze(f, force_pool=True), files),
+            ):
+                print(f"{row['mode']:<8} {row['files']:>6} {row['seconds']:>8} {row['files_per_s']:>9} "
+                      f"{row['tick_lag_p99_ms']!s:>12}")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
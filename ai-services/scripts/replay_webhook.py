@@ -0,0 +1,82 @@
+"""
+Replay a GitHub webhook delivery against a local ai-service.
+
+Signs the payload with the shared secret exactly as GitHub does (X-Hub-Signature-256)
+and POSTs it to /api/github-webhook. Use a payload saved from the repo's
+"Recent Deliveries" page, or let the tool synthesize a push for --repo.
+
+Usage:
+  python scripts/replay_webhook.py --secret s3cret --repo octo/demo
+  python scripts/replay_webhook.py --secret s3cret --payload delivery.json [--event push]
+"""
+
+import os
+import sys
+import json
+import uuid
+import argparse
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webhooks import sign_payload  # noqa: E402
+
+
+def synthetic_push(repo: str, branch: str = "main", after: str | None = None) -> dict:
+    """Minimal push payload with the fields the receiver reads."""
+    return {
+        "ref": f"refs/heads/{branch}",
+        "before": "0" * 40,
+        "after": after or uuid.uuid4().hex + uuid.uuid4().hex[:8],
+        "deleted": False,
+        "repository": {
+            "full_name": repo,
+            "html_url": f"https://github.com/{repo}",
+            "default_branch": branch,
+        },
+    }
+
+
+def replay(url: str, secret: str, payload: dict, event: str = "push", delivery: str | None = None) -> tuple:
+    body = json.dumps(payload).encode()
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": delivery or str(uuid.uuid4()),
+        "X-Hub-Signature-256": sign_payload(secret, body),
+        "User-Agent": "GitHub-Hookshot/replay",
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:5001/api/github-webhook")
+    parser.add_argument("--secret", default=os.getenv("GITHUB_WEBHOOK_SECRET", ""))
+    parser.add_argument("--event", default="push")
+    parser.add_argument("--delivery", help="X-GitHub-Delivery id (reuse one to test deduplication)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--payload", help="JSON payload file")
+    source.add_argument("--repo", help="owner/repo for a synthetic push")
+    parser.add_argument("--branch", default="main")
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("--secret (or GITHUB_WEBHOOK_SECRET) is required")
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as f:
+            payload = json.load(f)
+    else:
+        payload = synthetic_push(args.repo, args.branch)
+
+    status, body = replay(args.url, args.secret, payload, args.event, args.delivery)
+    print(status, json.dumps(body, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+CertifyMe Skills Registry
+Skills available for verification and their minimum AI scores.
+Loaded once, served with an ETag, and optionally kept in sync with the
+CertifyMe contract's `skill_` / `skinfo_` boxes (register_skill) in the background.
+"""
+
+import os
+import json
+import base64
+import hashlib
+import threading
+import urllib.parse
+
+DEFAULT_MIN_SCORE = 45
+
+DEFAULT_SKILLS = [
+    {"name": "React Development", "category": "Frontend", "min_score": 45},
+    {"name": "Python Backend", "category": "Backend", "min_score": 45},
+    {"name": "Machine Learning", "category": "AI/ML", "min_score": 50},
+    {"name": "UI/UX Design", "category": "Design", "min_score": 45},
+    {"name": "Blockchain Development", "category": "Web3", "min_score": 50},
+    {"name": "Full Stack Development", "category": "Full Stack", "min_score": 45},
+    {"name": "Data Structures & Algorithms", "category": "CS Fundamentals", "min_score": 50},
+    {"name": "Mobile Development", "category": "Mobile", "min_score": 45},
+]
+
+# Box key prefixes of CertifyMe.skills (BoxMap(ARC4String, ARC4UInt16, key_prefix="skill_"): name -> skill ID)
+# and CertifyMe.skill_info (BoxMap(ARC4UInt16, SkillInfo, key_prefix="skinfo_"): skill ID -> (min_score, name))
+SKILL_BOX_PREFIX = b"skill_"
+SKILL_INFO_BOX_PREFIX = b"skinfo_"
+
+
+def _arc4_string(encoded: bytes) -> str | None:
+    """Decode an ARC-4 string (2-byte length + UTF-8); None if the length does not match."""
+    length = int.from_bytes(encoded[:2], "big")
+    if len(encoded) != 2 + length:
+        return None
+    return encoded[2:].decode("utf-8", errors="replace")
+
+
+def decode_skill_boxes(boxes: dict) -> dict:
+    """
+    Decode raw registry boxes {box_name: box_value} into {skill_name: min_score}.
+    skill_ boxes map an ARC-4 string name to a uint16 skill ID; skinfo_ boxes map
+    that ID (2 bytes big-endian) to SkillInfo, an ARC-4 (uint64 min_score, string
+    name) tuple whose min_score is its first 8 bytes. Other boxes are ignored.
+    """
+    min_scores = {}
+    for name, value in boxes.items():
+        if name.startswith(SKILL_INFO_BOX_PREFIX) and len(name) == len(SKILL_INFO_BOX_PREFIX) + 2 and len(value) >= 8:
+            min_scores[name[len(SKILL_INFO_BOX_PREFIX):]] = int.from_bytes(value[:8], "big")
+
+    thresholds = {}
+    for name, value in boxes.items():
+        if not name.startswith(SKILL_BOX_PREFIX) or len(value) != 2:
+            continue
+        skill = _arc4_string(name[len(SKILL_BOX_PREFIX):])
+        if skill is not None and value in min_scores:
+            thresholds[skill] = min_scores[value]
+    return thresholds
+
+
+class AlgodBoxReader:
+    """Reads an application's boxes through algod's REST API (stdlib only)."""
+
+    def __init__(self, server: str, app_id: int, token: str = "", timeout: float = 5):
+        self.server = server.rstrip("/")
+        self.app_id = app_id
+        self.token = token
+        self.timeout = timeout
+
+    def _get(self, path: str) -> dict:
+        import urllib.request
+
+        req = urllib.request.Request(f"{self.server}{path}", headers={"X-Algo-API-Token": self.token})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    def read_boxes(self, prefix: bytes | tuple) -> dict:
+        """Return {box_name: box_value} for every box whose name starts with prefix (or one of several)."""
+        listing = self._get(f"/v2/applications/{self.app_id}/boxes")
+        boxes = {}
+        for box in listing.get("boxes", []):
+            name = base64.b64decode(box["name"])
+            if not name.startswith(prefix):
+                continue
+            encoded_name = urllib.parse.quote("b64:" + base64.b64encode(name).decode(), safe="")
+            detail = self._get(f"/v2/applications/{self.app_id}/box?name={encoded_name}")
+            boxes[name] = base64.b64decode(detail["value"])
+        return boxes
+
+
+class SkillsRegistry:
+    """
+    In-memory skills list with a content ETag.
+    Reads are lock-free snapshots; refresh() swaps in a new list atomically.
+    """
+
+    def __init__(self, skills: list | None = None, box_reader=None):
+        self.box_reader = box_reader
+        self._refresh_thread = None
+        self._stop = threading.Event()
+        self._set_skills(skills if skills is not None else DEFAULT_SKILLS)
+
+    def _set_skills(self, skills: list) -> None:
+        skills = [dict(skill) for skill in skills]
+        body = json.dumps(skills, sort_keys=True, separators=(",", ":")).encode()
+        # Swap both together so a reader never pairs a new list with an old ETag
+        self._state = (
+            skills,
+            {skill["name"].lower(): skill["min_score"] for skill in skills},
+            hashlib.sha256(body).hexdigest()[:32],
+        )
+
+    @property
+    def skills(self) -> list:
+        return self._state[0]
+
+    @property
+    def etag(self) -> str:
+        return self._state[2]
+
+    def min_score(self, skill_name: str) -> int:
+        """Minimum AI score to certify skill_name (DEFAULT_MIN_SCORE for unknown skills)."""
+        return self._state[1].get((skill_name or "").lower(), DEFAULT_MIN_SCORE)
+
+    def refresh(self) -> bool:
+        """
+        Pull thresholds from the contract's skill boxes and merge them in.
+        On-chain values win; skills only registered on-chain are appended.
+        Returns True if the list changed.
+        """
+        if self.box_reader is None:
+            return False
+
+        thresholds = decode_skill_boxes(self.box_reader.read_boxes((SKILL_BOX_PREFIX, SKILL_INFO_BOX_PREFIX)))
+        skills = [dict(skill) for skill in self.skills]
+        known = {skill["name"] for skill in skills}
+        for skill in skills:
+            if skill["name"] in thresholds:
+                skill["min_score"] = thresholds[skill["name"]]
+        for name in sorted(set(thresholds) - known):
+            skills.append({"name": name, "category": "Other", "min_score": thresholds[name]})
+
+        if skills == self.skills:
+            return False
+        self._set_skills(skills)
+        return True
+
+    def start_background_refresh(self, interval: float) -> None:
+        """Refresh from chain now and then every `interval` seconds on a daemon thread."""
+        if self.box_reader is None or self._refresh_thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    if self.refresh():
+                        print(f"Skills registry refreshed from chain (etag {self.etag})")
+                except Exception as e:
+                    print(f"Warning: skills registry refresh failed: {e}")
+                if self._stop.wait(interval):
+                    return
+
+        self._refresh_thread = threading.Thread(target=loop, name="skills-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> SkillsRegistry:
+    """
+    Process-wide registry. When ALGORAND_APP_ID is set, thresholds are synced from
+    the contract every SKILLS_REFRESH_SECONDS (default 300).
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                box_reader = None
+                app_id = int(os.getenv("ALGORAND_APP_ID", "0") or 0)
+                if app_id:
+                    box_reader = AlgodBoxReader(
+                        os.getenv("ALGOD_SERVER", "https://testnet-api.algonode.cloud"),
+                        app_id,
+                        os.getenv("ALGOD_TOKEN", ""),
+                    )
+                registry = SkillsRegistry(box_reader=box_reader)
+                registry.start_background_refresh(float(os.getenv("SKILLS_REFRESH_SECONDS", "300")))
+                _registry = registry
+    return _registry
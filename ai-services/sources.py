@@ -0,0 +1,356 @@
+"""
+CertifyMe Code Sources
+Pluggable backends that supply a repository's source tree and file contents:
+live GitHub, a local directory of checkouts, or a recorded fixture archive.
+Only the GitHub backend touches the network.
+
+Select with CODE_SOURCE=github|local|fixture and CODE_SOURCE_PATH=<dir or archive>.
+All fetch methods are coroutines; GitHub requests run concurrently under a shared semaphore.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from async_runtime import GITHUB_CONCURRENCY, github_semaphore, loop_local, run_sync
+from deadline import mark_degraded
+
+# Filter for source code files
+CODE_EXTENSIONS = {".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".cpp", ".c", ".go", ".rs", ".html", ".css"}
+# Files analyzed per repo, to stay within token limits
+MAX_SOURCE_FILES = 10
+# Large files are truncated before analysis
+MAX_FILE_CHARS = 3000
+
+
+def parse_github_url(github_url: str) -> tuple[str, str]:
+    """Extract (owner, repo) from a GitHub URL."""
+    parts = github_url.rstrip("/").split("/")
+    if len(parts) < 2:
+        raise ValueError(f"Invalid GitHub URL: {github_url}")
+
+    owner = parts[-2]
+    repo = parts[-1]
+    # Strip .git suffix if present (e.g. from clone URLs)
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return owner, repo
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Git's blob object id for data, so offline sources share memoized scores with GitHub."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def select_source_files(entries: list) -> list:
+    """Pick the analyzable source blobs from [{"path", "sha", "size", "type"}] tree entries."""
+    source_files = [
+        item for item in entries
+        if item["type"] == "blob"
+        and any(item["path"].endswith(ext) for ext in CODE_EXTENSIONS)
+        and "node_modules" not in item["path"]
+        and "dist" not in item["path"]
+        and ".min." not in item["path"]
+    ]
+    return source_files[:MAX_SOURCE_FILES]
+
+
+def _tree_result(owner: str, repo: str, ref: str, tree_sha: str, source_files: list) -> dict:
+    return {
+        "owner": owner,
+        "repo": repo,
+        "ref": ref,
+        "tree_sha": tree_sha,
+        "blobs": {item["path"]: item["sha"] for item in source_files},
+        "sizes": {item["path"]: item.get("size", 0) for item in source_files},
+    }
+
+
+def _synthetic_tree_sha(entries: list) -> str:
+    """Stable id for an offline tree, derived from its (path, blob) pairs."""
+    h = hashlib.sha1()
+    for item in sorted(entries, key=lambda e: e["path"]):
+        h.update(f"{item['path']}\0{item['sha']}\n".encode())
+    return h.hexdigest()
+
+
+class SourceBackend:
+    """
+    Interface for code sources.
+    fetch_tree returns {"owner", "repo", "ref", "tree_sha", "blobs": {path: blob_sha}, "sizes": {path: size}}
+    for the default branch head, or for commit ref when given (offline backends hold
+    one snapshot per repo and ignore ref);
+    fetch_contents returns {path: content} for a subset of that tree's paths; with a
+    timeout, files not fetched in time are left out (remote backends). Remote
+    backends pin "ref" to a commit SHA so contents always match the listed blobs.
+    """
+
+    name = "base"
+    # True if the backend performs network I/O
+    remote = False
+
+    async def fetch_tree(self, github_url: str, ref: str | None = None) -> dict:
+        raise NotImplementedError
+
+    async def fetch_contents(self, tree: dict, paths: list, timeout: float | None = None) -> dict:
+        raise NotImplementedError
+
+    async def warm_up(self) -> None:
+        """Pre-pay connection setup before the first request (no-op for offline sources)."""
+
+
+class GitHubSource(SourceBackend):
+    """
+    Live GitHub: REST API for the tree, raw.githubusercontent.com for file contents.
+    Uses one pooled httpx.AsyncClient per event loop, so warm-up's DNS/TLS work is
+    reused by requests, and every request holds the shared GitHub semaphore.
+    """
+
+    name = "github"
+    remote = True
+    WARM_URLS = ("https://api.github.com/", "https://raw.githubusercontent.com/")
+
+    def client(self):
+        """Pooled HTTP client bound to the running event loop."""
+        def factory():
+            import httpx
+            return httpx.AsyncClient(
+                timeout=httpx.Timeout(15.0, connect=10.0),
+                limits=httpx.Limits(max_connections=GITHUB_CONCURRENCY, max_keepalive_connections=GITHUB_CONCURRENCY),
+            )
+        return loop_local("github_http", factory)
+
+    async def get(self, url: str, timeout: float, **kwargs):
+        """GET under the GitHub concurrency limit."""
+        async with github_semaphore():
+            return await self.client().get(url, timeout=timeout, **kwargs)
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(*(self.client().head(url, timeout=5) for url in self.WARM_URLS))
+
+    async def fetch_tree(self, github_url: str, ref: str | None = None) -> dict:
+        """
+        Resolve the default branch to a commit SHA once (unless ref already names the
+        commit) and read the tree at that commit. The SHA becomes the tree's ref, so
+        fetch_contents downloads exactly the blobs listed even if the branch moves in between.
+        """
+        owner, repo = parse_github_url(github_url)
+        headers = {"Accept": "application/vnd.github.v3+json"}
+
+        commit_sha = ref
+        if commit_sha is None:
+            # Try 'master' branch if 'main' fails
+            for branch in ("main", "master"):
+                api_url = f"https://api.github.com/repos/{owner}/{repo}/git/ref/heads/{branch}"
+                resp = await self.get(api_url, timeout=15, headers=headers)
+                if resp.status_code == 200:
+                    break
+            if resp.status_code != 200:
+                raise ValueError(f"Could not resolve repo branch (HTTP {resp.status_code})")
+            commit_sha = resp.json()["object"]["sha"]
+
+        api_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{commit_sha}?recursive=1"
+        resp = await self.get(api_url, timeout=15, headers=headers)
+        if resp.status_code != 200:
+            raise ValueError(f"Could not fetch repo tree (HTTP {resp.status_code})")
+
+        body = resp.json()
+        source_files = select_source_files(body.get("tree", []))
+        return _tree_result(owner, repo, commit_sha, body.get("sha", ""), source_files)
+
+    async def fetch_contents(self, tree: dict, paths: list, timeout: float | None = None) -> dict:
+        per_file_timeout = min(10, timeout) if timeout is not None else 10
+
+        async def fetch_one(path: str):
+            raw_url = f"https://raw.githubusercontent.com/{tree['owner']}/{tree['repo']}/{tree['ref']}/{path}"
+            return path, await self.get(raw_url, timeout=per_file_timeout)
+
+        # All files in flight at once; a file that fails to download is skipped,
+        # and files still downloading when the budget runs out are dropped
+        tasks = [asyncio.create_task(fetch_one(path)) for path in paths]
+        if not tasks:
+            return {}
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"Warning: dropped {len(pending)} slow file fetches at the stage deadline")
+            mark_degraded("fetch_contents")
+
+        files_content = {}
+        for task in tasks:
+            if task in pending:
+                continue
+            if task.exception() is not None:
+                print(f"Warning: file fetch failed: {task.exception()}")
+                continue
+            path, file_resp = task.result()
+            if file_resp.status_code == 200:
+                files_content[path] = file_resp.text[:MAX_FILE_CHARS]
+        return files_content
+
+
+class LocalDirectorySource(SourceBackend):
+    """
+    Checkouts on local disk, laid out as <root>/<owner>/<repo> (or <root>/<repo>).
+    Blob ids are computed the way git does, so cached scores carry over.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _repo_dir(self, owner: str, repo: str) -> str:
+        root = os.path.realpath(self.root)
+        for candidate in (os.path.join(root, owner, repo), os.path.join(root, repo)):
+            # owner and repo come from the submitted URL: never leave the root
+            candidate = os.path.realpath(candidate)
+            if os.path.commonpath([root, candidate]) == root and candidate != root and os.path.isdir(candidate):
+                return candidate
+        raise ValueError(f"Repository {owner}/{repo} not found under {self.root}")
+
+    async def fetch_tree(self, github_url: str, ref: str | None = None) -> dict:
+        # Directory walking and hashing are blocking; keep them off the event loop
+        return await asyncio.to_thread(self._fetch_tree, github_url)
+
+    async def fetch_contents(self, tree: dict, paths: list, timeout: float | None = None) -> dict:
+        return await asyncio.to_thread(self._fetch_contents, tree, paths)
+
+    def _fetch_tree(self, github_url: str) -> dict:
+        owner, repo = parse_github_url(github_url)
+        repo_dir = self._repo_dir(owner, repo)
+
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(repo_dir):
+            dirnames[:] = sorted(d for d in dirnames if d != ".git")
+            for filename in sorted(filenames):
+                full_path = os.path.join(dirpath, filename)
+                with open(full_path, "rb") as f:
+                    data = f.read()
+                entries.append({
+                    "path": os.path.relpath(full_path, repo_dir).replace(os.sep, "/"),
+                    "type": "blob",
+                    "sha": git_blob_sha(data),
+                    "size": len(data),
+                })
+
+        source_files = select_source_files(entries)
+        return _tree_result(owner, repo, "local", _synthetic_tree_sha(entries), source_files)
+
+    def _fetch_contents(self, tree: dict, paths: list) -> dict:
+        repo_dir = self._repo_dir(tree["owner"], tree["repo"])
+        files_content = {}
+        for path in paths:
+            full_path = os.path.join(repo_dir, *path.split("/"))
+            if os.path.isfile(full_path):
+                with open(full_path, encoding="utf-8", errors="replace") as f:
+                    files_content[path] = f.read(MAX_FILE_CHARS)
+        return files_content
+
+
+class FixtureArchiveSource(SourceBackend):
+    """
+    Recorded repositories in a single JSON archive (see record_fixture):
+    {"repos": {"owner/repo": {"ref": "...", "tree_sha": "...", "files": {path: content}}}}
+    """
+
+    name = "fixture"
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            self._repos = {key.lower(): value for key, value in json.load(f).get("repos", {}).items()}
+
+    def _repo(self, owner: str, repo: str) -> dict:
+        recorded = self._repos.get(f"{owner}/{repo}".lower())
+        if recorded is None:
+            raise ValueError(f"Repository {owner}/{repo} is not in fixture archive {self.path}")
+        return recorded
+
+    async def fetch_tree(self, github_url: str, ref: str | None = None) -> dict:
+        owner, repo = parse_github_url(github_url)
+        recorded = self._repo(owner, repo)
+
+        entries = [
+            {"path": path, "type": "blob", "sha": git_blob_sha(content.encode()), "size": len(content.encode())}
+            for path, content in recorded["files"].items()
+        ]
+        tree_sha = recorded.get("tree_sha") or _synthetic_tree_sha(entries)
+        return _tree_result(owner, repo, recorded.get("ref", "fixture"), tree_sha, select_source_files(entries))
+
+    async def fetch_contents(self, tree: dict, paths: list, timeout: float | None = None) -> dict:
+        recorded = self._repo(tree["owner"], tree["repo"])
+        return {path: recorded["files"][path][:MAX_FILE_CHARS] for path in paths if path in recorded["files"]}
+
+
+async def _record_repo(source: SourceBackend, github_url: str) -> dict:
+    tree = await source.fetch_tree(github_url)
+    return {
+        "key": f"{tree['owner']}/{tree['repo']}",
+        "ref": tree["ref"],
+        "tree_sha": tree["tree_sha"],
+        "files": await source.fetch_contents(tree, list(tree["blobs"])),
+    }
+
+
+def record_fixture(github_urls: list, archive_path: str, source: SourceBackend | None = None) -> dict:
+    """
+    Fetch repos from a live source and write them to a fixture archive for offline runs.
+    Existing entries in the archive are kept. Returns the archive dict.
+    """
+    source = source or GitHubSource()
+    archive = {"repos": {}}
+    if os.path.exists(archive_path):
+        with open(archive_path, encoding="utf-8") as f:
+            archive = json.load(f)
+
+    async def record_all():
+        return await asyncio.gather(*(_record_repo(source, url) for url in github_urls))
+
+    for recorded in run_sync(record_all()):
+        archive["repos"][recorded.pop("key")] = recorded
+
+    with open(archive_path, "w", encoding="utf-8") as f:
+        json.dump(archive, f, indent=2, sort_keys=True)
+    return archive
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def get_source() -> SourceBackend:
+    """Process-wide source backend, built from CODE_SOURCE / CODE_SOURCE_PATH on first use."""
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                kind = os.getenv("CODE_SOURCE", "github").lower()
+                path = os.getenv("CODE_SOURCE_PATH", "")
+                if kind == "local":
+                    _source = LocalDirectorySource(path or ".")
+                elif kind == "fixture":
+                    _source = FixtureArchiveSource(path)
+                elif kind == "github":
+                    _source = GitHubSource()
+                else:
+                    raise ValueError(f"Unknown CODE_SOURCE: {kind}")
+    return _source
+
+
+def set_source(source: SourceBackend | None) -> None:
+    """Override the process-wide source (None re-reads the environment on next use)."""
+    global _source
+    _source = source
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 4 or sys.argv[1] != "record":
+        print("Usage: python sources.py record <archive.json> <github_url> [<github_url> ...]")
+        sys.exit(1)
+    recorded = record_fixture(sys.argv[3:], sys.argv[2])
+    print(f"Recorded {len(recorded['repos'])} repositories to {sys.argv[2]}")
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep the verification history written by pipeline tests out of the service's data directory
+os.environ.setdefault("HISTORY_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="certifyme-history-"), "history.sqlite3"))
@@ -0,0 +1,45 @@
+from analysis_cache import AnalysisCache, diff_blobs
+
+
+def test_file_scores_are_keyed_by_repo_blob_and_skill() -> None:
+    cache = AnalysisCache()
+    cache.put_file("Octo/Demo", "abc123", "Python Backend", {"code_quality": 80})
+
+    assert cache.get_file("octo/demo", "abc123", "Python Backend") == {"code_quality": 80}
+    assert cache.get_file("octo/demo", "abc123", "React Development") is None
+    assert cache.get_file("octo/demo", "def456", "Python Backend") is None
+    # A fork with identical blobs is not certified on the original's scores
+    assert cache.get_file("mallory/demo", "abc123", "Python Backend") is None
+
+
+def test_file_cache_evicts_least_recently_used() -> None:
+    cache = AnalysisCache(max_files=2)
+    cache.put_file("r", "a", "s", {"code_quality": 1})
+    cache.put_file("r", "b", "s", {"code_quality": 2})
+    cache.get_file("r", "a", "s")
+    cache.put_file("r", "c", "s", {"code_quality": 3})
+
+    assert cache.get_file("r", "a", "s") is not None
+    assert cache.get_file("r", "b", "s") is None
+
+
+def test_snapshot_is_copied_on_read() -> None:
+    cache = AnalysisCache()
+    cache.put_snapshot("Owner/Repo", "s", "tree1", {"a.py": "1"}, {"ai_score": 70})
+
+    snapshot = cache.get_snapshot("owner/repo", "s")
+    snapshot["result"]["ai_score"] = 0
+
+    assert cache.get_snapshot("owner/repo", "s")["result"]["ai_score"] == 70
+
+
+def test_diff_blobs() -> None:
+    previous = {"a.py": "1", "b.py": "2", "c.py": "3"}
+    current = {"a.py": "1", "b.py": "9", "d.py": "4"}
+
+    assert diff_blobs(previous, current) == {
+        "added": ["d.py"],
+        "modified": ["b.py"],
+        "removed": ["c.py"],
+        "unchanged": ["a.py"],
+    }
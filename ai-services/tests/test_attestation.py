@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+import hashlib
+
+from attestation import DEMO_ORACLE_SECRET, HmacSigner, VerdictBatcher, seal_batch, verify_attestation
+
+
+@pytest.fixture(autouse=True)
+def demo_oracle(monkeypatch):
+    monkeypatch.delenv("ORACLE_PRIVATE_KEY", raising=False)
+
+
+def verdicts(n: int) -> list:
+    return [{"github_url": f"https://github.com/octo/repo{i}", "skill": "Python", "ai_score": 50 + i} for i in range(n)]
+
+
+def test_every_verdict_in_a_batch_verifies() -> None:
+    attestations = seal_batch(verdicts(13), HmacSigner())
+
+    assert len({a["batch"]["signature"] for a in attestations}) == 1
+    assert all(verify_attestation(a, DEMO_ORACLE_SECRET) for a in attestations)
+
+
+def test_tampering_is_detected() -> None:
+    attestation = seal_batch(verdicts(5), HmacSigner())[2]
+
+    forged_score = {**attestation, "verdict": {**attestation["verdict"], "ai_score": 100}}
+    forged_root = {**attestation, "batch": {**attestation["batch"], "size": 6}}
+    assert not verify_attestation(forged_score, DEMO_ORACLE_SECRET)
+    assert not verify_attestation(forged_root, DEMO_ORACLE_SECRET)
+    assert not verify_attestation(attestation, b"another-secret")
+
+
+def test_batcher_seals_by_size_and_by_time() -> None:
+    async def run():
+        batcher = VerdictBatcher(HmacSigner(), max_batch=4, max_wait_ms=20)
+        by_size = await batcher.submit_many(verdicts(8))
+        by_time = await batcher.submit_many(verdicts(3))
+        return batcher, by_size, by_time
+
+    batcher, by_size, by_time = asyncio.run(run())
+
+    assert batcher.batches_sealed == 3
+    assert [a["batch"]["size"] for a in by_size] == [4] * 8
+    assert [a["batch"]["size"] for a in by_time] == [3] * 3
+    assert [a["verdict"] for a in by_size] == verdicts(8)
+    assert all(verify_attestation(a, DEMO_ORACLE_SECRET) for a in by_size + by_time)
+
+
+def test_ed25519_batches_verify_with_the_public_key() -> None:
+    pytest.importorskip("cryptography")
+    from attestation import Ed25519Signer
+
+    # The backend's key is 64 bytes; ORACLE_PUBLIC_KEY is its sha256
+    key = bytes(range(64))
+    signer = Ed25519Signer(key.hex())
+    attestation = seal_batch(verdicts(3), signer)[1]
+
+    assert signer.key_id == hashlib.sha256(key).hexdigest()
+    assert verify_attestation(attestation, signer.public_key)
+    assert not verify_attestation(attestation, HmacSigner().key_id)
+    assert not verify_attestation(attestation, DEMO_ORACLE_SECRET)
+
+
+def test_forged_header_key_is_not_trusted() -> None:
+    pytest.importorskip("cryptography")
+    from attestation import Ed25519Signer
+
+    oracle = Ed25519Signer("11" * 32)
+    # An attacker signs with their own key and advertises it in the header
+    forged = seal_batch([{**verdicts(1)[0], "recommendation": "ISSUE_CERTIFICATE"}], Ed25519Signer("22" * 32))[0]
+
+    assert not verify_attestation(forged, oracle.public_key)
+
+
+def test_demo_secret_is_refused_outside_demo_mode(monkeypatch) -> None:
+    attestation = seal_batch(verdicts(2), HmacSigner())[0]
+    monkeypatch.setenv("ORACLE_PRIVATE_KEY", "11" * 32)
+
+    assert not verify_attestation(attestation, DEMO_ORACLE_SECRET)
+    assert verify_attestation(seal_batch(verdicts(2), HmacSigner(b"campus-secret"))[0], b"campus-secret")
+
+
+def test_attest_endpoint_signs_only_its_own_verdicts(monkeypatch) -> None:
+    pytest.importorskip("flask")
+    monkeypatch.setenv("WARMUP_ON_START", "false")
+    import app as service
+    from evidence import attach_evidence
+
+    monkeypatch.setattr(service, "ATTEST_API_KEY", "backend-key")
+    produced = attach_evidence({"ai_score": 52, "recommendation": "REJECT", "analysis": {}},
+                               "https://github.com/octo/own", "Python", None)
+    client = service.app.test_client()
+
+    def attest(body: dict, key: str | None = "backend-key"):
+        return client.post("/api/attest", json=body, headers={"X-API-Key": key} if key else {})
+
+    assert attest({"verdicts": [{"evidence_hash": produced["evidence_hash"]}]}, key=None).status_code == 401
+    forged = {"github_url": "https://github.com/octo/own", "ai_score": 99, "recommendation": "ISSUE_CERTIFICATE"}
+    assert attest({"verdicts": [forged]}).status_code == 400
+    assert attest({"verdicts": [{"evidence_hash": "ab" * 32}]}).status_code == 404
+
+    response = attest({"verdicts": [{"evidence_hash": produced["evidence_hash"], "wallet_address": "W"}]})
+    [attestation] = response.get_json()["attestations"]
+    assert attestation["verdict"]["ai_score"] == 52
+    assert attestation["verdict"]["recommendation"] == "REJECT"
+    assert attestation["verdict"]["wallet_address"] == "W"
+    assert verify_attestation(attestation, DEMO_ORACLE_SECRET)
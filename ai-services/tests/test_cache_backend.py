@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from affinity import HashRing
+from analysis_cache import AnalysisCache
+from cache_backend import FilesystemBackend, RedisBackend, RespStandInServer, SQLiteBackend
+
+
+@pytest.fixture()
+def resp_server():
+    server = RespStandInServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["fs", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "fs":
+        return FilesystemBackend(str(tmp_path / "cache"))
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    return RedisBackend(request.getfixturevalue("resp_server").url)
+
+
+def test_backend_round_trip_and_expiry(backend, monkeypatch) -> None:
+    backend.set("k", b"\x00binary\xff")
+    backend.set("short", b"v", ttl=60)
+
+    assert backend.get("k") == b"\x00binary\xff"
+    assert backend.get("missing") is None
+    backend.delete("k")
+    assert backend.get("k") is None
+
+    if backend.name != "redis":
+        import cache_backend
+        now = cache_backend.time.time()
+        monkeypatch.setattr(cache_backend.time, "time", lambda: now + 120)
+        assert backend.get("short") is None
+
+
+def test_replicas_share_scores_through_the_backend(backend) -> None:
+    replica_a = AnalysisCache(backend=backend)
+    replica_b = AnalysisCache(backend=backend)
+    replica_a.put_file("octo/demo", "blob1", "Python", {"code_quality": 80})
+    replica_a.put_snapshot("Octo/Demo", "Python", "tree1", {"a.py": "blob1"}, {"ai_score": 80})
+
+    assert replica_b.get_file("octo/demo", "blob1", "Python") == {"code_quality": 80}
+    assert replica_b.get_snapshot("octo/demo", "Python")["tree_sha"] == "tree1"
+    assert replica_b.stats["shared_hits"] == 2
+    replica_b.get_file("octo/demo", "blob1", "Python")
+    assert replica_b.stats["local_hits"] == 1
+
+
+def test_unreachable_backend_degrades_to_local_cache() -> None:
+    cache = AnalysisCache(backend=RedisBackend("redis://127.0.0.1:1/0", timeout=0.2))
+    cache.put_file("octo/demo", "blob1", "Python", {"code_quality": 80})
+
+    assert cache.get_file("octo/demo", "blob1", "Python") == {"code_quality": 80}
+    assert cache.get_file("octo/demo", "blob2", "Python") is None
+
+
+def test_slow_backend_does_not_block_the_event_loop() -> None:
+    class SlowBackend(FilesystemBackend):
+        def get(self, key: str) -> bytes | None:
+            time.sleep(0.3)
+            return None
+
+    cache = AnalysisCache(backend=SlowBackend("/nonexistent-cache"))
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def lookup():
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        found = await cache.offload(cache.get_contents, {"a.py": "blob1", "b.py": "blob2"})
+        task.cancel()
+        return found
+
+    assert asyncio.run(lookup()) == {}
+    # The loop kept running while both lookups waited on the backend
+    assert len(ticks) >= 10
+
+
+def test_ring_moves_few_repos_when_a_replica_joins() -> None:
+    repos = [f"owner/repo{i}" for i in range(2000)]
+    before = HashRing(["http://a", "http://b", "http://c"])
+    after = HashRing(["http://a", "http://b", "http://c", "http://d"])
+
+    owners = [before.node_for(r) for r in repos]
+    moved = sum(before.node_for(r) != after.node_for(r) for r in repos)
+    assert all(owners.count(node) > 400 for node in before.nodes)
+    assert moved < len(repos) * 0.35
+    assert all(after.node_for(r) == "http://d" for r in repos if before.node_for(r) != after.node_for(r))
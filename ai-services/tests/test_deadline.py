@@ -0,0 +1,110 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import code_verifier
+import deadline
+import sources
+from deadline import parse_deadline_ms
+
+
+def test_deadline_from_header_or_body() -> None:
+    assert parse_deadline_ms({"X-Request-Deadline-Ms": "1500"}, {"deadline_ms": 9000}) == 1500
+    assert parse_deadline_ms({}, {"deadline_ms": 9000}) == 9000
+    assert parse_deadline_ms({}, {"deadline_ms": "soon"}) == deadline.DEFAULT_DEADLINE_MS
+    assert parse_deadline_ms({}, {"deadline_ms": 10**9}) == deadline.MAX_DEADLINE_MS
+
+
+def test_slow_stage_never_outlasts_the_deadline(monkeypatch) -> None:
+    class SlowSource(sources.SourceBackend):
+        async def fetch_tree(self, github_url, ref=None):
+            await asyncio.sleep(5)
+
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: None)
+    sources.set_source(SlowSource())
+    try:
+        t0 = time.monotonic()
+        result = asyncio.run(code_verifier.verify_code_async("https://github.com/octo/slow", "Python", deadline_ms=400))
+        elapsed = time.monotonic() - t0
+    finally:
+        sources.set_source(None)
+
+    assert elapsed < 0.4
+    assert result["recommendation"] == "REJECT"
+    assert result["degraded"] == ["fetch_tree"]
+
+
+def test_slow_file_fetches_are_dropped_at_the_stage_budget() -> None:
+    class SlowRawGitHub(sources.GitHubSource):
+        async def get(self, url, timeout, **kwargs):
+            await asyncio.sleep(2 if url.endswith("slow.py") else 0)
+            return SimpleNamespace(status_code=200, text=f"# {url}")
+
+    tree = {"owner": "octo", "repo": "demo", "ref": "main", "blobs": {"fast.py": "1", "slow.py": "2"}}
+
+    async def fetch():
+        with deadline.deadline_scope(5000) as request_deadline:
+            files = await SlowRawGitHub().fetch_contents(tree, ["fast.py", "slow.py"], timeout=0.1)
+            return files, request_deadline.degraded
+
+    files, degraded = asyncio.run(fetch())
+    assert list(files) == ["fast.py"]
+    assert degraded == ["fetch_contents"]
+
+
+def test_llm_call_is_bounded(tmp_path, monkeypatch) -> None:
+    repo_dir = tmp_path / "octo" / "llm"
+    repo_dir.mkdir(parents=True)
+    (repo_dir / "main.py").write_text("print('hi')\n")
+
+    async def hang(**kwargs):
+        await asyncio.sleep(10)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=hang)))
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: client)
+    sources.set_source(sources.LocalDirectorySource(str(tmp_path)))
+    try:
+        t0 = time.monotonic()
+        result = asyncio.run(code_verifier.verify_code_async("https://github.com/octo/llm", "Python", deadline_ms=600))
+        elapsed = time.monotonic() - t0
+    finally:
+        sources.set_source(None)
+
+    assert elapsed < 0.6
+    assert "deadline" in result["analysis"]["error"]
+    assert "llm" in result["degraded"]
+
+
+def test_verdict_missing_dropped_files_is_not_snapshotted(tmp_path, monkeypatch) -> None:
+    repo_dir = tmp_path / "octo" / "dropped"
+    repo_dir.mkdir(parents=True)
+    (repo_dir / "fast.py").write_text("def fast():\n    return 1\n")
+    (repo_dir / "slow.py").write_text("def slow():\n    return 2\n")
+
+    class DroppingSource(sources.LocalDirectorySource):
+        async def fetch_contents(self, tree, paths, timeout=None):
+            # As GitHubSource does when slow.py is still downloading at the stage deadline
+            deadline.mark_degraded("fetch_contents")
+            files = await super().fetch_contents(tree, paths, timeout)
+            return {path: content for path, content in files.items() if path != "slow.py"}
+
+    reply = '{"code_quality": 90, "complexity": 80, "best_practices": 85, "originality": 70, "files": []}'
+
+    async def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: client)
+    sources.set_source(DroppingSource(str(tmp_path)))
+    try:
+        result = asyncio.run(code_verifier.verify_code_async(
+            "https://github.com/octo/dropped", "Python", record_history=False
+        ))
+    finally:
+        sources.set_source(None)
+
+    assert result["degraded"] == ["fetch_contents"]
+    assert result["incremental"]["unscored_files"] == 1
+    assert result["incremental"]["unscored"] == ["slow.py"]
+    # The next submission of this tree is scored again instead of replaying this verdict
+    assert code_verifier.analysis_cache.get_snapshot("octo/dropped", "Python") is None
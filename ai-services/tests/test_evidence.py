@@ -0,0 +1,119 @@
+import asyncio
+
+import code_verifier
+import sources
+from evidence import EvidenceStore, build_bundle, bundle_entries, evidence_store, verify_entry_proof
+from history_store import HistoryStore
+from merkle import MerkleBuilder, MerkleTree, leaf_hash, verify_inclusion
+
+# RFC 6962 reference vectors (Certificate Transparency test data)
+CT_LEAVES = ["", "00", "10", "2021", "3031", "40414243", "5051525354555657", "606162636465666768696a6b6c6d6e6f"]
+CT_ROOT = "5dc9da79a70659a9ad559cb701ded9a2ab9d823aad2f4960cfe370eff4604328"
+
+
+def test_streaming_root_matches_rfc6962_vector() -> None:
+    builder = MerkleBuilder()
+    for leaf in CT_LEAVES:
+        builder.add(bytes.fromhex(leaf))
+
+    assert builder.root().hex() == CT_ROOT
+    assert MerkleTree([leaf_hash(bytes.fromhex(x)) for x in CT_LEAVES]).root().hex() == CT_ROOT
+
+
+def test_inclusion_proofs_for_every_tree_shape() -> None:
+    for size in range(1, 34):
+        leaves = [leaf_hash(str(i).encode()) for i in range(size)]
+        tree = MerkleTree(leaves)
+        root = tree.root()
+        for index in range(size):
+            proof = tree.inclusion_proof(index)
+            assert len(proof) <= size.bit_length()
+            assert verify_inclusion(leaves[index], index, size, proof, root)
+            assert not verify_inclusion(leaf_hash(b"forged"), index, size, proof, root)
+
+
+def test_bundle_root_is_deterministic_and_content_addressed() -> None:
+    tree = {"owner": "octo", "repo": "demo", "ref": "main", "tree_sha": "t1",
+            "blobs": {"b.py": "2", "a.py": "1"}}
+    result = {"ai_score": 70, "skill_level": "Intermediate", "verified": True,
+              "recommendation": "ISSUE_CERTIFICATE", "analysis": {"code_quality": 70}}
+
+    entries = list(bundle_entries("https://github.com/octo/demo", "Python", tree, result))
+    first = build_bundle(entries)
+    second = build_bundle(bundle_entries("https://github.com/octo/demo", "Python", tree, result))
+    changed = build_bundle(bundle_entries("https://github.com/octo/demo", "Python",
+                                          {**tree, "blobs": {"a.py": "1", "b.py": "3"}}, result))
+
+    assert first["root"] == second["root"]
+    assert first["root"] != changed["root"]
+    assert first["leaf_count"] == 4
+    assert [e["kind"] for e in entries] == ["meta", "file", "file", "verdict"]
+    assert [e.get("path") for e in entries[1:3]] == ["a.py", "b.py"]
+
+
+def test_file_leaves_record_whether_they_fed_the_verdict() -> None:
+    tree = {"owner": "octo", "repo": "demo", "ref": "c1", "tree_sha": "t1",
+            "blobs": {"a.py": "1", "b.py": "2", "c.py": "3"}}
+    entries = list(bundle_entries("https://github.com/octo/demo", "Python", tree, {"ai_score": 70},
+                                  {"a.py": "reviewed", "b.py": "reused"}))
+
+    assert [e["status"] for e in entries if e["kind"] == "file"] == ["reviewed", "reused", "skipped"]
+
+
+def test_bundles_survive_a_restart(tmp_path) -> None:
+    path = str(tmp_path / "h.sqlite3")
+    tree = {"owner": "octo", "repo": "demo", "ref": "c1", "tree_sha": "t1", "blobs": {"a.py": "1"}}
+    entries = list(bundle_entries("https://github.com/octo/demo", "Python", tree, {"ai_score": 70},
+                                  {"a.py": "reviewed"}))
+    bundle = EvidenceStore(history=HistoryStore(path, maintenance_seconds=0)).put(iter(entries))
+
+    # Written directly, not queued: a fresh process (or another replica) has it at once
+    restarted = EvidenceStore(history=HistoryStore(path, maintenance_seconds=0))
+    assert restarted.manifest(bundle["root"])["entries"] == entries
+    proof = restarted.proof(bundle["root"], path="a.py")
+    assert proof["entry"]["status"] == "reviewed"
+    assert verify_entry_proof(proof)
+    assert restarted.manifest("0" * 64) is None
+
+
+def test_large_bundle_streams_into_storage_and_proofs(tmp_path) -> None:
+    history = HistoryStore(str(tmp_path / "h.sqlite3"), maintenance_seconds=0)
+    store = EvidenceStore(history=history)
+    blobs = {f"src/mod{i:04}.py": f"{i:040x}" for i in range(1200)}
+    tree = {"owner": "octo", "repo": "big", "ref": "c1", "tree_sha": "t1", "blobs": blobs}
+
+    bundle = store.put(bundle_entries("https://github.com/octo/big", "Python", tree, {"ai_score": 70}))
+    # The same bundle again is not stored twice
+    assert store.put(bundle_entries("https://github.com/octo/big", "Python", tree, {"ai_score": 70})) == bundle
+
+    assert bundle["leaf_count"] == 1202
+    for path in ("src/mod0000.py", "src/mod0777.py", "src/mod1199.py"):
+        proof = store.proof(bundle["root"], path=path)
+        assert proof["entry"]["blob_sha"] == blobs[path]
+        assert verify_entry_proof(proof)
+    assert verify_entry_proof(store.proof(bundle["root"], index=1201))
+    assert store.proof(bundle["root"], index=1202) is None
+
+
+def test_verified_file_has_checkable_inclusion_proof(tmp_path, monkeypatch) -> None:
+    repo_dir = tmp_path / "octo" / "demo"
+    repo_dir.mkdir(parents=True)
+    for i in range(5):
+        (repo_dir / f"mod{i}.py").write_text(f"value = {i}\n")
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: None)
+    sources.set_source(sources.LocalDirectorySource(str(tmp_path)))
+    try:
+        result = asyncio.run(code_verifier.verify_code_async("https://github.com/octo/demo", "Python Backend"))
+    finally:
+        sources.set_source(None)
+
+    root = result["evidence_hash"]
+    assert evidence_store.manifest(root)["leaf_count"] == 7
+
+    proof = evidence_store.proof(root, path="mod3.py")
+    assert proof["entry"]["blob_sha"] == sources.git_blob_sha(b"value = 3\n")
+    assert verify_entry_proof(proof)
+
+    proof["entry"]["blob_sha"] = "0" * 40
+    assert not verify_entry_proof(proof)
+    assert evidence_store.proof(root, path="missing.py") is None
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import code_verifier
+import sources
+from history_store import HistoryStore
+
+
+def result(score: int) -> dict:
+    return {"ai_score": score, "verified": score >= 45, "skill_level": "Intermediate",
+            "recommendation": "ISSUE_CERTIFICATE", "analysis": {"code_quality": score}}
+
+
+def trace(repo: str, tree_sha: str) -> dict:
+    return {"repo": repo, "tree_sha": tree_sha, "model": "m",
+            "timings_ms": {"llm": 12.5, "total": 20.0},
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}}
+
+
+def test_writes_are_batched_and_queryable(tmp_path) -> None:
+    store = HistoryStore(str(tmp_path / "h.sqlite3"), maintenance_seconds=0)
+    for i in range(30):
+        store.record(f"https://github.com/octo/repo{i % 3}", "Python" if i % 2 else "React", result(40 + i),
+                     trace(f"octo/repo{i % 3}", f"tree{i}"))
+    store.flush()
+
+    rows = store.history(repo="Octo/Repo1", skill="Python")
+    assert [r["ai_score"] for r in rows] == [40 + i for i in reversed(range(30)) if i % 3 == 1 and i % 2]
+    assert rows[0]["timings_ms"] == {"llm": 12.5, "total": 20.0}
+    assert rows[0]["total_tokens"] == 150
+
+    page = store.history(limit=10)
+    next_page = store.history(limit=10, before_id=page[-1]["id"])
+    assert len(page) == len(next_page) == 10
+    assert page[-1]["id"] > next_page[0]["id"]
+    assert store.latest_for_tree("tree7", "Python")["ai_score"] == 47
+
+
+def test_retention_and_compaction(tmp_path) -> None:
+    store = HistoryStore(str(tmp_path / "h.sqlite3"), retention_days=1, max_rows=3, maintenance_seconds=0)
+    for score in (50, 60, 70):
+        store.record("https://github.com/octo/demo", "Python", result(score), trace("octo/demo", "same-tree"))
+    store.record("https://github.com/octo/other", "Python", result(80), trace("octo/other", "t2"))
+    store.flush()
+    with store._conn:
+        store._conn.execute("UPDATE verifications SET created_at = ? WHERE ai_score = 50", (time.time() - 3 * 86400,))
+
+    assert store.apply_retention() == 1
+    assert store.compact() == 1
+    assert sorted(r["ai_score"] for r in store.history()) == [70, 80]
+
+
+def test_pipeline_records_stage_timings(tmp_path, monkeypatch) -> None:
+    repo_dir = tmp_path / "repos" / "octo" / "demo"
+    repo_dir.mkdir(parents=True)
+    (repo_dir / "main.py").write_text("print('hi')\n")
+    store = HistoryStore(str(tmp_path / "h.sqlite3"), maintenance_seconds=0)
+    monkeypatch.setattr(code_verifier, "get_history", lambda: store)
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: None)
+    sources.set_source(sources.LocalDirectorySource(str(tmp_path / "repos")))
+    try:
+        verified = asyncio.run(code_verifier.verify_code_async("https://github.com/octo/demo", "Python Backend"))
+    finally:
+        sources.set_source(None)
+    store.flush()
+
+    [row] = store.history(repo="octo/demo")
+    assert row["ai_score"] == verified["ai_score"]
+    assert row["model"] == "demo"
+    assert row["evidence_hash"] == verified["evidence_hash"]
+    assert row["tree_sha"]
+    assert {"fetch_tree", "total"} <= set(row["timings_ms"])
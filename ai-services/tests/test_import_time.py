@@ -0,0 +1,55 @@
+"""
+Cold-start regression tests: `python -X importtime` budgets for the service modules.
+Heavy client libraries must stay out of the import path and load on first use / warm-up.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets (microseconds); generous to absorb slow CI machines
+CODE_VERIFIER_BUDGET_US = 150_000
+APP_BUDGET_US = 600_000
+
+# (ssl is not listed: asyncio itself imports it)
+LAZY_MODULES = {"requests", "openai", "httpx", "urllib.request", "http.client", "dotenv"}
+
+
+def import_times(statement: str) -> dict:
+    """Run statement under -X importtime in a clean interpreter; returns {module: cumulative_us}."""
+    env = {**os.environ, "WARMUP_ON_START": "false", "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=SERVICE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_code_verifier_import_budget() -> None:
+    times = import_times("import code_verifier")
+
+    assert times["code_verifier"] < CODE_VERIFIER_BUDGET_US
+    assert not LAZY_MODULES & set(times), f"eagerly imported: {LAZY_MODULES & set(times)}"
+
+
+def test_app_import_budget() -> None:
+    pytest.importorskip("flask")
+    pytest.importorskip("flask_cors")
+    times = import_times("import app")
+
+    assert times["app"] < APP_BUDGET_US
+    assert not {"requests", "openai", "httpx"} & set(times)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import code_verifier
+import sources
+from json_repair import parse_json_lenient
+
+
+def test_plain_json() -> None:
+    assert parse_json_lenient('{"overall_score": 80}') == {"overall_score": 80}
+
+
+def test_fence_with_surrounding_prose() -> None:
+    text = 'Here is my review:\n```json\n{"overall_score": 72, "strengths": ["a"]}\n```\nHope it helps!'
+    assert parse_json_lenient(text) == {"overall_score": 72, "strengths": ["a"]}
+
+
+def test_trailing_text_after_object() -> None:
+    assert parse_json_lenient('{"a": 1} and some notes {not json}') == {"a": 1}
+
+
+def test_trailing_commas() -> None:
+    assert parse_json_lenient('{"a": [1, 2,], "b": "x, }",}') == {"a": [1, 2], "b": "x, }"}
+
+
+def test_truncated_inside_string() -> None:
+    text = '{"code_quality": 80, "evidence_summary": "Good use of hooks in src/App'
+    assert parse_json_lenient(text) == {"code_quality": 80, "evidence_summary": "Good use of hooks in src/App"}
+
+
+def test_truncated_dangling_key() -> None:
+    text = '{"code_quality": 80, "strengths": ["clean", "typed"], "weak'
+    assert parse_json_lenient(text) == {"code_quality": 80, "strengths": ["clean", "typed"]}
+
+
+def test_truncated_unterminated_fence() -> None:
+    text = '```json\n{"complexity": 61, "originality": 5'
+    assert parse_json_lenient(text) == {"complexity": 61, "originality": 5}
+
+
+def test_unrecoverable_raises() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_lenient("I cannot review this repository.")
+
+
+def _scripted_client(replies: list, calls: list):
+    async def create(**kwargs):
+        calls.append(kwargs["messages"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=replies[len(calls) - 1]))],
+                               usage=None)
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+@pytest.mark.parametrize("repair, expected", [
+    ('{"code_quality": 95, "complexity": 70, "best_practices": 75, "originality": 60, "files": []}', 77),
+    ('{"code_quality": 95', "REJECT"),
+])
+def test_truncated_reply_missing_categories_gets_a_repair_turn(tmp_path, monkeypatch, repair, expected) -> None:
+    repo_dir = tmp_path / "octo" / "truncated"
+    repo_dir.mkdir(parents=True)
+    (repo_dir / "main.py").write_text(f"def truncated_{len(repair)}():\n    return {len(repair)}\n")
+    calls = []
+    # Parses after repair, but three of the four categories were cut off
+    client = _scripted_client(['{"code_quality": 95', repair], calls)
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: client)
+    sources.set_source(sources.LocalDirectorySource(str(tmp_path)))
+    try:
+        result = asyncio.run(code_verifier.verify_code_async(
+            "https://github.com/octo/truncated", "Python", record_history=False
+        ))
+    finally:
+        sources.set_source(None)
+
+    assert len(calls) == 2
+    assert calls[1][-1]["content"] == code_verifier.REPAIR_PROMPT
+    if expected == "REJECT":
+        assert result["recommendation"] == "REJECT"
+        assert result["analysis"]["error"] == "Failed to parse AI response"
+    else:
+        assert result["ai_score"] == expected
@@ -0,0 +1,55 @@
+import os
+
+from local_analysis import AnalysisPool, analyze_source, summarize
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PYTHON_SOURCE = '''
+def add(a, b):
+    """Add two numbers."""
+    return a + b
+
+
+def clamp(x, low, high):
+    if x < low:
+        return low
+    if x > high:
+        return high
+    return x
+'''
+
+
+def test_python_metrics() -> None:
+    metrics = analyze_source("math_utils.py", PYTHON_SOURCE)
+
+    assert metrics["parsed"] is True
+    assert metrics["functions"] == 2
+    assert metrics["documented_functions"] == 1
+    assert metrics["avg_complexity"] == 2.0
+
+
+def test_syntax_error_is_reported_not_raised() -> None:
+    assert analyze_source("broken.py", "def (:\n")["parsed"] is False
+
+
+def test_near_duplicates_found_by_simhash() -> None:
+    with open(os.path.join(SERVICE_DIR, "sources.py")) as f:
+        original = f.read()[:3000]
+    with open(os.path.join(SERVICE_DIR, "json_repair.py")) as f:
+        unrelated = f.read()[:3000]
+    results = {
+        "a.py": analyze_source("a.py", original),
+        "b.py": analyze_source("b.py", original.replace("MAX_SOURCE_FILES = 10", "MAX_SOURCE_FILES = 20")),
+        "c.py": analyze_source("c.py", unrelated),
+    }
+
+    assert summarize(results)["near_duplicates"] == [["a.py", "b.py"]]
+
+
+def test_pool_matches_inline() -> None:
+    files = {f"pkg/mod_{i}.py": PYTHON_SOURCE.replace("clamp", f"clamp_{i}") for i in range(40)}
+    pool = AnalysisPool(workers=2, chunk_files=8, max_tasks_per_child=2)
+    try:
+        assert pool.analyze(files, force_pool=True) == pool.analyze_inline(files)
+    finally:
+        pool.shutdown()
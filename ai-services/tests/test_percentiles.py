@@ -0,0 +1,60 @@
+from history_store import HistoryStore
+from percentiles import ScoreHistogram
+
+
+def test_percentile_rank_and_quantiles_are_exact() -> None:
+    hist = ScoreHistogram()
+    for score in range(1, 101):
+        hist.add(score)
+
+    assert hist.percentile_rank(50) == 49.5
+    assert hist.percentile_rank(0) == 0
+    assert hist.quantile(0.5) == 50
+    assert hist.quantile(0.9) == 90
+    assert sum(b["count"] for b in hist.buckets(25)) == 100
+    assert ScoreHistogram().percentile_rank(50) is None
+
+
+def test_rankings_follow_history_writes_and_survive_restart(tmp_path) -> None:
+    path = str(tmp_path / "h.sqlite3")
+    store = HistoryStore(path, maintenance_seconds=0)
+    for i, score in enumerate([40, 55, 60, 70, 85, 90]):
+        result = {"ai_score": score, "analysis": {}}
+        store.record("https://github.com/octo/demo", "Python Backend", result,
+                     {"cohort": "campus-a" if i % 2 else "campus-b"})
+    store.record("https://github.com/octo/broken", "Python Backend",
+                 {"ai_score": 0, "analysis": {"error": "No source files found"}}, {"cohort": "campus-a"})
+    store.flush()
+
+    report = store.rankings.report("Python Backend", score=70)
+    assert store.rankings.report("python backend")["count"] == 6
+    assert report["count"] == 6
+    assert report["percentile_rank"] == 58.33
+    assert store.rankings.report("Python Backend", score=70, cohort="campus-a")["count"] == 3
+    assert store.rankings.cohorts("Python Backend") == ["campus-a", "campus-b"]
+
+    reopened = HistoryStore(path, maintenance_seconds=0)
+    assert reopened.rankings.report("Python Backend", score=70) == report
+
+
+def test_workers_sharing_a_database_add_to_each_others_counts(tmp_path) -> None:
+    path = str(tmp_path / "h.sqlite3")
+    worker_a = HistoryStore(path, maintenance_seconds=0)
+    worker_b = HistoryStore(path, maintenance_seconds=0)
+    for store, score in ((worker_a, 60), (worker_b, 80), (worker_a, 70)):
+        store.record("https://github.com/octo/demo", "Python Backend", {"ai_score": score, "analysis": {}}, {})
+        store.flush()
+
+    assert worker_a.rankings.report("Python Backend")["count"] == 3
+    assert HistoryStore(path, maintenance_seconds=0).rankings.report("Python Backend")["count"] == 3
+
+
+def test_resubmitted_tree_is_ranked_once(tmp_path) -> None:
+    store = HistoryStore(str(tmp_path / "h.sqlite3"), maintenance_seconds=0)
+    for tree_sha in ("tree1", "tree1", "tree2"):
+        store.record("https://github.com/octo/demo", "Python Backend", {"ai_score": 70, "analysis": {}},
+                     {"tree_sha": tree_sha, "cohort": "campus-a"})
+    store.flush()
+
+    assert store.rankings.report("Python Backend")["count"] == 2
+    assert store.rankings.report("Python Backend", cohort="campus-a")["count"] == 2
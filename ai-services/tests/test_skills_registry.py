@@ -0,0 +1,91 @@
+import base64
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from skills_registry import DEFAULT_MIN_SCORE, AlgodBoxReader, SkillsRegistry, decode_skill_boxes
+
+
+def skill_boxes(skill_id: int, name: str, min_score: int) -> dict:
+    """The skill_ and skinfo_ boxes register_skill writes for one skill."""
+    encoded = len(name.encode()).to_bytes(2, "big") + name.encode()
+    key = skill_id.to_bytes(2, "big")
+    info = min_score.to_bytes(8, "big") + (10).to_bytes(2, "big") + encoded
+    return {b"skill_" + encoded: key, b"skinfo_" + key: info}
+
+
+@pytest.fixture()
+def algod_stand_in():
+    """Minimal algod serving the box endpoints for app 1234."""
+    boxes = {**skill_boxes(0, "Machine Learning", 70), **skill_boxes(1, "Rust Systems", 60)}
+    boxes[b"cert_\x00\x00\x00\x00\x00\x00\x00\x00"] = b"\x00" * 40
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            if url.path == "/v2/applications/1234/boxes":
+                body = {"boxes": [{"name": base64.b64encode(n).decode()} for n in boxes]}
+            elif url.path == "/v2/applications/1234/box":
+                name = base64.b64decode(urllib.parse.parse_qs(url.query)["name"][0][len("b64:"):])
+                body = {"name": base64.b64encode(name).decode(), "value": base64.b64encode(boxes[name]).decode()}
+            else:
+                self.send_error(404)
+                return
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_decode_skill_boxes_ignores_other_boxes() -> None:
+    boxes = skill_boxes(3, "Python Backend", 55)
+    boxes[b"cert_\x00"] = b"x"
+    # A name whose SkillInfo box is missing has no threshold to report
+    boxes[b"skill_\x00\x02Go"] = b"\x00\x09"
+    assert decode_skill_boxes(boxes) == {"Python Backend": 55}
+
+
+def test_decode_contract_box_encodings() -> None:
+    # Boxes written by CertifyMe.register_skill("Machine Learning", 70) and ("Rust Systems", 60)
+    boxes = {
+        bytes.fromhex("736b696c6c5f00104d616368696e65204c6561726e696e67"): bytes.fromhex("0000"),
+        bytes.fromhex("736b696c6c5f000c527573742053797374656d73"): bytes.fromhex("0001"),
+        bytes.fromhex("736b696e666f5f0000"): bytes.fromhex("0000000000000046000a00104d616368696e65204c6561726e696e67"),
+        bytes.fromhex("736b696e666f5f0001"): bytes.fromhex("000000000000003c000a000c527573742053797374656d73"),
+    }
+    assert decode_skill_boxes(boxes) == {"Machine Learning": 70, "Rust Systems": 60}
+
+
+def test_min_score_defaults() -> None:
+    registry = SkillsRegistry()
+    assert registry.min_score("machine learning") == 50
+    assert registry.min_score("Underwater Basket Weaving") == DEFAULT_MIN_SCORE
+
+
+def test_refresh_from_chain_updates_thresholds_and_etag(algod_stand_in) -> None:
+    registry = SkillsRegistry(box_reader=AlgodBoxReader(algod_stand_in, 1234))
+    etag = registry.etag
+
+    assert registry.refresh() is True
+    assert registry.min_score("Machine Learning") == 70
+    assert registry.min_score("Rust Systems") == 60
+    assert registry.etag != etag
+
+    # Nothing changed on chain: same list, same ETag
+    etag = registry.etag
+    assert registry.refresh() is False
+    assert registry.etag == etag
@@ -0,0 +1,124 @@
+import asyncio
+import socket
+
+import pytest
+
+import code_verifier
+import sources
+from sources import FixtureArchiveSource, LocalDirectorySource, git_blob_sha, record_fixture
+
+
+@pytest.fixture()
+def checkout(tmp_path):
+    repo_dir = tmp_path / "octo" / "demo"
+    (repo_dir / "src").mkdir(parents=True)
+    (repo_dir / "src" / "app.py").write_text("print('hi')\n")
+    (repo_dir / "README.md").write_text("# demo\n")
+    (repo_dir / "node_modules").mkdir()
+    (repo_dir / "node_modules" / "dep.js").write_text("x")
+    return tmp_path
+
+
+@pytest.fixture()
+def no_network(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("network access attempted")
+
+    monkeypatch.setattr(socket, "create_connection", refuse)
+    monkeypatch.setattr(socket.socket, "connect", refuse)
+
+
+def test_git_blob_sha_matches_git() -> None:
+    # `printf 'hello\n' | git hash-object --stdin`
+    assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_local_directory_source(checkout) -> None:
+    source = LocalDirectorySource(str(checkout))
+    tree = asyncio.run(source.fetch_tree("https://github.com/octo/demo"))
+
+    assert list(tree["blobs"]) == ["src/app.py"]
+    assert tree["blobs"]["src/app.py"] == git_blob_sha(b"print('hi')\n")
+    assert asyncio.run(source.fetch_contents(tree, ["src/app.py"])) == {"src/app.py": "print('hi')\n"}
+
+
+def test_local_directory_source_stays_under_its_root(checkout, tmp_path) -> None:
+    (tmp_path / "secret").mkdir()
+    (tmp_path / "secret" / "keys.py").write_text("KEY = 1\n")
+    source = LocalDirectorySource(str(checkout / "octo"))
+
+    for url in ("https://github.com/../secret", "https://github.com/x/..", "https://github.com/.."):
+        with pytest.raises(ValueError, match="not found"):
+            asyncio.run(source.fetch_tree(url))
+    assert list(asyncio.run(source.fetch_tree("https://github.com/octo/demo"))["blobs"]) == ["src/app.py"]
+
+
+def test_record_and_replay_fixture(checkout, tmp_path) -> None:
+    archive = tmp_path / "fixture.json"
+    local = LocalDirectorySource(str(checkout))
+    record_fixture(["https://github.com/octo/demo"], str(archive), source=local)
+
+    replay = FixtureArchiveSource(str(archive))
+    tree = asyncio.run(replay.fetch_tree("https://github.com/Octo/demo.git"))
+
+    assert tree == {**asyncio.run(local.fetch_tree("https://github.com/octo/demo")), "owner": "Octo"}
+    assert asyncio.run(replay.fetch_contents(tree, ["src/app.py"])) == {"src/app.py": "print('hi')\n"}
+
+
+def test_demo_mode_never_touches_network(monkeypatch, no_network) -> None:
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: None)
+    sources.set_source(sources.GitHubSource())
+    try:
+        first = code_verifier.verify_code("https://github.com/octo/demo", "Python Backend")
+        second = code_verifier.verify_code("https://github.com/octo/demo", "Python Backend")
+    finally:
+        sources.set_source(None)
+
+    assert first == second
+    assert first["evidence_summary"].startswith("[Demo Mode] Nothing was fetched or analyzed")
+
+
+def test_async_and_sync_entry_points_agree(monkeypatch, no_network) -> None:
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: None)
+    sources.set_source(sources.GitHubSource())
+    try:
+        async_result = asyncio.run(code_verifier.verify_code_async("https://github.com/octo/demo", "Python Backend"))
+        sync_result = code_verifier.verify_code("https://github.com/octo/demo", "Python Backend")
+    finally:
+        sources.set_source(None)
+
+    assert async_result == sync_result
+
+
+def test_github_source_pins_contents_to_the_resolved_commit() -> None:
+    class Response:
+        def __init__(self, status_code: int, body=None, text: str = ""):
+            self.status_code, self._body, self.text = status_code, body, text
+
+        def json(self):
+            return self._body
+
+    class StubGitHub(sources.GitHubSource):
+        def __init__(self):
+            self.urls = []
+
+        async def get(self, url: str, timeout: float, **kwargs):
+            self.urls.append(url)
+            if url.endswith("/git/ref/heads/main"):
+                return Response(404)
+            if url.endswith("/git/ref/heads/master"):
+                return Response(200, {"object": {"sha": "c0ffee"}})
+            if "/git/trees/" in url:
+                return Response(200, {"sha": "tree1", "tree": [{"path": "app.py", "type": "blob", "sha": "b1"}]})
+            return Response(200, text="print('pinned')\n")
+
+    source = StubGitHub()
+    tree = asyncio.run(source.fetch_tree("https://github.com/octo/demo"))
+    files = asyncio.run(source.fetch_contents(tree, ["app.py"]))
+
+    assert (tree["ref"], tree["tree_sha"], files) == ("c0ffee", "tree1", {"app.py": "print('pinned')\n"})
+    # Tree and raw files are read at the commit, never at the (movable) branch name
+    assert source.urls[2:] == [
+        "https://api.github.com/repos/octo/demo/git/trees/c0ffee?recursive=1",
+        "https://raw.githubusercontent.com/octo/demo/c0ffee/app.py",
+    ]
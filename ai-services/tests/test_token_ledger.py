@@ -0,0 +1,155 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import code_verifier
+import sources
+import token_ledger
+from token_ledger import TokenLedger, parse_tenant
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_tenant_from_header_or_body() -> None:
+    keys = {"campus-a": "key-a", "campus-b": "key-b"}
+
+    assert parse_tenant({"X-CertifyMe-Tenant": "Campus-A", "X-CertifyMe-Tenant-Key": "key-a"}, {"tenant": "other"},
+                        keys) == "campus-a"
+    assert parse_tenant({"X-CertifyMe-Tenant-Key": "key-b"}, {"tenant": "campus-b"}, keys) == "campus-b"
+    assert parse_tenant({}, None, keys) == token_ledger.DEFAULT_TENANT
+
+
+def test_unauthenticated_tenants_share_the_default_budget() -> None:
+    keys = {"campus-a": "key-a"}
+
+    # A name alone, or with another tenant's key, does not open a fresh budget
+    assert parse_tenant({"X-CertifyMe-Tenant": "campus-a"}, None, keys) == token_ledger.DEFAULT_TENANT
+    assert parse_tenant({"X-CertifyMe-Tenant": "campus-a", "X-CertifyMe-Tenant-Key": "nope"}, None,
+                        keys) == token_ledger.DEFAULT_TENANT
+    assert parse_tenant({"X-CertifyMe-Tenant": "fresh-1"}, {"tenant": "fresh-2"}, keys) == token_ledger.DEFAULT_TENANT
+
+
+def test_spend_rolls_out_of_the_window() -> None:
+    clock = Clock()
+    ledger = TokenLedger(window_seconds=600, global_budget=10_000, tenant_budgets={}, clock=clock)
+    ledger.record("campus-a", "Python", "model-x", 3000, 1000)
+    assert ledger.utilization("campus-a", "Python") == (0.4, "global")
+
+    clock.now += 300
+    ledger.record("campus-a", "Python", "model-x", 1000, 0)
+    assert ledger.utilization("campus-a", "Python")[0] == 0.5
+
+    clock.now += 301
+    assert ledger.utilization("campus-a", "Python")[0] == 0.1
+
+
+def test_admission_tiers_follow_the_fullest_budget() -> None:
+    clock = Clock()
+    ledger = TokenLedger(window_seconds=3600, tenant_budget=10_000, tenant_budgets={"big": 1_000_000},
+                         cheap_model="cheap/model", clock=clock)
+    assert ledger.decide("campus-a", "Python", 1000)["decision"] == "full"
+
+    ledger.record("campus-a", "Python", "m", 7000, 500)
+    admission = ledger.decide("campus-a", "Python", 1000)
+    assert admission["decision"] == "cheap"
+    assert admission["scope"] == "tenant:campus-a"
+    # Another tenant's budget is untouched
+    assert ledger.decide("big", "Python", 1000)["decision"] == "full"
+
+    ledger.record("campus-a", "Python", "m", 1500, 0)
+    assert ledger.decide("campus-a", "Python", 1000)["decision"] == "queue"
+
+
+def test_exhausted_budget_queues_then_falls_back_to_static() -> None:
+    ledger = TokenLedger(window_seconds=3600, global_budget=10_000, tenant_budgets={}, cheap_model="", clock=Clock())
+    ledger.record(None, "Python", "m", 9900, 0)
+    admission = asyncio.run(ledger.admit(None, "Python", 500, max_wait=0.2))
+    assert admission["decision"] == "static"
+    assert admission["queued_ms"] >= 200
+    assert admission["reserved"] == 0
+    assert ledger.decisions["static"] == 1 and ledger.decisions["queued"] == 1
+
+
+def test_reservations_count_until_settled() -> None:
+    ledger = TokenLedger(window_seconds=3600, global_budget=10_000, tenant_budgets={}, clock=Clock())
+    admission = asyncio.run(ledger.admit(None, "Python", 6000))
+    assert admission["decision"] == "full"
+    assert ledger.decide(None, "Python", 4000)["decision"] == "queue"
+
+    ledger.settle(admission)
+    ledger.record(None, "Python", "m", 1500, 500)
+    assert ledger.decide(None, "Python", 4000)["decision"] == "full"
+
+
+def test_report_burn_rate_and_projection() -> None:
+    clock = Clock()
+    ledger = TokenLedger(window_seconds=3600, tenant_budget=100_000, tenant_budgets={}, clock=clock)
+    for minute in range(5):
+        clock.now += 60 if minute else 0
+        ledger.record("campus-a", "Python", "m", 800, 200)
+
+    report = ledger.report(tenant="campus-a")
+    tenant = next(s for s in report["scopes"] if s["scope"] == "tenant")
+    assert tenant["name"] == "campus-a"
+    assert tenant["total_tokens"] == 5000
+    assert tenant["llm_calls"] == 5
+    assert tenant["burn_rate_per_minute"] == 1000
+    assert tenant["exhausted_in_seconds"] == 95 * 60
+    assert {s["scope"] for s in report["scopes"]} == {"global", "tenant", "skill", "model"}
+
+
+def _fake_client(calls: list):
+    async def create(**kwargs):
+        calls.append(kwargs["model"])
+        reply = {"code_quality": 80, "complexity": 70, "best_practices": 75, "originality": 90,
+                 "overall_score": 78, "evidence_summary": "Clean main.py", "strengths": [], "weaknesses": [],
+                 "files": []}
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))],
+            usage=SimpleNamespace(prompt_tokens=900, completion_tokens=100, total_tokens=1000),
+        )
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_pipeline_downgrades_and_records_spend(tmp_path, monkeypatch) -> None:
+    for name in ("cheap", "static"):
+        repo_dir = tmp_path / "octo" / name
+        repo_dir.mkdir(parents=True)
+        (repo_dir / "main.py").write_text(f"def {name}():\n    '''Docs.'''\n    return 1\n")
+
+    ledger = TokenLedger(window_seconds=3600, tenant_budget=10_000, tenant_budgets={},
+                         cheap_model="cheap/model", clock=Clock())
+    calls = []
+    monkeypatch.setattr(code_verifier, "get_ledger", lambda: ledger)
+    monkeypatch.setattr(code_verifier, "_get_openai_client", lambda: _fake_client(calls))
+    sources.set_source(sources.LocalDirectorySource(str(tmp_path)))
+    try:
+        ledger.record("campus-a", "Python", "m", 7500, 0)
+        result = asyncio.run(code_verifier.verify_code_async(
+            "https://github.com/octo/cheap", "Python", record_history=False, tenant="campus-a"
+        ))
+        assert calls == ["cheap/model"]
+        assert result["ai_score"] == 78
+        assert ledger.utilization("campus-a", "Python")[0] == 0.85
+
+        ledger.record("campus-a", "Python", "m", 1000, 0)
+        monkeypatch.setattr(token_ledger, "ADMISSION_POLL_SECONDS", 0.01)
+        monkeypatch.setattr(code_verifier, "ADMISSION_MAX_QUEUE_SECONDS", 0.05)
+        result = asyncio.run(code_verifier.verify_code_async(
+            "https://github.com/octo/static", "Python", record_history=False, tenant="campus-a"
+        ))
+    finally:
+        sources.set_source(None)
+
+    assert calls == ["cheap/model"]
+    assert result["provisional"] is True
+    assert result["recommendation"] == "PROVISIONAL"
+    assert result["verified"] is False
+    assert result["evidence_hash"]
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import sys
+
+import code_verifier
+import sources
+import webhooks
+from webhooks import PrefetchLane, handle_webhook, parse_push, sign_payload, verify_signature
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+from replay_webhook import synthetic_push  # noqa: E402
+
+
+def test_signature_validation() -> None:
+    body = b'{"zen": "Keep it logically awesome."}'
+
+    assert verify_signature("s3cret", body, sign_payload("s3cret", body))
+    assert not verify_signature("s3cret", body, sign_payload("other", body))
+    assert not verify_signature("s3cret", body + b" ", sign_payload("s3cret", body))
+    assert not verify_signature("", body, sign_payload("", body))
+
+
+def test_only_default_branch_pushes_are_handled() -> None:
+    push = synthetic_push("Octo/Demo", after="a" * 40)
+
+    assert parse_push(push) == {"repo": "octo/demo", "github_url": "https://github.com/Octo/Demo",
+                                "after": "a" * 40, "ref": "main"}
+    assert parse_push({**push, "ref": "refs/heads/feature"}) is None
+    assert parse_push({**push, "deleted": True}) is None
+
+
+def test_receiver_rejects_bad_signatures_and_unregistered_repos(monkeypatch) -> None:
+    body = json.dumps(synthetic_push("octo/unknown")).encode()
+    monkeypatch.setattr(webhooks, "GITHUB_WEBHOOK_SECRET", "s3cret")
+
+    assert handle_webhook("push", "d1", body, "sha256=bad", json.loads(body))[1] == 401
+    response, status = handle_webhook("push", "d1", body, sign_payload("s3cret", body), json.loads(body))
+    assert status == 200 and response["reason"] == "repository is not registered"
+    monkeypatch.setattr(webhooks, "GITHUB_WEBHOOK_SECRET", "")
+    assert handle_webhook("ping", None, b"{}", sign_payload("", b"{}"), {})[1] == 503
+
+
+def test_prefetch_serves_the_next_verification_from_cache(tmp_path, monkeypatch) -> None:
+    repo_dir = tmp_path / "octo" / "pushed"
+    repo_dir.mkdir(parents=True)
+    (repo_dir / "app.py").write_text("print('new commit')\n")
+    source = sources.LocalDirectorySource(str(tmp_path))
+    sources.set_source(source)
+    try:
+        lane = PrefetchLane(prescore=False)
+        push = parse_push(synthetic_push("octo/pushed"))
+        assert lane.accept("delivery-1", push)
+        assert not lane.accept("delivery-1", push)
+        outcome = asyncio.run(lane.process(push, ["Python Backend"]))
+
+        async def no_fetch(tree, paths):
+            raise AssertionError("content should come from the prefetch cache")
+
+        monkeypatch.setattr(source, "fetch_contents", no_fetch)
+        tree = asyncio.run(source.fetch_tree("https://github.com/octo/pushed"))
+        files = asyncio.run(code_verifier.fetch_contents_cached(source, tree, ["app.py"]))
+    finally:
+        sources.set_source(None)
+
+    assert outcome["prefetched_files"] == 1
+    assert files == {"app.py": "print('new commit')\n"}
+    assert lane.stats["duplicates"] == 1
+
+
+def test_prefetch_fetches_the_pushed_commit(tmp_path) -> None:
+    (tmp_path / "octo" / "pushed").mkdir(parents=True)
+    refs = []
+
+    class RecordingSource(sources.LocalDirectorySource):
+        async def fetch_tree(self, github_url, ref=None):
+            refs.append(ref)
+            return await super().fetch_tree(github_url, ref)
+
+    sources.set_source(RecordingSource(str(tmp_path)))
+    try:
+        push = parse_push(synthetic_push("octo/pushed", after="b" * 40))
+        asyncio.run(PrefetchLane(prescore=False).process(push, []))
+    finally:
+        sources.set_source(None)
+
+    assert refs == ["b" * 40]
+
+
+def test_priority_gate_sees_interactive_calls_on_other_loops(monkeypatch) -> None:
+    import async_runtime
+
+    monkeypatch.setattr(async_runtime, "LLM_CONCURRENCY", 1)
+
+    async def hold(seen):
+        async with async_runtime.llm_slot():
+            # Checked from the shared background loop, as the prefetch lane does
+            seen.append(async_runtime.submit(busy()).result(1))
+
+    async def busy():
+        return async_runtime.llm_busy()
+
+    async def background_hold(seen):
+        with async_runtime.low_priority():
+            await hold(seen)
+
+    interactive, background = [], []
+    asyncio.run(hold(interactive))
+    asyncio.run(background_hold(background))
+
+    assert interactive == [True]
+    assert background == [False]
+    assert not async_runtime.llm_busy()
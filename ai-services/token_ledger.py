@@ -0,0 +1,321 @@
+"""
+CertifyMe Token Ledger
+Rolling-window record of LLM token spend (prompt and completion) per tenant,
+skill and model, with budgets and admission control for the LLM stage.
+
+Budgets are tokens per TOKEN_BUDGET_WINDOW_SECONDS, globally, per tenant and per
+skill (0 = unlimited). Before an analysis is sent to the model its cost is
+estimated and checked against every budget that applies; the fullest one decides:
+
+  below ADMISSION_CHEAP_AT   full   — OPENROUTER_MODEL
+  below ADMISSION_STATIC_AT  cheap  — OPENROUTER_CHEAP_MODEL (full if none is set)
+  otherwise                  queue  — wait up to ADMISSION_MAX_QUEUE_SECONDS for
+                                      the window to roll or in-flight calls to settle,
+                                      then static — a provisional pre-score from local
+                                      static analysis and cached per-file scores
+
+Admitted calls hold their estimate as a reservation until the actual usage is known.
+
+A request is charged to a named tenant only if it presents that tenant's key
+(TENANT_API_KEYS); everything else shares DEFAULT_TENANT's budget, so renaming the
+tenant per request cannot get around a budget.
+"""
+
+import os
+import hmac
+import time
+import asyncio
+import threading
+from collections import deque
+
+TOKEN_BUDGET_WINDOW_SECONDS = int(os.getenv("TOKEN_BUDGET_WINDOW_SECONDS", "3600"))
+TOKEN_BUDGET_GLOBAL = int(os.getenv("TOKEN_BUDGET_GLOBAL") or 0)
+TOKEN_BUDGET_PER_TENANT = int(os.getenv("TOKEN_BUDGET_PER_TENANT") or 0)
+TOKEN_BUDGET_PER_SKILL = int(os.getenv("TOKEN_BUDGET_PER_SKILL") or 0)
+# Per-tenant overrides: "campus-a=500000,campus-b=100000"
+TOKEN_BUDGET_TENANTS = os.getenv("TOKEN_BUDGET_TENANTS", "")
+# Tenant credentials: "campus-a=<key>,campus-b=<key>", presented in X-CertifyMe-Tenant-Key
+TENANT_API_KEYS = os.getenv("TENANT_API_KEYS", "")
+
+ADMISSION_CHEAP_AT = float(os.getenv("ADMISSION_CHEAP_AT", "0.8"))
+ADMISSION_STATIC_AT = float(os.getenv("ADMISSION_STATIC_AT", "0.95"))
+ADMISSION_MAX_QUEUE_SECONDS = float(os.getenv("ADMISSION_MAX_QUEUE_SECONDS", "10"))
+ADMISSION_POLL_SECONDS = 0.5
+OPENROUTER_CHEAP_MODEL = os.getenv("OPENROUTER_CHEAP_MODEL", "")
+
+TENANT_HEADER = "X-CertifyMe-Tenant"
+TENANT_KEY_HEADER = "X-CertifyMe-Tenant-Key"
+DEFAULT_TENANT = "default"
+# Resolution of the rolling window
+WINDOW_BUCKETS = 60
+# Span the burn rate is measured over
+BURN_RATE_SECONDS = 300
+
+
+def parse_tenant_budgets(value: str) -> dict:
+    budgets = {}
+    for item in value.split(","):
+        name, _, limit = item.partition("=")
+        if name.strip() and limit.strip():
+            budgets[name.strip().lower()] = int(limit)
+    return budgets
+
+
+def parse_tenant_keys(value: str) -> dict:
+    keys = {}
+    for item in value.split(","):
+        name, _, key = item.partition("=")
+        if name.strip() and key.strip():
+            keys[name.strip().lower()] = key.strip()
+    return keys
+
+
+def parse_tenant(headers, body: dict | None, keys: dict | None = None) -> str:
+    """
+    Tenant from the X-CertifyMe-Tenant header or the body's tenant field (header wins),
+    accepted only with that tenant's key (keys, default TENANT_API_KEYS) in the
+    X-CertifyMe-Tenant-Key header. Unnamed, unknown or unauthenticated requests get DEFAULT_TENANT.
+    """
+    keys = parse_tenant_keys(TENANT_API_KEYS) if keys is None else keys
+    raw = headers.get(TENANT_HEADER) or headers.get(TENANT_HEADER.lower())
+    if not raw and body:
+        raw = body.get("tenant")
+    tenant = str(raw or "").strip().lower()[:64]
+    expected = keys.get(tenant)
+    presented = headers.get(TENANT_KEY_HEADER) or headers.get(TENANT_KEY_HEADER.lower()) or ""
+    if expected is None or not hmac.compare_digest(str(presented).encode(), expected.encode()):
+        return DEFAULT_TENANT
+    return tenant
+
+
+def estimate_tokens(messages: list, max_completion_tokens: int) -> int:
+    """Upper estimate for a chat call: ~4 characters per prompt token plus the completion cap."""
+    return sum(len(m.get("content") or "") for m in messages) // 4 + max_completion_tokens
+
+
+class RollingWindow:
+    """Token counts over the last window_seconds, in WINDOW_BUCKETS time buckets."""
+
+    def __init__(self, window_seconds: int, buckets: int = WINDOW_BUCKETS):
+        self.bucket_seconds = window_seconds / buckets
+        self.buckets = buckets
+        self._entries = deque()  # [bucket index, prompt, completion, calls]
+        self.prompt = 0
+        self.completion = 0
+        self.calls = 0
+
+    def _evict(self, now: float) -> int:
+        index = int(now // self.bucket_seconds)
+        while self._entries and self._entries[0][0] <= index - self.buckets:
+            _, prompt, completion, calls = self._entries.popleft()
+            self.prompt -= prompt
+            self.completion -= completion
+            self.calls -= calls
+        return index
+
+    def add(self, prompt: int, completion: int, now: float) -> None:
+        index = self._evict(now)
+        if self._entries and self._entries[-1][0] == index:
+            entry = self._entries[-1]
+        else:
+            entry = [index, 0, 0, 0]
+            self._entries.append(entry)
+        entry[1] += prompt
+        entry[2] += completion
+        entry[3] += 1
+        self.prompt += prompt
+        self.completion += completion
+        self.calls += 1
+
+    def total(self, now: float) -> int:
+        self._evict(now)
+        return self.prompt + self.completion
+
+    def recent(self, now: float, seconds: float) -> int:
+        """Tokens spent in roughly the last `seconds` (whole buckets)."""
+        index = self._evict(now)
+        first = index - max(1, round(seconds / self.bucket_seconds)) + 1
+        return sum(prompt + completion for i, prompt, completion, _ in self._entries if i >= first)
+
+
+class TokenLedger:
+    """Token spend per scope ("global", "tenant", "skill", "model") with budgets and reservations."""
+
+    def __init__(self, window_seconds: int = TOKEN_BUDGET_WINDOW_SECONDS, global_budget: int = TOKEN_BUDGET_GLOBAL,
+                 tenant_budget: int = TOKEN_BUDGET_PER_TENANT, skill_budget: int = TOKEN_BUDGET_PER_SKILL,
+                 tenant_budgets: dict | None = None, cheap_model: str = OPENROUTER_CHEAP_MODEL,
+                 clock=time.time):
+        self.window_seconds = window_seconds
+        self.global_budget = global_budget
+        self.tenant_budget = tenant_budget
+        self.skill_budget = skill_budget
+        self.tenant_budgets = parse_tenant_budgets(TOKEN_BUDGET_TENANTS) if tenant_budgets is None else tenant_budgets
+        self.cheap_model = cheap_model
+        self.clock = clock
+        # Final decisions, plus how many admissions had to queue first
+        self.decisions = {"full": 0, "cheap": 0, "static": 0, "queued": 0}
+        self._windows = {}
+        self._reserved = {}
+        self._lock = threading.Lock()
+
+    # ── Accounting ──
+
+    @staticmethod
+    def _scopes(tenant: str | None, skill: str | None) -> list:
+        return [("global", ""), ("tenant", (tenant or DEFAULT_TENANT).lower()), ("skill", (skill or "").lower())]
+
+    def limit(self, scope: str, name: str) -> int:
+        if scope == "global":
+            return self.global_budget
+        if scope == "tenant":
+            return self.tenant_budgets.get(name, self.tenant_budget)
+        if scope == "skill":
+            return self.skill_budget
+        return 0
+
+    def _window(self, key: tuple) -> RollingWindow:
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = RollingWindow(self.window_seconds)
+        return window
+
+    def record(self, tenant: str | None, skill: str | None, model: str | None,
+               prompt_tokens: int, completion_tokens: int, at: float | None = None) -> None:
+        """Add one LLM call's actual usage to every scope it belongs to."""
+        now = self.clock() if at is None else at
+        with self._lock:
+            for key in self._scopes(tenant, skill) + [("model", model or "unknown")]:
+                self._window(key).add(prompt_tokens, completion_tokens, now)
+
+    def load(self, rows) -> int:
+        """Replay (created_at, tenant, skill, model, prompt_tokens, completion_tokens) rows, e.g. from history."""
+        count = 0
+        for created_at, tenant, skill, model, prompt, completion in rows:
+            self.record(tenant, skill, model, prompt or 0, completion or 0, at=created_at)
+            count += 1
+        return count
+
+    def utilization(self, tenant: str | None, skill: str | None, extra: int = 0) -> tuple[float, str | None]:
+        """
+        Highest (spent + reserved + extra) / budget over the budgets that apply,
+        and the scope it belongs to ("tenant:campus-a"); (0.0, None) when none are set.
+        """
+        now = self.clock()
+        worst, worst_scope = 0.0, None
+        with self._lock:
+            for key in self._scopes(tenant, skill):
+                limit = self.limit(*key)
+                if not limit:
+                    continue
+                window = self._windows.get(key)
+                used = (window.total(now) if window else 0) + self._reserved.get(key, 0) + extra
+                if used / limit > worst or worst_scope is None:
+                    worst, worst_scope = used / limit, f"{key[0]}:{key[1]}" if key[1] else key[0]
+        return worst, worst_scope
+
+    # ── Admission ──
+
+    def decide(self, tenant: str | None, skill: str | None, estimate: int) -> dict:
+        """Admission decision for a call of `estimate` tokens, without queueing."""
+        utilization, scope = self.utilization(tenant, skill, estimate)
+        if utilization < ADMISSION_CHEAP_AT:
+            decision = "full"
+        elif utilization < ADMISSION_STATIC_AT:
+            decision = "cheap" if self.cheap_model else "full"
+        else:
+            decision = "queue"
+        return {"decision": decision, "utilization": round(utilization, 4), "scope": scope}
+
+    async def admit(self, tenant: str | None, skill: str | None, estimate: int,
+                    max_wait: float = ADMISSION_MAX_QUEUE_SECONDS) -> dict:
+        """
+        Decide how to run an LLM call, queueing while budgets are nearly spent.
+        Returns {"decision", "model", "utilization", "scope", "queued_ms", ...};
+        full and cheap admissions reserve `estimate` tokens until settle().
+        """
+        started = time.monotonic()
+        admission = self.decide(tenant, skill, estimate)
+        queued = admission["decision"] == "queue"
+        while admission["decision"] == "queue" and time.monotonic() - started < max_wait:
+            await asyncio.sleep(min(ADMISSION_POLL_SECONDS, max(0.0, max_wait - (time.monotonic() - started))))
+            admission = self.decide(tenant, skill, estimate)
+        if admission["decision"] == "queue":
+            admission["decision"] = "static"
+        admission["queued_ms"] = round((time.monotonic() - started) * 1000, 1)
+        admission["model"] = self.cheap_model if admission["decision"] == "cheap" else None
+        admission["tenant"] = tenant
+        admission["skill"] = skill
+        admission["reserved"] = estimate if admission["decision"] in ("full", "cheap") else 0
+        with self._lock:
+            self.decisions[admission["decision"]] += 1
+            self.decisions["queued"] += queued
+            for key in self._scopes(tenant, skill):
+                self._reserved[key] = self._reserved.get(key, 0) + admission["reserved"]
+        return admission
+
+    def settle(self, admission: dict) -> None:
+        """Release an admission's reservation (actual usage is recorded separately)."""
+        reserved, admission["reserved"] = admission.get("reserved", 0), 0
+        if not reserved:
+            return
+        with self._lock:
+            for key in self._scopes(admission.get("tenant"), admission.get("skill")):
+                self._reserved[key] = max(0, self._reserved.get(key, 0) - reserved)
+
+    # ── Reporting ──
+
+    def report(self, tenant: str | None = None, skill: str | None = None) -> dict:
+        """
+        Spend, budget and burn rate per scope. burn_rate is tokens/minute over the last
+        BURN_RATE_SECONDS; exhausted_in_seconds projects when a budget runs out at that rate.
+        """
+        now = self.clock()
+        scopes = []
+        with self._lock:
+            for (scope, name), window in sorted(self._windows.items()):
+                if (tenant and scope == "tenant" and name != tenant.lower()) or \
+                        (skill and scope == "skill" and name != skill.lower()):
+                    continue
+                used = window.total(now)
+                burn = window.recent(now, BURN_RATE_SECONDS) * 60 / BURN_RATE_SECONDS
+                limit = self.limit(scope, name)
+                reserved = self._reserved.get((scope, name), 0)
+                entry = {
+                    "scope": scope,
+                    "name": name,
+                    "prompt_tokens": window.prompt,
+                    "completion_tokens": window.completion,
+                    "total_tokens": used,
+                    "llm_calls": window.calls,
+                    "reserved_tokens": reserved,
+                    "burn_rate_per_minute": round(burn, 1),
+                    "budget": limit or None,
+                    "utilization": round((used + reserved) / limit, 4) if limit else None,
+                    "exhausted_in_seconds": None,
+                }
+                if limit and burn > 0:
+                    entry["exhausted_in_seconds"] = round(max(0, limit - used - reserved) / burn * 60)
+                scopes.append(entry)
+            decisions = dict(self.decisions)
+        return {"window_seconds": self.window_seconds, "scopes": scopes, "decisions": decisions}
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> TokenLedger:
+    """Process-wide ledger, seeded with the current window's usage from the history store."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                from history_store import get_history
+
+                ledger = TokenLedger()
+                try:
+                    ledger.load(get_history().token_usage_since(time.time() - ledger.window_seconds))
+                except Exception as e:
+                    print(f"Warning: could not seed token ledger from history: {e}")
+                _ledger = ledger
+    return _ledger
@@ -0,0 +1,97 @@
+"""
+CertifyMe Warm-up
+Pays cold-start costs before the service reports ready: importing the HTTP/LLM
+client libraries, constructing the OpenRouter client, and opening pooled DNS/TLS
+connections to the hosts the first verification will hit.
+Also measures time-to-first-successful-verification.
+"""
+
+import time
+import asyncio
+import threading
+
+# Service start reference for the cold-start metrics (this module is imported first by app.py)
+STARTED_AT = time.perf_counter()
+
+_lock = threading.Lock()
+_state = {
+    "ready": False,
+    "warming": False,
+    "error": None,
+    "timings_ms": {},
+    "first_verification_ms": None,
+}
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+async def warm_up_async() -> dict:
+    """
+    Run every warm-up step concurrently on the running event loop (whose pooled clients
+    will serve requests) and mark the service ready.
+    A failing step is recorded but does not block readiness — the request path
+    falls back to doing the same work lazily.
+    """
+    import code_verifier
+    from sources import get_source
+
+    with _lock:
+        _state["warming"] = True
+
+    steps = {
+        "source": get_source().warm_up,
+        "llm_client": code_verifier.warm_up_client,
+    }
+    timings = {}
+    errors = []
+
+    async def timed(name, step):
+        t0 = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+        timings[name] = _elapsed_ms(t0)
+
+    await asyncio.gather(*(timed(name, step) for name, step in steps.items()))
+
+    with _lock:
+        _state.update({
+            "ready": True,
+            "warming": False,
+            "error": "; ".join(errors) or None,
+            "timings_ms": {**timings, "since_start": _elapsed_ms(STARTED_AT)},
+        })
+        print(f"Warm-up complete in {_state['timings_ms']['since_start']} ms since start {timings}")
+        return dict(_state)
+
+
+def run_warmup() -> dict:
+    """Warm up the shared background loop used by synchronous (Flask) callers."""
+    from async_runtime import run_sync
+    return run_sync(warm_up_async())
+
+
+def start_warmup() -> threading.Thread:
+    """Run warm-up on a daemon thread so the server can bind its port meanwhile."""
+    thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def record_verification_success() -> None:
+    """Record time-to-first-successful-verification (first call wins)."""
+    if _state["first_verification_ms"] is not None:
+        return
+    with _lock:
+        if _state["first_verification_ms"] is None:
+            _state["first_verification_ms"] = _elapsed_ms(STARTED_AT)
+            print(f"First successful verification {_state['first_verification_ms']} ms after start")
+
+
+def readiness() -> dict:
+    """Snapshot of warm-up state for the /ready endpoint."""
+    with _lock:
+        return {**_state, "timings_ms": dict(_state["timings_ms"])}
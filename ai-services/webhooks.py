@@ -0,0 +1,187 @@
+"""
+CertifyMe GitHub Webhooks
+Turns push events into cache warm-up, so the student's next verification of that
+commit skips the cold fetch (and, with pre-scoring on, the LLM call too).
+
+Only pushes to the default branch of registered repos are acted on. A repo is
+registered once it has been verified here (verification history) or if it is
+listed in WEBHOOK_REPOS. Work runs in a low-priority lane on the pushed commit, one
+push at a time: pre-scoring waits while interactive verifications on any event loop
+hold every LLM slot, and is skipped once token budgets are past ADMISSION_CHEAP_AT
+(token_ledger.py).
+"""
+
+import os
+import hmac
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+# Also score the pushed tree for each skill the repo was verified for (spends LLM tokens)
+WEBHOOK_PRESCORE = os.getenv("WEBHOOK_PRESCORE", "false").lower() == "true"
+WEBHOOK_REPOS = {r.strip().lower() for r in os.getenv("WEBHOOK_REPOS", "").split(",") if r.strip()}
+# Queued pushes beyond this are dropped; the next verification just fetches cold
+MAX_QUEUED_PUSHES = 1000
+# Deliveries remembered for deduplicating GitHub's redeliveries
+MAX_SEEN_DELIVERIES = 10_000
+# Poll interval while interactive traffic saturates the LLM slots (async_runtime.llm_busy)
+PRESCORE_BACKOFF_SECONDS = 0.5
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """X-Hub-Signature-256 value for a body (as GitHub computes it)."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature_header: str | None) -> bool:
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature_header)
+
+
+def parse_push(payload: dict) -> dict | None:
+    """
+    {"repo", "github_url", "after", "ref"} for a push to the default branch,
+    None for other branches, tags and branch deletions.
+    """
+    repository = payload.get("repository") or {}
+    full_name = repository.get("full_name")
+    default_branch = repository.get("default_branch") or repository.get("master_branch") or "main"
+    if not full_name or payload.get("deleted") or payload.get("ref") != f"refs/heads/{default_branch}":
+        return None
+    return {
+        "repo": full_name.lower(),
+        "github_url": repository.get("html_url") or f"https://github.com/{full_name}",
+        "after": payload.get("after"),
+        "ref": default_branch,
+    }
+
+
+def registered_skills(repo: str) -> list | None:
+    """Skills to pre-score for a repo; None if the repo is not registered."""
+    from history_store import get_history
+
+    skills = get_history().skills_for_repo(repo)
+    if skills or repo in WEBHOOK_REPOS:
+        return skills
+    return None
+
+
+class PrefetchLane:
+    """Background lane that prefetches (and optionally pre-scores) pushed trees, one push at a time."""
+
+    def __init__(self, prescore: bool = WEBHOOK_PRESCORE, max_queued: int = MAX_QUEUED_PUSHES):
+        self.prescore = prescore
+        self.max_queued = max_queued
+        self.stats = {"queued": 0, "dropped": 0, "duplicates": 0, "prefetched_files": 0, "prescored": 0,
+                      "prescore_skipped": 0, "failed": 0}
+        self._seen = OrderedDict()
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    def accept(self, delivery_id: str | None, push: dict) -> bool:
+        """Record a delivery; False if it is a redelivery or the lane is full."""
+        key = delivery_id or f"{push['repo']}@{push['after']}"
+        with self._lock:
+            if key in self._seen:
+                self.stats["duplicates"] += 1
+                return False
+            self._seen[key] = True
+            while len(self._seen) > MAX_SEEN_DELIVERIES:
+                self._seen.popitem(last=False)
+            if self._queued >= self.max_queued:
+                self.stats["dropped"] += 1
+                return False
+            self._queued += 1
+            self.stats["queued"] += 1
+        return True
+
+    async def process(self, push: dict, skills: list) -> dict:
+        """Fetch the pushed tree and any uncached file contents, then pre-score if enabled."""
+        from async_runtime import llm_busy, loop_local, low_priority
+        from code_verifier import analysis_cache, fetch_contents_cached, verify_code_async
+        from sources import get_source
+        from token_ledger import ADMISSION_CHEAP_AT, get_ledger
+
+        serial = loop_local("webhook_lane", asyncio.Lock)
+        try:
+            async with serial:
+                source = get_source()
+                # The pushed commit, not whatever the branch points at by the time this runs
+                tree = await source.fetch_tree(push["github_url"], push["after"])
+                cached = await analysis_cache.offload(analysis_cache.get_contents, tree["blobs"])
+                missing = [path for path in tree["blobs"] if path not in cached]
+                if missing:
+                    await fetch_contents_cached(source, tree, missing)
+                self.stats["prefetched_files"] += len(missing)
+
+                prescored = []
+                if self.prescore:
+                    for skill in skills:
+                        # Speculative spend only while budgets have headroom
+                        if get_ledger().utilization(None, skill)[0] >= ADMISSION_CHEAP_AT:
+                            self.stats["prescore_skipped"] += 1
+                            continue
+                        # Low priority: stay out of the way of interactive verifications
+                        while llm_busy():
+                            await asyncio.sleep(PRESCORE_BACKOFF_SECONDS)
+                        with low_priority():
+                            await verify_code_async(push["github_url"], skill, record_history=False, ref=push["after"])
+                        prescored.append(skill)
+                    self.stats["prescored"] += len(prescored)
+                return {"tree_sha": tree["tree_sha"], "prefetched_files": len(missing), "prescored": prescored}
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"Warning: webhook prefetch failed for {push['repo']}: {e}")
+            return {"error": str(e)}
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+
+_lane = None
+_lane_lock = threading.Lock()
+
+
+def get_lane() -> PrefetchLane:
+    global _lane
+    if _lane is None:
+        with _lane_lock:
+            if _lane is None:
+                _lane = PrefetchLane()
+    return _lane
+
+
+def handle_webhook(event: str, delivery_id: str | None, body: bytes, signature: str | None,
+                   payload: dict | None) -> tuple[dict, int]:
+    """
+    Validate and dispatch one GitHub delivery; work is scheduled on the background
+    loop and the response returns immediately. Returns (response_body, http_status).
+    """
+    if not GITHUB_WEBHOOK_SECRET:
+        return {"error": "Webhook receiver is not configured (GITHUB_WEBHOOK_SECRET)"}, 503
+    if not verify_signature(GITHUB_WEBHOOK_SECRET, body, signature):
+        return {"error": "Invalid signature"}, 401
+    if event == "ping":
+        return {"status": "pong"}, 200
+    if event != "push":
+        return {"status": "ignored", "reason": f"event {event!r} not handled"}, 200
+    if not isinstance(payload, dict):
+        return {"error": "Invalid JSON payload"}, 400
+
+    push = parse_push(payload)
+    if push is None:
+        return {"status": "ignored", "reason": "not a push to the default branch"}, 200
+    skills = registered_skills(push["repo"])
+    if skills is None:
+        return {"status": "ignored", "reason": "repository is not registered"}, 200
+
+    lane = get_lane()
+    if not lane.accept(delivery_id, push):
+        return {"status": "ignored", "reason": "duplicate delivery or lane full"}, 200
+
+    from async_runtime import submit
+    submit(lane.process(push, skills))
+    return {"status": "queued", "repo": push["repo"], "after": push["after"], "prescore": lane.prescore}, 202
@@ -0,0 +1,439 @@
+"""
+Simulate benchmarks for every ABI method of CertifyMe, Bank and Counter.
+
+deploy() creates fresh apps on localnet from the built artifacts (run the build
+first) and seeds them: registries, v1 and v2 certificates, a revocation, a Merkle
+cohort (half of it claimed) and a Bank deposit. run() then simulates each case in CASES as one atomic
+group and records:
+
+  opcodes            app budget consumed by the group
+  box_bytes_read     size before the call of every box the group touched (what the
+                     box I/O quota of 1KB per reference is charged for)
+  box_bytes_written  size after the call of every box the group wrote
+  mbr_delta          change of the app account's minimum balance from boxes
+                     created, resized or deleted (microAlgos)
+  fee                minimum fee: one per transaction and per inner transaction
+
+Simulate commits nothing, so every case runs against the same seeded state.
+compare() checks results against JSON baselines (tests/benchmark_baselines.json)
+and reports every metric that grew past the tolerance; cases without a baseline
+are listed by unbaselined() instead. Record the baselines on LocalNet with
+UPDATE_COMMAND and commit the file.
+"""
+
+import base64
+import hashlib
+import json
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from algosdk import abi, account, encoding
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    EmptySigner,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.error import AlgodHTTPError
+from algosdk.logic import get_application_address
+from algosdk.transaction import ApplicationCreateTxn, OnComplete, PaymentTxn, StateSchema, wait_for_confirmation
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest, SimulateTraceConfig
+
+from smart_contracts.certifyme.abi import record_values, v1_recipient_key, v2_values
+from smart_contracts.certifyme.batching import BOX_BYTE_MBR, BOX_FLAT_MBR
+from smart_contracts.certifyme.layout import to_v2
+from smart_contracts.certifyme.merkle import Cohort, issue_leaves
+from smart_contracts.certifyme.verification import SIMULATE_EXTRA_OPCODE_BUDGET
+
+ARTIFACTS = Path(__file__).parent / "artifacts"
+CONTRACTS = {"CertifyMe": "certifyme", "Bank": "bank", "Counter": "counter"}
+METRICS = ("opcodes", "box_bytes_read", "box_bytes_written", "mbr_delta", "fee")
+# Allowed growth over the baseline, relative, with a small absolute floor so that
+# zero baselines (no boxes, no MBR change) still need an actual regression to fail
+DEFAULT_TOLERANCE = 0.05
+ABSOLUTE_TOLERANCE = {"opcodes": 5, "box_bytes_read": 0, "box_bytes_written": 0, "mbr_delta": 0, "fee": 0}
+APP_FUNDING = 5_000_000
+# Rewrites tests/benchmark_baselines.json (LocalNet running, contracts built)
+UPDATE_COMMAND = "BENCHMARK_UPDATE=1 pytest tests/benchmark_test.py::test_costs_within_baselines"
+COHORT_SIZE = 1000
+# Cohort leaves claimed during setup; the issue case claims the next one
+COHORT_ISSUED = 500
+
+Measurement = dict[str, int]
+
+
+def load_spec(contract: str) -> dict[str, Any]:
+    path = ARTIFACTS / CONTRACTS[contract] / f"{contract}.arc56.json"
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found; build the contracts first")
+    return json.loads(path.read_text())  # type: ignore[no-any-return]
+
+
+def abi_methods(spec: Mapping[str, Any]) -> dict[str, abi.Method]:
+    """Every ABI method of an ARC-56 spec, by name."""
+    methods = {}
+    for method in spec["methods"]:
+        args = ",".join(arg["type"] for arg in method["args"])
+        methods[method["name"]] = abi.Method.from_signature(f"{method['name']}({args}){method['returns']['type']}")
+    return methods
+
+
+# ── Seeded state ──
+
+
+@dataclass
+class Bench:
+    """Deployed apps and the state the cases refer to."""
+
+    algod: AlgodClient
+    sender: str
+    signer: TransactionSigner
+    other: str
+    app_ids: dict[str, int]
+    methods: dict[str, dict[str, abi.Method]]
+    record: dict[str, Any]
+    certificate: dict[str, Any]
+    cohort: Cohort
+
+
+def _record(recipient: str, metadata_url: str = "ipfs://QmMetadata") -> dict[str, Any]:
+    return {
+        "recipient": recipient,
+        "skill": "Python Backend",
+        "skill_level": "Advanced",
+        "ai_score": 80,
+        "evidence_hash": "Qm" + "e" * 44,
+        "issuer": "CertifyMe",
+        "issue_date": "2026-10-19",
+        "metadata_url": metadata_url,
+    }
+
+
+def _compose(
+    bench: Bench,
+    contract: str,
+    method: str,
+    args: Sequence[Any],
+    signer: TransactionSigner,
+    sender: str | None = None,
+    boxes: Sequence[bytes] = (),
+) -> AtomicTransactionComposer:
+    sp = bench.algod.suggested_params()
+    # Covers one inner transaction (Bank.withdraw); simulate reports the minimum anyway
+    sp.flat_fee, sp.fee = True, 2 * sp.min_fee
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=bench.app_ids[contract],
+        method=bench.methods[contract][method],
+        sender=sender or bench.sender,
+        sp=sp,
+        signer=signer,
+        method_args=list(args),
+        boxes=[(0, box) for box in boxes],
+    )
+    return atc
+
+
+def _send(bench: Bench, contract: str, method: str, args: Sequence[Any]) -> Any:
+    """Send a setup call, referencing the boxes a simulated run of it touched."""
+    group = _simulate(bench.algod, _compose(bench, contract, method, args, EmptySigner()))
+    boxes = [name for _, name in _touched_boxes(group)]
+    result = _compose(bench, contract, method, args, bench.signer, boxes=boxes).execute(bench.algod, 4)
+    return result.abi_results[0].return_value
+
+
+def _create_app(algod: AlgodClient, sender: str, signer: TransactionSigner, spec: Mapping[str, Any]) -> int:
+    approval = base64.b64decode(spec["byteCode"]["approval"])
+    clear = base64.b64decode(spec["byteCode"]["clear"])
+    schema = spec["state"]["schema"]
+    txn = ApplicationCreateTxn(
+        sender=sender,
+        sp=algod.suggested_params(),
+        on_complete=OnComplete.NoOpOC,
+        approval_program=approval,
+        clear_program=clear,
+        global_schema=StateSchema(schema["global"]["ints"], schema["global"]["bytes"]),
+        local_schema=StateSchema(schema["local"]["ints"], schema["local"]["bytes"]),
+        extra_pages=(len(approval) + len(clear) - 1) // 2048,
+    )
+    atc = AtomicTransactionComposer()
+    atc.add_transaction(TransactionWithSigner(txn, signer))
+    txid = atc.execute(algod, 4).tx_ids[0]
+    return int(wait_for_confirmation(algod, txid)["application-index"])
+
+
+def _pay(algod: AlgodClient, sender: str, signer: TransactionSigner, receiver: str, amount: int) -> None:
+    atc = AtomicTransactionComposer()
+    atc.add_transaction(TransactionWithSigner(PaymentTxn(sender, algod.suggested_params(), receiver, amount), signer))
+    atc.execute(algod, 4)
+
+
+def _deposit(bench: Bench, sender: str, amount: int, signer: TransactionSigner) -> TransactionWithSigner:
+    receiver = get_application_address(bench.app_ids["Bank"])
+    return TransactionWithSigner(PaymentTxn(sender, bench.algod.suggested_params(), receiver, amount), signer)
+
+
+def deploy(algod: AlgodClient, sender: str, signer: TransactionSigner) -> Bench:
+    """Create and fund fresh apps from the artifacts and seed the state the cases use."""
+    specs = {contract: load_spec(contract) for contract in CONTRACTS}
+    app_ids = {contract: _create_app(algod, sender, signer, spec) for contract, spec in specs.items()}
+    for app_id in app_ids.values():
+        _pay(algod, sender, signer, get_application_address(app_id), APP_FUNDING)
+    # Deposits from a second account (simulated with empty signatures, so no key is kept)
+    other = account.generate_account()[1]
+    _pay(algod, sender, signer, other, 2_000_000)
+
+    record = _record(sender)
+    certificate = to_v2(record, {"Python Backend": 0}, {"CertifyMe": 0})
+    certificates = [{**certificate, "ai_score": 60 + i % 40} for i in range(COHORT_SIZE)]
+    bench = Bench(
+        algod=algod,
+        sender=sender,
+        signer=signer,
+        other=other,
+        app_ids=app_ids,
+        methods={contract: abi_methods(spec) for contract, spec in specs.items()},
+        record=record,
+        certificate=certificate,
+        cohort=Cohort(certificates, first_id=3),
+    )
+
+    _send(bench, "CertifyMe", "register_issuer", ["CertifyMe"])
+    _send(bench, "CertifyMe", "register_skill", ["Python Backend", 50])
+    _send(bench, "CertifyMe", "mint_certificate", record_values(record))  # 0
+    _send(bench, "CertifyMe", "mint_certificate", record_values(record))  # 1, revoked
+    _send(bench, "CertifyMe", "mint_certificate_v2", [v2_values(certificate)])  # 2
+    _send(bench, "CertifyMe", "revoke_certificate", [1])
+    # 3 .. 3 + COHORT_SIZE - 1
+    _send(bench, "CertifyMe", "commit_cohort_root", [bench.cohort.root, 3, COHORT_SIZE])
+    claimed = range(bench.cohort.first_id, bench.cohort.first_id + COHORT_ISSUED)
+    issue_leaves(algod, app_ids["CertifyMe"], sender, signer, 0, bench.cohort, claimed)
+    deposit = ["seed", _deposit(bench, sender, 1_000_000, signer)]
+    _compose(bench, "Bank", "deposit", deposit, signer, boxes=[encoding.decode_address(sender)]).execute(algod, 4)
+    return bench
+
+
+# ── Cases ──
+
+
+@dataclass(frozen=True)
+class Case:
+    contract: str
+    method: str
+    label: str
+    args: Callable[[Bench], list[Any]]
+    sender: Callable[[Bench], str] | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.contract}.{self.method}[{self.label}]"
+
+
+def _next_id(bench: Bench) -> int:
+    return bench.cohort.first_id + len(bench.cohort.certificates)
+
+
+CASES = [
+    Case("CertifyMe", "mint_certificate", "typical", lambda b: record_values(b.record)),
+    Case("CertifyMe", "mint_certificate", "new_recipient", lambda b: record_values(_record(b.other))),
+    Case(
+        "CertifyMe",
+        "mint_certificate",
+        "600b_metadata_url",
+        lambda b: record_values(_record(b.sender, "ipfs://" + "m" * 600)),
+    ),
+    Case("CertifyMe", "mint_certificates_batch", "3", lambda b: [[record_values(b.record)] * 3]),
+    Case("CertifyMe", "mint_certificate_v2", "typical", lambda b: [v2_values(b.certificate)]),
+    Case("CertifyMe", "mint_certificates_batch_v2", "4", lambda b: [[v2_values(b.certificate)] * 4]),
+    Case("CertifyMe", "migrate_certificate", "v1", lambda b: [0, v2_values(b.certificate)]),
+    Case("CertifyMe", "get_certificate", "v1", lambda b: [0]),
+    Case("CertifyMe", "get_certificate_v2", "v2", lambda b: [2]),
+    Case("CertifyMe", "get_certificate_count", "", lambda b: []),
+    Case("CertifyMe", "get_certificates", "16", lambda b: [0, 16]),
+    Case("CertifyMe", "get_certificates_by_recipient", "v1", lambda b: [v1_recipient_key(b.sender), 0]),
+    Case("CertifyMe", "verify_certificate", "valid", lambda b: [0]),
+    Case("CertifyMe", "verify_certificate", "revoked", lambda b: [1]),
+    Case("CertifyMe", "verify_certificate", "cohort", lambda b: [500]),
+    Case("CertifyMe", "verify_certificates", "255", lambda b: [list(range(255))]),
+    Case("CertifyMe", "revoke_certificate", "", lambda b: [0]),
+    Case("CertifyMe", "revoke_batch", "64", lambda b: [list(range(64))]),
+    Case("CertifyMe", "revoke_bitmap", "1000", lambda b: [0, b"\xff" * (COHORT_SIZE // 8)]),
+    Case(
+        "CertifyMe",
+        "commit_cohort_root",
+        "10000",
+        lambda b: [hashlib.sha256(b"cohort").digest(), _next_id(b), 10_000],
+    ),
+    Case(
+        "CertifyMe",
+        "issue_cohort_certificate",
+        str(COHORT_SIZE),
+        lambda b: [
+            0,
+            b.cohort.first_id + COHORT_ISSUED,
+            v2_values(b.cohort.certificates[COHORT_ISSUED]),
+            b.cohort.proof(b.cohort.first_id + COHORT_ISSUED),
+        ],
+    ),
+    Case("CertifyMe", "get_cohort_root", "", lambda b: [0]),
+    Case(
+        "CertifyMe",
+        "verify_certificate_proof",
+        str(COHORT_SIZE),
+        lambda b: [0, 500, v2_values(b.cohort.certificates[497]), b.cohort.proof(500)],
+    ),
+    Case(
+        "CertifyMe",
+        "verify_certificate_proof",
+        "unclaimed",
+        lambda b: [0, 900, v2_values(b.cohort.certificates[897]), b.cohort.proof(900)],
+    ),
+    Case("CertifyMe", "register_skill", "new", lambda b: ["Rust Systems", 60]),
+    Case("CertifyMe", "register_skill", "update", lambda b: ["Python Backend", 55]),
+    Case("CertifyMe", "get_skill_threshold", "", lambda b: ["Python Backend"]),
+    Case("CertifyMe", "get_skill_id", "", lambda b: ["Python Backend"]),
+    Case("CertifyMe", "get_skill", "", lambda b: [0]),
+    Case("CertifyMe", "register_issuer", "new", lambda b: ["Partner Academy"]),
+    Case("CertifyMe", "register_issuer", "existing", lambda b: ["CertifyMe"]),
+    Case("CertifyMe", "get_issuer", "", lambda b: [0]),
+    Case("CertifyMe", "update_min_score", "", lambda b: [60]),
+    Case("CertifyMe", "transfer_admin", "", lambda b: [b.other]),
+    Case(
+        "Bank",
+        "deposit",
+        "new_depositor",
+        lambda b: ["first", _deposit(b, b.other, 500_000, EmptySigner())],
+        sender=lambda b: b.other,
+    ),
+    Case("Bank", "deposit", "existing", lambda b: ["again", _deposit(b, b.sender, 500_000, EmptySigner())]),
+    Case("Bank", "withdraw", "partial", lambda b: [400_000]),
+    Case("Bank", "withdraw", "all", lambda b: [1_000_000]),
+    Case("Counter", "incr_counter", "", lambda b: []),
+]
+
+
+def uncovered_methods(specs: Mapping[str, Mapping[str, Any]]) -> list[str]:
+    """ABI methods of the given specs (contract -> ARC-56 spec) without a case."""
+    covered = {(case.contract, case.method) for case in CASES}
+    return [
+        f"{contract}.{method}"
+        for contract, spec in specs.items()
+        for method in abi_methods(spec)
+        if (contract, method) not in covered
+    ]
+
+
+# ── Measuring ──
+
+
+def _simulate(algod: AlgodClient, atc: AtomicTransactionComposer) -> dict[str, Any]:
+    request = SimulateRequest(
+        txn_groups=[],
+        allow_empty_signatures=True,
+        allow_unnamed_resources=True,
+        extra_opcode_budget=SIMULATE_EXTRA_OPCODE_BUDGET,
+        exec_trace_config=SimulateTraceConfig(enable=True, state_change=True),
+    )
+    group = atc.simulate(algod, request).simulate_response["txn-groups"][0]
+    if group.get("failure-message"):
+        raise RuntimeError(f"Simulation failed: {group['failure-message']}")
+    return group  # type: ignore[no-any-return]
+
+
+def _touched_boxes(group: Mapping[str, Any]) -> set[tuple[int, bytes]]:
+    resources = [group.get("unnamed-resources-accessed", {})]
+    resources += [txn.get("unnamed-resources-accessed", {}) for txn in group["txn-results"]]
+    return {(box["app"], base64.b64decode(box["name"])) for entry in resources for box in entry.get("boxes", [])}
+
+
+def _box_writes(group: Mapping[str, Any]) -> dict[bytes, int | None]:
+    """Final size of every box the group wrote (None if deleted), from the exec trace."""
+    sizes: dict[bytes, int | None] = {}
+    for txn in group["txn-results"]:
+        for unit in txn.get("exec-trace", {}).get("approval-program-trace", []):
+            for change in unit.get("state-changes", []):
+                if change["app-state"] != "b":
+                    continue
+                key = base64.b64decode(change["key"])
+                value = change.get("new-value", {}).get("bytes")
+                sizes[key] = None if change["operation"] == "d" else len(base64.b64decode(value or ""))
+    return sizes
+
+
+def _box_size(algod: AlgodClient, app_id: int, name: bytes) -> int | None:
+    try:
+        box = algod.application_box_by_name(app_id, name)
+    except AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    return len(base64.b64decode(box["value"]))  # type: ignore[call-overload]
+
+
+def _box_mbr(name: bytes, size: int | None) -> int:
+    return 0 if size is None else BOX_FLAT_MBR + BOX_BYTE_MBR * (len(name) + size)
+
+
+def _inner_count(result: Mapping[str, Any]) -> int:
+    return sum(1 + _inner_count(inner) for inner in result.get("inner-txns", []))
+
+
+def measure(algod: AlgodClient, app_id: int, atc: AtomicTransactionComposer) -> Measurement:
+    """Simulate one group against app_id and collect METRICS."""
+    min_fee = algod.suggested_params().min_fee
+    group = _simulate(algod, atc)
+    before = {name: _box_size(algod, app_id, name) for _, name in _touched_boxes(group)}
+    after = _box_writes(group)
+    transactions = sum(1 + _inner_count(txn["txn-result"]) for txn in group["txn-results"])
+    return {
+        "opcodes": int(group.get("app-budget-consumed", 0)),
+        "box_bytes_read": sum(size or 0 for size in before.values()),
+        "box_bytes_written": sum(size or 0 for size in after.values()),
+        "mbr_delta": sum(_box_mbr(name, size) - _box_mbr(name, before.get(name)) for name, size in after.items()),
+        "fee": transactions * min_fee,
+    }
+
+
+def run(bench: Bench, cases: Sequence[Case] = CASES) -> Iterator[tuple[str, Measurement]]:
+    for case in cases:
+        sender = case.sender(bench) if case.sender else bench.sender
+        atc = _compose(bench, case.contract, case.method, case.args(bench), EmptySigner(), sender)
+        yield case.key, measure(bench.algod, bench.app_ids[case.contract], atc)
+
+
+# ── Baselines ──
+
+
+def load_baselines(path: Path) -> dict[str, Measurement]:
+    return json.loads(path.read_text()) if path.exists() else {}  # type: ignore[no-any-return]
+
+
+def save_baselines(path: Path, results: Mapping[str, Measurement]) -> None:
+    path.write_text(json.dumps(dict(sorted(results.items())), indent=2) + "\n")
+
+
+def compare(
+    results: Mapping[str, Measurement], baselines: Mapping[str, Measurement], tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """
+    Regressions: metrics above baseline * (1 + tolerance) plus the metric's absolute
+    slack. Cases without a baseline are not compared (see unbaselined).
+    """
+    regressions = []
+    for key, measured in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        for metric in METRICS:
+            allowed = baseline[metric] + abs(baseline[metric]) * tolerance + ABSOLUTE_TOLERANCE[metric]
+            if measured[metric] > allowed:
+                regressions.append(f"{key}: {metric} {measured[metric]} > baseline {baseline[metric]}")
+    return regressions
+
+
+def unbaselined(results: Mapping[str, Measurement], baselines: Mapping[str, Measurement]) -> list[str]:
+    """Cases measured but missing from the baselines (new cases, or baselines never recorded)."""
+    return [key for key in results if key not in baselines]
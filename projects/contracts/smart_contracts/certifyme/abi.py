@@ -0,0 +1,153 @@
+"""
+ABI surface of the CertifyMe contract for off-chain helpers.
+
+The backend and these helpers call the contract by method signature (there is no
+generated CertifyMe client), so the signatures, struct types and box keys live here.
+"""
+
+import hashlib
+from collections.abc import Mapping
+from typing import Any
+
+from algosdk import abi
+
+# Field order of CertificateRecord / CertificateData in contract.py
+RECORD_FIELDS = (
+    "recipient",
+    "skill",
+    "skill_level",
+    "ai_score",
+    "evidence_hash",
+    "issuer",
+    "issue_date",
+    "metadata_url",
+)
+CERTIFICATE_RECORD = "(string,string,string,uint64,string,string,string,string)"
+CERTIFICATE_DATA = "(string,string,string,uint64,string,string,string,string,bool)"
+
+# Field order of CertificateV2 (compact fixed-width layout, 111 bytes)
+V2_FIELDS = (
+    "recipient",
+    "skill_id",
+    "skill_level",
+    "ai_score",
+    "issuer_id",
+    "issued_at",
+    "evidence_hash",
+    "metadata_hash",
+    "flags",
+)
+CERTIFICATE_V2 = "(address,uint16,uint8,uint8,uint16,uint64,byte[32],byte[32],uint8)"
+
+CERTIFICATE_RECORD_TYPE = abi.ABIType.from_string(CERTIFICATE_RECORD)
+CERTIFICATE_DATA_TYPE = abi.ABIType.from_string(CERTIFICATE_DATA)
+CERTIFICATE_V2_TYPE = abi.ABIType.from_string(CERTIFICATE_V2)
+# A cohort leaf hashes the reserved certificate ID followed by its v2 record
+MERKLE_LEAF_TYPE = abi.ABIType.from_string(f"(uint64,{CERTIFICATE_V2})")
+
+MINT_CERTIFICATE = abi.Method.from_signature(
+    "mint_certificate(string,string,string,uint64,string,string,string,string)uint64"
+)
+MINT_CERTIFICATES_BATCH = abi.Method.from_signature(f"mint_certificates_batch({CERTIFICATE_RECORD}[])uint64")
+GET_CERTIFICATE_COUNT = abi.Method.from_signature("get_certificate_count()uint64")
+GET_CERTIFICATE = abi.Method.from_signature(f"get_certificate(uint64){CERTIFICATE_DATA}")
+MINT_CERTIFICATE_V2 = abi.Method.from_signature(f"mint_certificate_v2({CERTIFICATE_V2})uint64")
+MINT_CERTIFICATES_BATCH_V2 = abi.Method.from_signature(f"mint_certificates_batch_v2({CERTIFICATE_V2}[])uint64")
+MIGRATE_CERTIFICATE = abi.Method.from_signature(f"migrate_certificate(uint64,{CERTIFICATE_V2})void")
+GET_CERTIFICATE_V2 = abi.Method.from_signature(f"get_certificate_v2(uint64){CERTIFICATE_V2}")
+VERIFY_CERTIFICATES = abi.Method.from_signature("verify_certificates(uint64[])byte[]")
+GET_CERTIFICATES = abi.Method.from_signature("get_certificates(uint64,uint64)(uint64,(uint64,uint8,bool,byte[])[])")
+COMMIT_COHORT_ROOT = abi.Method.from_signature("commit_cohort_root(byte[32],uint64,uint64)uint64")
+ISSUE_COHORT_CERTIFICATE = abi.Method.from_signature(
+    f"issue_cohort_certificate(uint64,uint64,{CERTIFICATE_V2},byte[32][])uint64"
+)
+VERIFY_CERTIFICATE_PROOF = abi.Method.from_signature(
+    f"verify_certificate_proof(uint64,uint64,{CERTIFICATE_V2},byte[32][])bool"
+)
+GET_SKILL_ID = abi.Method.from_signature("get_skill_id(string)uint16")
+GET_CERTIFICATES_BY_RECIPIENT = abi.Method.from_signature("get_certificates_by_recipient(byte[],uint64)uint64[]")
+REVOKE_BATCH = abi.Method.from_signature("revoke_batch(uint64[])void")
+REVOKE_BITMAP = abi.Method.from_signature("revoke_bitmap(uint64,byte[])void")
+
+CERT_BOX_PREFIX = b"cert_"
+CERT_V2_BOX_PREFIX = b"c2_"
+REVOCATION_BOX_PREFIX = b"rvk_"
+REVOCATION_SHARD_BYTES = 1024
+COHORT_ISSUED_BOX_PREFIX = b"cis_"
+RECIPIENT_INDEX_PREFIX = b"rcp_"
+SKILL_BOX_PREFIX = b"skill_"
+SKILL_INFO_BOX_PREFIX = b"skinfo_"
+ISSUER_BOX_PREFIX = b"iss_"
+ISSUER_ID_BOX_PREFIX = b"issid_"
+ROOT_BOX_PREFIX = b"root_"
+MAX_RECIPIENT_KEY = 64 - len(RECIPIENT_INDEX_PREFIX)
+
+
+def cert_box_key(cert_id: int) -> bytes:
+    """Box name of a certificate (BoxMap key_prefix + big-endian uint64 ID)."""
+    return CERT_BOX_PREFIX + cert_id.to_bytes(8, "big")
+
+
+def cert_v2_box_key(cert_id: int) -> bytes:
+    """Box name of a v2 certificate."""
+    return CERT_V2_BOX_PREFIX + cert_id.to_bytes(8, "big")
+
+
+def revocation_box_key(shard: int) -> bytes:
+    """Box name of a revocation bitmap shard (REVOCATION_SHARD_BYTES * 8 certificate IDs each)."""
+    return REVOCATION_BOX_PREFIX + shard.to_bytes(8, "big")
+
+
+def cohort_issued_box_key(shard: int) -> bytes:
+    """Box name of a shard of the claimed cohort leaves bitmap (sharded like revocations)."""
+    return COHORT_ISSUED_BOX_PREFIX + shard.to_bytes(8, "big")
+
+
+def v1_recipient_key(recipient: str) -> bytes:
+    """Index key of a v1 certificate's recipient string (hashed if too long for a box name)."""
+    key = recipient.encode()
+    return key if len(key) <= MAX_RECIPIENT_KEY else hashlib.sha256(key).digest()
+
+
+def recipient_index_key(recipient_key: bytes) -> bytes:
+    """Box name of a recipient's certificate index."""
+    return RECIPIENT_INDEX_PREFIX + recipient_key
+
+
+def root_box_key(root_id: int) -> bytes:
+    """Box name of a cohort root."""
+    return ROOT_BOX_PREFIX + root_id.to_bytes(8, "big")
+
+
+def skill_box_key(skill: str) -> bytes:
+    """Box name of a skill's name -> ID entry (key_prefix + ARC-4 encoded name)."""
+    return SKILL_BOX_PREFIX + bytes(abi.ABIType.from_string("string").encode(skill))
+
+
+def skill_info_box_key(skill_id: int) -> bytes:
+    """Box name of a skill's SkillInfo (threshold and name)."""
+    return SKILL_INFO_BOX_PREFIX + skill_id.to_bytes(2, "big")
+
+
+def issuer_box_key(issuer_id: int) -> bytes:
+    """Box name of an interned issuer's name."""
+    return ISSUER_BOX_PREFIX + issuer_id.to_bytes(2, "big")
+
+
+def record_values(record: Mapping[str, Any]) -> list[Any]:
+    """A certificate record (dict keyed by RECORD_FIELDS) as an ABI tuple value."""
+    return [int(record[field]) if field == "ai_score" else str(record[field]) for field in RECORD_FIELDS]
+
+
+def encode_record(record: Mapping[str, Any]) -> bytes:
+    return bytes(CERTIFICATE_RECORD_TYPE.encode(record_values(record)))
+
+
+def certificate_box_size(record: Mapping[str, Any]) -> int:
+    """Size of the CertificateData box value the record will be stored as."""
+    return len(CERTIFICATE_DATA_TYPE.encode([*record_values(record), False]))
+
+
+def v2_values(certificate: Mapping[str, Any]) -> list[Any]:
+    """A v2 certificate (dict keyed by V2_FIELDS) as an ABI tuple value."""
+    return [certificate[field] for field in V2_FIELDS]
@@ -0,0 +1,316 @@
+"""
+Batch minting for CertifyMe.
+
+Packs a cohort of certificate records into maximal atomic groups of
+mint_certificates_batch calls, sends them, and measures the fee and latency
+saving against one mint_certificate call per certificate using simulate.
+
+Each call is bounded by the protocol limits below: 8 references per transaction
+(every new certificate box must be referenced), 2048 bytes of app arguments, and
+its share of the group's pooled opcode budget. Each distinct recipient and skill in a
+call also needs references for its index and registry boxes, and the CertificateMinted
+events of a call (one per certificate, holding the stored record) share the
+transaction's 1KB of logs.
+"""
+
+import base64
+import math
+import os
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionSigner
+from algosdk.transaction import SuggestedParams
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest
+
+from smart_contracts.certifyme.abi import (
+    GET_CERTIFICATE_COUNT,
+    MINT_CERTIFICATE,
+    MINT_CERTIFICATES_BATCH,
+    cert_box_key,
+    certificate_box_size,
+    encode_record,
+    record_values,
+    recipient_index_key,
+    skill_box_key,
+    skill_info_box_key,
+    v1_recipient_key,
+)
+from smart_contracts.certifyme.registry import skill_ids
+
+# ── Protocol limits ──
+MAX_GROUP_SIZE = 16
+MAX_REFERENCES_PER_TXN = 8
+MAX_APP_ARGS_BYTES = 2048
+BOX_IO_BYTES_PER_REFERENCE = 1024
+APP_CALL_OPCODE_BUDGET = 700
+MAX_LOG_BYTES = 1024
+MIN_TXN_FEE = 1000
+BOX_FLAT_MBR = 2500
+BOX_BYTE_MBR = 400
+
+# Opcode cost of mint_certificates_batch: fixed part and per certificate, counted from
+# the compiled TEAL (with headroom); re-check with measure() after contract changes
+BATCH_BASE_OPCODES = 60
+BATCH_OPCODES_PER_CERT = 180
+# ABI method selector + the array's uint16 length prefix
+BATCH_ARGS_OVERHEAD = 4 + 2
+# ABI return log: return prefix + uint64
+RETURN_LOG_BYTES = 4 + 8
+
+Record = Mapping[str, Any]
+
+
+def box_references(record: Record) -> int:
+    """References needed for a certificate box (each grants 1KB of box I/O)."""
+    return max(1, math.ceil(certificate_box_size(record) / BOX_IO_BYTES_PER_REFERENCE))
+
+
+def index_box(record: Record) -> bytes:
+    """Box name of the recipient index the record's ID is appended to."""
+    return recipient_index_key(v1_recipient_key(str(record["recipient"])))
+
+
+def shared_boxes(records: Sequence[Record], skill_ids: Mapping[str, int] | None = None) -> list[bytes]:
+    """
+    Boxes a set of mints touches besides the certificate boxes, once each: recipient
+    indexes, skill name -> ID entries and the SkillInfo of registered skills. Without
+    skill_ids every skill is assumed registered and its name entry stands in for the
+    SkillInfo key (right for counting references, not for sending).
+    """
+    boxes: dict[bytes, None] = {}
+    for record in records:
+        boxes[index_box(record)] = None
+    for skill in dict.fromkeys(str(record["skill"]) for record in records):
+        boxes[skill_box_key(skill)] = None
+        if skill_ids is None:
+            boxes[skill_box_key(skill) + b"#"] = None
+        elif skill in skill_ids:
+            boxes[skill_info_box_key(skill_ids[skill])] = None
+    return list(boxes)
+
+
+def box_mbr(record: Record, key_length: int = len(cert_box_key(0))) -> int:
+    """Minimum-balance increase (microAlgos) the app account needs for a certificate box."""
+    return BOX_FLAT_MBR + BOX_BYTE_MBR * (key_length + certificate_box_size(record))
+
+
+def call_references(records: Sequence[Record], skill_ids: Mapping[str, int] | None = None) -> int:
+    """Box references one mint_certificates_batch call over records needs."""
+    return sum(box_references(record) for record in records) + len(shared_boxes(records, skill_ids))
+
+
+def event_size(record: Record) -> int:
+    """Log bytes of the record's CertificateMinted event: selector, cert_id, offset, record."""
+    return 4 + 8 + 2 + certificate_box_size(record)
+
+
+def plan_calls(records: Sequence[Record], skill_ids: Mapping[str, int] | None = None) -> list[list[int]]:
+    """
+    Split records (in order) into mint_certificates_batch calls, each as large as the
+    reference, app-args, log and opcode limits allow. Returns lists of record indexes.
+    """
+    calls: list[list[int]] = []
+    current: list[int] = []
+    args = logs = opcodes = 0
+    for index, record in enumerate(records):
+        # Each array element costs its encoding plus a uint16 offset in the array head
+        record_args = len(encode_record(record)) + 2
+        record_log = event_size(record)
+        if BATCH_ARGS_OVERHEAD + record_args > MAX_APP_ARGS_BYTES:
+            raise ValueError(f"Certificate record {index} is too large to mint ({record_args} bytes of arguments)")
+        if RETURN_LOG_BYTES + record_log > MAX_LOG_BYTES:
+            raise ValueError(f"Certificate record {index} is too large to mint ({record_log} byte event)")
+        if current and (
+            call_references([records[i] for i in [*current, index]], skill_ids) > MAX_REFERENCES_PER_TXN
+            or args + record_args > MAX_APP_ARGS_BYTES - BATCH_ARGS_OVERHEAD
+            or logs + record_log > MAX_LOG_BYTES - RETURN_LOG_BYTES
+            or opcodes + BATCH_OPCODES_PER_CERT > APP_CALL_OPCODE_BUDGET - BATCH_BASE_OPCODES
+        ):
+            calls.append(current)
+            current, args, logs, opcodes = [], 0, 0, 0
+        current.append(index)
+        args += record_args
+        logs += record_log
+        opcodes += BATCH_OPCODES_PER_CERT
+    if current:
+        calls.append(current)
+    return calls
+
+
+def plan_groups(
+    records: Sequence[Record], skill_ids: Mapping[str, int] | None = None, group_size: int = MAX_GROUP_SIZE
+) -> list[list[list[int]]]:
+    """plan_calls packed into atomic groups of up to group_size calls."""
+    calls = plan_calls(records, skill_ids)
+    return [calls[i : i + group_size] for i in range(0, len(calls), group_size)]
+
+
+def global_uint(algod: AlgodClient, app_id: int, name: str) -> int:
+    """A uint64 global of the app (0 if unset)."""
+    key = base64.b64encode(name.encode()).decode()
+    state = algod.application_info(app_id)["params"].get("global-state", [])  # type: ignore[call-overload]
+    for entry in state:
+        if entry["key"] == key:
+            return int(entry["value"]["uint"])
+    return 0
+
+
+def certificate_count(algod: AlgodClient, app_id: int) -> int:
+    """Current certificate_count global (the ID the next certificate will get)."""
+    return global_uint(algod, app_id, "certificate_count")
+
+
+def budget_calls(calls: int, opcodes: int) -> int:
+    """Extra app calls a group of calls costing opcodes each needs to pool enough budget."""
+    return max(0, -(-calls * opcodes // APP_CALL_OPCODE_BUDGET) - calls)
+
+
+def calls_per_group(opcodes: int) -> int:
+    """Calls costing opcodes each that fit one group together with their budget calls."""
+    return max(n for n in range(1, MAX_GROUP_SIZE + 1) if n + budget_calls(n, opcodes) <= MAX_GROUP_SIZE)
+
+
+def add_budget_calls(
+    atc: AtomicTransactionComposer,
+    app_id: int,
+    sender: str,
+    sp: SuggestedParams,
+    signer: TransactionSigner,
+    count: int,
+) -> None:
+    """Pad a group with get_certificate_count calls, each adding APP_CALL_OPCODE_BUDGET."""
+    for _ in range(count):
+        # A random note keeps otherwise identical calls from sharing a transaction ID
+        atc.add_method_call(
+            app_id=app_id, method=GET_CERTIFICATE_COUNT, sender=sender, sp=sp, signer=signer, note=os.urandom(8)
+        )
+
+
+def compose_group(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    records: Sequence[Record],
+    calls: list[list[int]],
+    first_id: int,
+    skill_ids: Mapping[str, int],
+) -> AtomicTransactionComposer:
+    """
+    One atomic group of batch calls; certificate IDs start at first_id in call order.
+    skill_ids is the app's skill registry (registry.skill_ids).
+    """
+    sp = algod.suggested_params()
+    atc = AtomicTransactionComposer()
+    next_id = first_id
+    for call in calls:
+        boxes = []
+        for index in call:
+            boxes += [(0, cert_box_key(next_id))] * box_references(records[index])
+            next_id += 1
+        boxes += [(0, key) for key in shared_boxes([records[index] for index in call], skill_ids)]
+        atc.add_method_call(
+            app_id=app_id,
+            method=MINT_CERTIFICATES_BATCH,
+            sender=sender,
+            sp=sp,
+            signer=signer,
+            method_args=[[record_values(records[index]) for index in call]],
+            boxes=boxes,
+        )
+    return atc
+
+
+def mint_cohort(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    records: Sequence[Record],
+    wait_rounds: int = 4,
+) -> list[int]:
+    """
+    Mint every record with batched groups, one confirmation wait per group.
+    The app account must already hold the boxes' MBR (sum of box_mbr).
+    Returns the certificate IDs in record order.
+    """
+    ids: list[int] = []
+    skills = skill_ids(algod, app_id)
+    for group in plan_groups(records, skills):
+        # IDs are assigned by the contract in order; read the counter so the box references match
+        first_id = certificate_count(algod, app_id)
+        compose_group(algod, app_id, sender, signer, records, group, first_id, skills).execute(algod, wait_rounds)
+        ids.extend(range(first_id, first_id + sum(len(call) for call in group)))
+    return ids
+
+
+def _simulate(algod: AlgodClient, atc: AtomicTransactionComposer) -> dict[str, Any]:
+    request = SimulateRequest(txn_groups=[], allow_empty_signatures=True)
+    response = atc.simulate(algod, request).simulate_response
+    group = response["txn-groups"][0]
+    if group.get("failure-message"):
+        raise RuntimeError(f"Simulation failed: {group['failure-message']}")
+    return group  # type: ignore[no-any-return]
+
+
+def measure(
+    algod: AlgodClient, app_id: int, sender: str, signer: TransactionSigner, records: Sequence[Record]
+) -> dict[str, Any]:
+    """
+    Simulate minting records one call per certificate versus batched groups and
+    compare transactions, fees, opcode budget consumed and confirmation waits.
+    Nothing is committed; simulate does not change state.
+    """
+    first_id = certificate_count(algod, app_id)
+    skills = skill_ids(algod, app_id)
+    sp = algod.suggested_params()
+
+    # Single mints, grouped 16 at a time only so simulate needs fewer round trips
+    single = {"transactions": 0, "opcodes": 0, "groups": 0}
+    for start in range(0, len(records), MAX_GROUP_SIZE):
+        atc = AtomicTransactionComposer()
+        for offset, record in enumerate(records[start : start + MAX_GROUP_SIZE]):
+            atc.add_method_call(
+                app_id=app_id,
+                method=MINT_CERTIFICATE,
+                sender=sender,
+                sp=sp,
+                signer=signer,
+                method_args=record_values(record),
+                boxes=[(0, cert_box_key(first_id + offset))] * box_references(record)
+                + [(0, key) for key in shared_boxes([record], skills)],
+            )
+        single["opcodes"] += _simulate(algod, atc)["app-budget-consumed"]
+        single["transactions"] += atc.get_tx_count()
+        single["groups"] += 1
+
+    batched = {"transactions": 0, "opcodes": 0, "groups": 0}
+    for group in plan_groups(records, skills):
+        # Groups are simulated independently, so each one starts from the on-chain counter
+        atc = compose_group(algod, app_id, sender, signer, records, group, first_id, skills)
+        batched["opcodes"] += _simulate(algod, atc)["app-budget-consumed"]
+        batched["transactions"] += atc.get_tx_count()
+        batched["groups"] += 1
+
+    count = len(records)
+    return {
+        "certificates": count,
+        "single": {
+            **single,
+            "fee_microalgos": single["transactions"] * MIN_TXN_FEE,
+            "fee_per_certificate": MIN_TXN_FEE,
+            "opcodes_per_certificate": single["opcodes"] / count,
+            # The backend mints one certificate per request and waits for each confirmation
+            "confirmation_waits": count,
+        },
+        "batched": {
+            **batched,
+            "fee_microalgos": batched["transactions"] * MIN_TXN_FEE,
+            "fee_per_certificate": batched["transactions"] * MIN_TXN_FEE / count,
+            "opcodes_per_certificate": batched["opcodes"] / count,
+            "confirmation_waits": batched["groups"],
+        },
+        "mbr_microalgos": sum(box_mbr(record) for record in records),
+    }
@@ -1,5 +1,8 @@
+import typing
+
 from algopy import *
-from algopy.arc4 import abimethod, String as ARC4String, UInt64 as ARC4UInt64, Struct, Bool as ARC4Bool
+from algopy.arc4 import abimethod, String as ARC4String, UInt64 as ARC4UInt64, Struct, Bool as ARC4Bool, DynamicArray
+from algopy.arc4 import Address, Byte, DynamicBytes, StaticArray, UInt8 as ARC4UInt8, UInt16 as ARC4UInt16, emit
 
 
 class CertificateData(Struct):
@@ -15,6 +18,172 @@ class CertificateData(Struct):
     is_revoked: ARC4Bool
 
 
+# A CertificateData encoding is its CertificateRecord encoding with is_revoked added:
+# identical tails behind a head one byte longer, so each string offset moves up by one.
+RECORD_HEAD_BYTES = 22
+DATA_OFFSET_SHIFT = b"\x00\x01" * 3 + b"\x00" * 8 + b"\x00\x01" * 4
+
+
+class CertificateRecord(Struct):
+    """One certificate to mint: the arguments of mint_certificate"""
+    recipient: ARC4String
+    skill: ARC4String
+    skill_level: ARC4String
+    ai_score: ARC4UInt64
+    evidence_hash: ARC4String
+    issuer: ARC4String
+    issue_date: ARC4String
+    metadata_url: ARC4String
+
+
+Bytes32: typing.TypeAlias = StaticArray[Byte, typing.Literal[32]]
+
+# CertificateV2.skill_level values
+LEVEL_BEGINNER = 0
+LEVEL_INTERMEDIATE = 1
+LEVEL_ADVANCED = 2
+LEVEL_EXPERT = 3
+# CertificateV2.flags bits
+FLAG_REVOKED = 1
+
+# Revocation bitmap: one bit per certificate ID (MSB first), sharded into 1KB boxes
+# so each shard is covered by a single box reference
+REVOCATION_BOX_PREFIX = b"rvk_"
+REVOCATION_SHARD_BYTES = 1024
+REVOCATION_SHARD_BITS = REVOCATION_SHARD_BYTES * 8
+# Cohort leaves claimed so far: a bitmap sharded the same way as revocations
+COHORT_ISSUED_BOX_PREFIX = b"cis_"
+# Largest operand of the byte-math opcodes (b|)
+BYTE_MATH_MAX = 64
+# ABI return values are logged: 1024-byte log limit minus the 4-byte return prefix
+MAX_RETURN_BYTES = 1020
+# Largest CertificatesRevoked mask: the 1024-byte log minus the event selector, first_id
+# and the mask's offset and length
+MAX_EVENT_MASK_BYTES = 1024 - 4 - 8 - 2 - 2
+
+# Per-recipient index: packed uint64 certificate IDs in mint order, keyed by the 32-byte
+# address for v2 and by the recipient string itself for v1 (sha256 of it if the string
+# would not fit in a box name)
+RECIPIENT_INDEX_PREFIX = b"rcp_"
+MAX_RECIPIENT_KEY = 64 - 4
+# IDs that fit in one get_certificates_by_recipient return (after the uint16 length)
+MAX_INDEX_PAGE = (MAX_RETURN_BYTES - 2) // 8
+
+
+class CertificateV2(Struct):
+    """
+    Compact fixed-width certificate record (111 bytes, no dynamic fields).
+    Skill and issuer are interned IDs, the level an enum, the date a unix timestamp;
+    the metadata URL stays off-chain behind metadata_hash (sha256 of the URL).
+    """
+    recipient: Address
+    skill_id: ARC4UInt16
+    skill_level: ARC4UInt8
+    ai_score: ARC4UInt8
+    issuer_id: ARC4UInt16
+    issued_at: ARC4UInt64
+    evidence_hash: Bytes32
+    metadata_hash: Bytes32
+    flags: ARC4UInt8
+
+
+# migrate_certificate decodes the v1 strings a byte-math pass at a time (64 bytes,
+# the widest b& / b+ operand), then packs each 8-byte lane with shifts and masks
+BYTE_MATH_LANES = b"\x01" * BYTE_MATH_MAX
+LOW_NIBBLE_LANES = b"\x0f" * BYTE_MATH_MAX
+LOW_5_BIT_LANES = b"\x1f" * BYTE_MATH_MAX
+BIT_6_LANES = b"\x40" * BYTE_MATH_MAX
+# Algorand address text: base32 of the key and its 4-byte checksum; "A" (0) pads it to 64
+ADDRESS_CHARS = 58
+ADDRESS_PADDING = b"AAAAAA"
+HEX_DIGEST_CHARS = 64
+# Unix day of 0000-03-01 in the days-from-civil algorithm
+CIVIL_EPOCH_DAYS = 719468
+
+# Merkle cohort hashing: leaf = sha256(0x00 || cert_id || CertificateV2), node =
+# sha256(0x01 || left || right); a node without a sibling is promoted unchanged
+MERKLE_LEAF_TAG = b"\x00"
+MERKLE_NODE_TAG = b"\x01"
+
+
+class CohortRoot(Struct):
+    """Merkle root committing to leaf_count certificates with IDs first_id.. (issued of them claimed so far)"""
+    root: Bytes32
+    first_id: ARC4UInt64
+    leaf_count: ARC4UInt64
+    committed_at: ARC4UInt64
+    issued: ARC4UInt64
+
+
+class SkillInfo(Struct):
+    """Registered skill, keyed by its interned ID (min_score first so mints read a fixed offset)"""
+    min_score: ARC4UInt64
+    name: ARC4String
+
+
+class CertificateEntry(Struct):
+    """One certificate in a get_certificates page: data is the encoded CertificateData (v1) or CertificateV2"""
+    cert_id: ARC4UInt64
+    version: ARC4UInt8
+    revoked: ARC4Bool
+    data: DynamicBytes
+
+
+# ──────────────────────────── ARC-28 Events ──────────────────────────────── #
+
+
+class CertificateMinted(Struct):
+    """v1 certificate stored under cert_id (the record must fit one 1KB log)"""
+    cert_id: ARC4UInt64
+    certificate: CertificateData
+
+
+class CertificateMintedV2(Struct):
+    cert_id: ARC4UInt64
+    certificate: CertificateV2
+
+
+class CertificateMigrated(Struct):
+    """v1 certificate cert_id rewritten in the v2 layout"""
+    cert_id: ARC4UInt64
+    certificate: CertificateV2
+
+
+class CohortCommitted(Struct):
+    """Certificates first_id..first_id + leaf_count - 1 issued under a Merkle root"""
+    root_id: ARC4UInt64
+    root: Bytes32
+    first_id: ARC4UInt64
+    leaf_count: ARC4UInt64
+
+
+class CertificateRevoked(Struct):
+    cert_id: ARC4UInt64
+    revoked_at: ARC4UInt64
+
+
+class CertificatesRevoked(Struct):
+    """revoke_bitmap / revoke_batch: bit i (MSB first) of mask revoked first_id + i"""
+    first_id: ARC4UInt64
+    mask: DynamicBytes
+
+
+class SkillRegistered(Struct):
+    skill_id: ARC4UInt16
+    name: ARC4String
+    min_score: ARC4UInt64
+
+
+class IssuerRegistered(Struct):
+    issuer_id: ARC4UInt16
+    name: ARC4String
+
+
+class MinScoreUpdated(Struct):
+    old_score: ARC4UInt64
+    new_score: ARC4UInt64
+
+
 class CertifyMe(ARC4Contract):
     """
     CertifyMe — AI-Verified Blockchain Certificate Contract
@@ -28,15 +197,28 @@ class CertifyMe(ARC4Contract):
     certificate_count: UInt64
     admin: Account
     min_ai_score: UInt64
+    issuer_count: UInt64
+    skill_count: UInt64
+    root_count: UInt64
 
     def __init__(self) -> None:
         """Initialize contract with deployer as admin"""
         self.certificate_count = UInt64(0)
         self.admin = Txn.sender
         self.min_ai_score = UInt64(45)
-        # Box maps for certificate data and skill registry
+        self.issuer_count = UInt64(0)
+        self.skill_count = UInt64(0)
+        self.root_count = UInt64(0)
+        # Box maps for certificate data and skill registry (name -> interned ID -> info)
         self.certificates = BoxMap(UInt64, CertificateData, key_prefix="cert_")
-        self.skills = BoxMap(ARC4String, ARC4UInt64, key_prefix="skill_")
+        self.skills = BoxMap(ARC4String, ARC4UInt16, key_prefix="skill_")
+        self.skill_info = BoxMap(ARC4UInt16, SkillInfo, key_prefix="skinfo_")
+        # v2 certificates share the ID sequence with v1; issuers are interned for them
+        self.certificates_v2 = BoxMap(UInt64, CertificateV2, key_prefix="c2_")
+        self.issuers = BoxMap(ARC4UInt16, ARC4String, key_prefix="iss_")
+        self.issuer_ids = BoxMap(ARC4String, ARC4UInt16, key_prefix="issid_")
+        # Cohort roots: one box commits to a whole cohort of certificate IDs
+        self.cohort_roots = BoxMap(UInt64, CohortRoot, key_prefix="root_")
 
     # ────────────────────────── Certificate Methods ──────────────────────── #
 
@@ -58,78 +240,669 @@ class CertifyMe(ARC4Contract):
         Returns the certificate ID.
         """
         assert Txn.sender == self.admin, "Only admin can mint certificates"
-        assert ai_score.native >= self.min_ai_score, "AI score below minimum threshold"
-
         cert_id = self.certificate_count
+        self._store_certificate(
+            CertificateRecord(
+                recipient=recipient,
+                skill=skill,
+                skill_level=skill_level,
+                ai_score=ai_score,
+                evidence_hash=evidence_hash,
+                issuer=issuer,
+                issue_date=issue_date,
+                metadata_url=metadata_url,
+            )
+        )
+        return cert_id
+
+    @abimethod()
+    def mint_certificates_batch(self, records: DynamicArray[CertificateRecord]) -> UInt64:
+        """
+        Mint several certificates in one call. Only callable by admin.
+        Certificates get consecutive IDs in array order; returns the first ID.
+        The call (or its group) must reference every new certificate box, so the
+        batch size is bounded by the box-reference and app-args limits
+        (see certifyme/batching.py for packing a cohort into groups).
+        """
+        assert Txn.sender == self.admin, "Only admin can mint certificates"
+        assert records.length > 0, "No certificates to mint"
+
+        first_id = self.certificate_count
+        for i in urange(records.length):
+            self._store_certificate(records[i].copy())
+        return first_id
 
-        self.certificates[cert_id] = CertificateData(
-            recipient=recipient,
-            skill=skill,
-            skill_level=skill_level,
-            ai_score=ai_score,
-            evidence_hash=evidence_hash,
-            issuer=issuer,
-            issue_date=issue_date,
-            metadata_url=metadata_url,
-            is_revoked=ARC4Bool(False),
+    @subroutine
+    def _store_certificate(self, record: CertificateRecord) -> None:
+        """
+        Check the score threshold and write the certificate box under the next ID.
+        The record is re-encoded as CertificateData at the byte level (shift the
+        head's offsets, append is_revoked=false) rather than field by field, which
+        keeps the per-certificate opcode cost of batches low.
+        """
+        assert record.ai_score.native >= self.min_ai_score, "AI score below minimum threshold"
+        # v1 records name their skill; registered skills also enforce their own threshold
+        skill_id, registered = self.skills.maybe(record.skill)
+        if registered:
+            assert record.ai_score.native >= self._skill_min_score(skill_id), "AI score below skill threshold"
+
+        encoded = record.bytes
+        head = BigUInt.from_bytes(op.extract(encoded, 0, RECORD_HEAD_BYTES)) + BigUInt.from_bytes(DATA_OFFSET_SHIFT)
+        data = CertificateData.from_bytes(
+            (op.bzero(RECORD_HEAD_BYTES) | head.bytes)
+            + ARC4Bool(False).bytes
+            + op.extract(encoded, RECORD_HEAD_BYTES, encoded.length - RECORD_HEAD_BYTES)
         )
+        self.certificates[self.certificate_count] = data.copy()
+        emit(CertificateMinted(cert_id=ARC4UInt64(self.certificate_count), certificate=data.copy()))
+        recipient = record.recipient.native.bytes
+        if recipient.length > MAX_RECIPIENT_KEY:
+            recipient = op.sha256(recipient)
+        self._index_recipient(recipient, self.certificate_count)
 
         self.certificate_count += UInt64(1)
+
+    @abimethod()
+    def mint_certificate_v2(self, cert: CertificateV2) -> UInt64:
+        """
+        Mint a certificate in the compact v2 layout. Only callable by admin.
+        flags must be zero. Returns the certificate ID.
+        """
+        assert Txn.sender == self.admin, "Only admin can mint certificates"
+        cert_id = self.certificate_count
+        self._store_certificate_v2(cert)
         return cert_id
 
+    @abimethod()
+    def mint_certificates_batch_v2(self, certs: DynamicArray[CertificateV2]) -> UInt64:
+        """
+        Mint several v2 certificates in one call (consecutive IDs, returns the first).
+        Only callable by admin. Fixed-width elements make each one a slice and a box write.
+        """
+        assert Txn.sender == self.admin, "Only admin can mint certificates"
+        assert certs.length > 0, "No certificates to mint"
+
+        first_id = self.certificate_count
+        for i in urange(certs.length):
+            self._store_certificate_v2(certs[i].copy())
+        return first_id
+
+    @subroutine
+    def _store_certificate_v2(self, cert: CertificateV2) -> None:
+        """Validate a v2 record and write it under the next ID"""
+        self._check_certificate_v2(cert)
+        self.certificates_v2[self.certificate_count] = cert.copy()
+        emit(CertificateMintedV2(cert_id=ARC4UInt64(self.certificate_count), certificate=cert.copy()))
+        self._index_recipient(cert.recipient.bytes, self.certificate_count)
+        self.certificate_count += UInt64(1)
+
+    @subroutine
+    def _check_certificate_v2(self, cert: CertificateV2) -> None:
+        """The checks every new v2 certificate passes, boxed or cohort"""
+        assert cert.ai_score.native >= self.min_ai_score, "AI score below minimum threshold"
+        assert cert.ai_score.native <= 100, "AI score out of range"
+        assert cert.skill_id in self.skill_info, "Skill not registered"
+        assert cert.ai_score.native >= self._skill_min_score(cert.skill_id), "AI score below skill threshold"
+        assert cert.skill_level.native <= LEVEL_EXPERT, "Unknown skill level"
+        assert cert.issuer_id.native < self.issuer_count, "Issuer not registered"
+        assert cert.flags.native == 0, "New certificates cannot carry flags"
+
+    @subroutine
+    def _meets_mint_rules(self, cert: CertificateV2) -> bool:
+        """_check_certificate_v2 as a predicate, for cohort leaves presented before they are claimed"""
+        if cert.skill_id not in self.skill_info:
+            return False
+        score = cert.ai_score.native
+        return (
+            score >= self.min_ai_score
+            and score <= 100
+            and score >= self._skill_min_score(cert.skill_id)
+            and cert.skill_level.native <= LEVEL_EXPERT
+            and cert.issuer_id.native < self.issuer_count
+            and cert.flags.native == 0
+        )
+
+    @subroutine
+    def _index_recipient(self, recipient_key: Bytes, cert_id: UInt64) -> None:
+        """Append a certificate ID to its recipient's index box"""
+        key = Bytes(RECIPIENT_INDEX_PREFIX) + recipient_key
+        length, exists = op.Box.length(key)
+        if exists:
+            op.Box.resize(key, length + 8)
+            op.Box.replace(key, length, op.itob(cert_id))
+        else:
+            op.Box.put(key, op.itob(cert_id))
+
+    @abimethod()
+    def migrate_certificate(self, cert_id: UInt64, cert: CertificateV2) -> None:
+        """
+        Rewrite a v1 certificate in the v2 layout under the same ID. Admin only.
+        Every field is checked against the v1 record as layout.to_v2 converts it
+        (recipient address, skill, level, score, issuer, date, evidence and metadata
+        URL hashes, revocation); the v1 box is deleted (releasing its larger minimum
+        balance). Costs up to ~1,400 opcodes, so migrations pool a group's budget.
+        """
+        assert Txn.sender == self.admin, "Only admin can migrate certificates"
+        assert cert_id in self.certificates, "Certificate not found"
+        legacy = self.certificates[cert_id].copy()
+
+        assert self._is_address_of(legacy.recipient.native.bytes, cert.recipient.bytes), "Recipient does not match"
+        assert cert.skill_id in self.skill_info, "Skill not registered"
+        assert self.skill_info[cert.skill_id].name == legacy.skill, "Skill does not match"
+        assert cert.skill_level.native <= LEVEL_EXPERT, "Unknown skill level"
+        level = legacy.skill_level.native.bytes
+        assert self._is_level_name(level, cert.skill_level.native), "Skill level does not match"
+        assert cert.ai_score.native == legacy.ai_score.native, "AI score does not match"
+        assert cert.issuer_id.native < self.issuer_count, "Issuer not registered"
+        assert self.issuers[cert.issuer_id] == legacy.issuer, "Issuer does not match"
+        assert cert.issued_at.native == self._unix_time(legacy.issue_date.native.bytes), "Issue date does not match"
+        evidence = legacy.evidence_hash.native.bytes
+        assert cert.evidence_hash.bytes == op.sha256(evidence) or (
+            evidence.length == HEX_DIGEST_CHARS and cert.evidence_hash.bytes == self._hex_digest(evidence)
+        ), "Evidence hash does not match"
+        assert cert.metadata_hash.bytes == op.sha256(legacy.metadata_url.native.bytes), "Metadata hash mismatch"
+        revoked = legacy.is_revoked.native or self._is_revoked(cert_id)
+        expected_flags = UInt64(FLAG_REVOKED) if revoked else UInt64(0)
+        assert cert.flags.native == expected_flags, "Revocation flag does not match"
+
+        del self.certificates[cert_id]
+        self.certificates_v2[cert_id] = cert.copy()
+        emit(CertificateMigrated(cert_id=ARC4UInt64(cert_id), certificate=cert.copy()))
+        # The v1 index entry stays (the ID remains valid); readers merge both indexes
+        self._index_recipient(cert.recipient.bytes, cert_id)
+
+    @subroutine
+    def _is_address_of(self, text: Bytes, public_key: Bytes) -> bool:
+        """Whether text is the Algorand address of public_key (base32 of key + checksum)"""
+        if text.length != ADDRESS_CHARS:
+            return False
+        chars = text + ADDRESS_PADDING
+        # Letters A-Z are (c & 31) - 1, digits 2-7 are (c & 31) + 8: bit 6 tells them apart
+        digits = BigUInt.from_bytes(~chars & BIT_6_LANES)
+        values = BigUInt.from_bytes(chars & LOW_5_BIT_LANES) + digits // 8 + digits // 64
+        values -= BigUInt.from_bytes(BYTE_MATH_LANES)
+        lanes = op.bzero(BYTE_MATH_MAX) | values.bytes
+        expected = public_key + op.extract(op.sha512_256(public_key), 28, 4) + op.bzero(4)
+        for lane in urange(8):
+            # Eight 5-bit values (one per byte) -> 40 bits
+            bits = op.extract_uint64(lanes, lane * 8)
+            bits = ((bits & 0x1F001F001F001F00) >> 3) | (bits & 0x001F001F001F001F)
+            bits = ((bits & 0x03FF000003FF0000) >> 6) | (bits & 0x000003FF000003FF)
+            bits = ((bits & 0x000FFFFF00000000) >> 12) | (bits & 0x00000000000FFFFF)
+            if bits != op.btoi(op.extract(expected, lane * 5, 5)):
+                return False
+        return True
+
+    @subroutine
+    def _hex_digest(self, text: Bytes) -> Bytes:
+        """The 32 bytes a 64-character hex string spells (either case)"""
+        # A-F / a-f have bit 6 set and decode to (c & 15) + 9
+        letters = BigUInt.from_bytes(text & BIT_6_LANES)
+        nibbles = BigUInt.from_bytes(text & LOW_NIBBLE_LANES) + letters // 8 + letters // 64
+        lanes = op.bzero(BYTE_MATH_MAX) | nibbles.bytes
+        digest = Bytes()
+        for lane in urange(8):
+            # Eight nibbles (one per byte) -> 4 bytes
+            bits = op.extract_uint64(lanes, lane * 8)
+            bits = ((bits >> 4) | bits) & 0x00FF00FF00FF00FF
+            bits = ((bits >> 8) | bits) & 0x0000FFFF0000FFFF
+            bits = ((bits >> 16) | bits) & 0x00000000FFFFFFFF
+            digest += op.extract(op.itob(bits), 4, 4)
+        return digest
+
+    @subroutine
+    def _is_level_name(self, text: Bytes, level: UInt64) -> bool:
+        """Whether text names level, ignoring case"""
+        if level == LEVEL_BEGINNER:
+            name = Bytes(b"beginner")
+        elif level == LEVEL_INTERMEDIATE:
+            name = Bytes(b"intermediate")
+        elif level == LEVEL_ADVANCED:
+            name = Bytes(b"advanced")
+        else:
+            name = Bytes(b"expert")
+        # Setting bit 5 lower-cases ASCII letters
+        return text.length == name.length and (text | op.extract(b"            ", 0, text.length)) == name
+
+    @subroutine
+    def _unix_time(self, text: Bytes) -> UInt64:
+        """
+        Unix time of an ISO date or datetime (YYYY-MM-DD[THH:MM[:SS][.fff]][Z|+HH:MM]),
+        UTC unless it ends in an offset, as layout.issued_at reads it
+        """
+        assert text.length >= 10 and text[4] == b"-" and text[7] == b"-", "Unsupported issue date"
+        year = self._decimal(text, UInt64(0), UInt64(4))
+        month = self._decimal(text, UInt64(5), UInt64(2))
+        day = self._decimal(text, UInt64(8), UInt64(2))
+        # Days from civil date, with years starting in March
+        if month <= 2:
+            year -= 1
+            month += 9
+        else:
+            month -= 3
+        day_of_era = (year % 400) * 365 + (year % 400) // 4 - (year % 400) // 100 + (153 * month + 2) // 5 + day - 1
+        seconds = ((year // 400) * 146097 + day_of_era - CIVIL_EPOCH_DAYS) * 86400
+        if text.length >= 16:
+            assert text[10] == b"T" or text[10] == b" ", "Unsupported issue date"
+            seconds += self._decimal(text, UInt64(11), UInt64(2)) * 3600
+            seconds += self._decimal(text, UInt64(14), UInt64(2)) * 60
+            if text.length >= 19 and text[16] == b":":
+                seconds += self._decimal(text, UInt64(17), UInt64(2))
+            sign = text[text.length - 6]
+            if sign == b"+" or sign == b"-":
+                offset = (
+                    self._decimal(text, text.length - 5, UInt64(2)) * 3600
+                    + self._decimal(text, text.length - 2, UInt64(2)) * 60
+                )
+                seconds = seconds - offset if sign == b"+" else seconds + offset
+        return seconds
+
+    @subroutine
+    def _decimal(self, text: Bytes, start: UInt64, digits: UInt64) -> UInt64:
+        value = UInt64(0)
+        for i in urange(start, start + digits):
+            digit = op.getbyte(text, i)
+            assert digit >= 48 and digit <= 57, "Unsupported issue date"
+            value = value * 10 + digit - 48
+        return value
+
+    @abimethod(readonly=True)
+    def get_certificate_v2(self, cert_id: UInt64) -> CertificateV2:
+        """Retrieve a v2 certificate by ID"""
+        assert cert_id in self.certificates_v2, "Certificate not found"
+        cert = self.certificates_v2[cert_id].copy()
+        if self._is_revoked(cert_id):
+            cert.flags = ARC4UInt8(cert.flags.native | FLAG_REVOKED)
+        return cert
+
     @abimethod(readonly=True)
     def get_certificate(self, cert_id: UInt64) -> CertificateData:
-        """Retrieve certificate details by ID"""
-        data, exists = self.certificates.maybe(cert_id)
-        assert exists, "Certificate not found"
-        return data.copy()
+        """Retrieve certificate details by ID (v1 layout; use get_certificate_v2 for v2 IDs)"""
+        assert cert_id in self.certificates, "Certificate not found"
+        data = self.certificates[cert_id].copy()
+        if self._is_revoked(cert_id):
+            data.is_revoked = ARC4Bool(True)
+        return data
+
+    @abimethod(readonly=True)
+    def get_certificates_by_recipient(self, recipient: Bytes, start: UInt64) -> DynamicArray[ARC4UInt64]:
+        """
+        IDs of a recipient's certificates in mint order, from index position start,
+        up to MAX_INDEX_PAGE per call. recipient is the index key: the 32-byte address
+        for v2 certificates, the recipient string for v1 (sha256 of it past 60 bytes).
+        """
+        key = Bytes(RECIPIENT_INDEX_PREFIX) + recipient
+        length, exists = op.Box.length(key)
+        count = length // 8
+        if not exists or start >= count:
+            return DynamicArray[ARC4UInt64]()
+        take = count - start
+        if take > MAX_INDEX_PAGE:
+            take = UInt64(MAX_INDEX_PAGE)
+        ids = op.Box.extract(key, start * 8, take * 8)
+        return DynamicArray[ARC4UInt64].from_bytes(op.extract(op.itob(take), 6, 2) + ids)
 
     @abimethod(readonly=True)
     def verify_certificate(self, cert_id: UInt64) -> ARC4Bool:
-        """Check if a certificate exists and is not revoked"""
-        data, exists = self.certificates.maybe(cert_id)
-        if not exists:
-            return ARC4Bool(False)
-        return ARC4Bool(not data.is_revoked.native)
+        """
+        Check if a certificate exists and is not revoked. Cohort IDs count once their
+        leaf has been claimed (unclaimed leaves verify with verify_certificate_proof).
+        """
+        return ARC4Bool(self._is_issued(cert_id) and not self._is_revoked(cert_id))
+
+    @abimethod(readonly=True)
+    def verify_certificates(self, ids: DynamicArray[ARC4UInt64]) -> Bytes:
+        """
+        verify_certificate for a list of IDs: bit i (MSB first) of the result is set
+        when ids[i] exists and is not revoked. Meant to be called through simulate.
+        """
+        result = op.bzero((ids.length + 7) // 8)
+        for i in urange(ids.length):
+            cert_id = ids[i].native
+            if self._is_issued(cert_id) and not self._is_revoked(cert_id):
+                result = op.setbit_bytes(result, i, 1)
+        return result
+
+    @subroutine
+    def _is_issued(self, cert_id: UInt64) -> bool:
+        """Whether cert_id holds a certificate: a v1 or v2 box, or a claimed cohort leaf"""
+        # Reserved cohort IDs are below the counter without a box until their leaf is claimed
+        if cert_id >= self.certificate_count:
+            return False
+        if cert_id in self.certificates_v2 or cert_id in self.certificates:
+            return True
+        return self._bit(Bytes(COHORT_ISSUED_BOX_PREFIX), cert_id)
+
+    @abimethod(readonly=True)
+    def get_certificates(
+        self, start: UInt64, count: UInt64
+    ) -> tuple[UInt64, DynamicArray[CertificateEntry]]:
+        """
+        Page through certificates with IDs start..start + count - 1: returns the ID to
+        continue from and the entries. Cohort IDs have no box and are passed over, so a
+        page may be empty before the end; the page also stops early when the next entry
+        would not fit in the return log. Meant to be called through simulate.
+        """
+        page = DynamicArray[CertificateEntry]()
+        end = start + count
+        if end > self.certificate_count:
+            end = self.certificate_count
+        for cert_id in urange(start, end):
+            if cert_id in self.certificates_v2:
+                entry = CertificateEntry(
+                    cert_id=ARC4UInt64(cert_id),
+                    version=ARC4UInt8(2),
+                    revoked=ARC4Bool(self._is_revoked(cert_id)),
+                    data=DynamicBytes(self.certificates_v2[cert_id].bytes),
+                )
+            elif cert_id in self.certificates:
+                entry = CertificateEntry(
+                    cert_id=ARC4UInt64(cert_id),
+                    version=ARC4UInt8(1),
+                    revoked=ARC4Bool(self._is_revoked(cert_id)),
+                    data=DynamicBytes(self.certificates[cert_id].bytes),
+                )
+            else:
+                # Issued under a cohort root: no box to return
+                continue
+            # Each element also adds a 2-byte offset to the array head, which follows
+            # the cursor and the array's offset in the returned tuple
+            if 8 + 2 + page.bytes.length + entry.bytes.length + 2 > MAX_RETURN_BYTES:
+                return cert_id, page.copy()
+            page.append(entry.copy())
+        return end, page.copy()
 
     @abimethod()
     def revoke_certificate(self, cert_id: UInt64) -> None:
         """Revoke a certificate if fraud is discovered. Admin only."""
         assert Txn.sender == self.admin, "Only admin can revoke certificates"
-        data, exists = self.certificates.maybe(cert_id)
-        assert exists, "Certificate not found"
-
-        self.certificates[cert_id] = CertificateData(
-            recipient=data.recipient,
-            skill=data.skill,
-            skill_level=data.skill_level,
-            ai_score=data.ai_score,
-            evidence_hash=data.evidence_hash,
-            issuer=data.issuer,
-            issue_date=data.issue_date,
-            metadata_url=data.metadata_url,
-            is_revoked=ARC4Bool(True),
-        )
+        assert cert_id < self.certificate_count, "Certificate not found"
+        self._set_revoked(cert_id)
+        emit(CertificateRevoked(cert_id=ARC4UInt64(cert_id), revoked_at=ARC4UInt64(Global.latest_timestamp)))
+
+    @abimethod()
+    def revoke_batch(self, ids: DynamicArray[ARC4UInt64]) -> None:
+        """
+        Revoke a list of certificates in one call. Admin only. One CertificatesRevoked
+        event covers them all (mask from the lowest ID rounded down to a multiple of 8),
+        so the IDs must lie within MAX_EVENT_MASK_BYTES * 8 of each other.
+        """
+        assert Txn.sender == self.admin, "Only admin can revoke certificates"
+        assert ids.length > 0, "No certificates to revoke"
+        lowest = ids[0].native
+        highest = lowest
+        for i in urange(ids.length):
+            cert_id = ids[i].native
+            if cert_id < lowest:
+                lowest = cert_id
+            if cert_id > highest:
+                highest = cert_id
+        assert highest < self.certificate_count, "Certificate not found"
+        first_id = lowest - lowest % 8
+        assert (highest - first_id) // 8 < MAX_EVENT_MASK_BYTES, "IDs too far apart for one event"
+
+        mask = op.bzero((highest - first_id) // 8 + 1)
+        for i in urange(ids.length):
+            cert_id = ids[i].native
+            self._set_revoked(cert_id)
+            mask = op.setbit_bytes(mask, cert_id - first_id, 1)
+        emit(CertificatesRevoked(first_id=ARC4UInt64(first_id), mask=DynamicBytes(mask)))
+
+    @abimethod()
+    def revoke_bitmap(self, first_id: UInt64, mask: Bytes) -> None:
+        """
+        Revoke every certificate whose bit is set in mask: bit i (MSB first) is
+        first_id + i. first_id must be a multiple of 8. Admin only.
+        The mask is OR-ed into the bitmap 64 bytes at a time and logged whole in one
+        CertificatesRevoked event, so it is at most MAX_EVENT_MASK_BYTES long.
+        """
+        assert Txn.sender == self.admin, "Only admin can revoke certificates"
+        assert first_id % 8 == 0, "first_id must be a multiple of 8"
+        assert mask.length > 0, "Empty revocation mask"
+        assert mask.length <= MAX_EVENT_MASK_BYTES, "Revocation mask too long for one event"
+        end_id = first_id + mask.length * 8
+        if end_id > self.certificate_count:
+            # Only trailing bits of the last byte may lie past the last certificate, and they must be clear
+            spare = end_id - self.certificate_count
+            assert spare < 8, "Certificate not found"
+            assert op.btoi(mask[mask.length - 1]) & ((UInt64(1) << spare) - 1) == 0, "Certificate not found"
+
+        done = UInt64(0)
+        while done < mask.length:
+            position = first_id // 8 + done
+            offset = position % REVOCATION_SHARD_BYTES
+            size = mask.length - done
+            if size > BYTE_MATH_MAX:
+                size = UInt64(BYTE_MATH_MAX)
+            if size > REVOCATION_SHARD_BYTES - offset:
+                size = REVOCATION_SHARD_BYTES - offset
+            key = self._bitmap_shard(Bytes(REVOCATION_BOX_PREFIX), position // REVOCATION_SHARD_BYTES)
+            current = op.Box.extract(key, offset, size)
+            op.Box.replace(key, offset, current | op.extract(mask, done, size))
+            done += size
+        emit(CertificatesRevoked(first_id=ARC4UInt64(first_id), mask=DynamicBytes(mask)))
+
+    @subroutine
+    def _set_revoked(self, cert_id: UInt64) -> None:
+        self._set_bit(Bytes(REVOCATION_BOX_PREFIX), cert_id)
+
+    @subroutine
+    def _is_revoked(self, cert_id: UInt64) -> bool:
+        return self._bit(Bytes(REVOCATION_BOX_PREFIX), cert_id)
+
+    @subroutine
+    def _bitmap_shard(self, prefix: Bytes, shard: UInt64) -> Bytes:
+        """Key of a bitmap shard (revocations, claimed cohort leaves), creating the zeroed box on first use"""
+        key = prefix + op.itob(shard)
+        _length, exists = op.Box.length(key)
+        if not exists:
+            assert op.Box.create(key, REVOCATION_SHARD_BYTES)
+        return key
+
+    @subroutine
+    def _set_bit(self, prefix: Bytes, cert_id: UInt64) -> None:
+        key = self._bitmap_shard(prefix, cert_id // REVOCATION_SHARD_BITS)
+        bit = cert_id % REVOCATION_SHARD_BITS
+        byte = op.Box.extract(key, bit // 8, 1)
+        op.Box.replace(key, bit // 8, op.setbit_bytes(byte, bit % 8, 1))
+
+    @subroutine
+    def _bit(self, prefix: Bytes, cert_id: UInt64) -> bool:
+        key = prefix + op.itob(cert_id // REVOCATION_SHARD_BITS)
+        _length, exists = op.Box.length(key)
+        if not exists:
+            return False
+        bit = cert_id % REVOCATION_SHARD_BITS
+        return op.getbit(op.Box.extract(key, bit // 8, 1), bit % 8) == 1
 
     @abimethod(readonly=True)
     def get_certificate_count(self) -> UInt64:
         """Returns the total number of certificates issued"""
         return self.certificate_count
 
+    # ────────────────────────── Cohort Issuance Methods ─────────────────── #
+
+    @abimethod()
+    def commit_cohort_root(self, root: Bytes32, first_id: UInt64, leaf_count: UInt64) -> UInt64:
+        """
+        Commit a cohort of certificates with one Merkle root instead of one box each.
+        Reserves IDs first_id..first_id + leaf_count - 1, which the leaves commit to,
+        so first_id must be the current certificate count. Admin only; returns the root ID.
+        Leaves are issued lazily: each is checked against the mint rules when it is
+        presented, with verify_certificate_proof or when claimed (issue_cohort_certificate).
+        Cohort certificates are revoked through the bitmap like any other ID.
+        """
+        assert Txn.sender == self.admin, "Only admin can mint certificates"
+        assert first_id == self.certificate_count, "Certificate IDs moved; rebuild the tree"
+        assert leaf_count > 0, "Empty cohort"
+
+        root_id = self.root_count
+        self.cohort_roots[root_id] = CohortRoot(
+            root=root.copy(),
+            first_id=ARC4UInt64(first_id),
+            leaf_count=ARC4UInt64(leaf_count),
+            committed_at=ARC4UInt64(Global.latest_timestamp),
+            issued=ARC4UInt64(0),
+        )
+        emit(
+            CohortCommitted(
+                root_id=ARC4UInt64(root_id),
+                root=root.copy(),
+                first_id=ARC4UInt64(first_id),
+                leaf_count=ARC4UInt64(leaf_count),
+            )
+        )
+        self.root_count += UInt64(1)
+        self.certificate_count += leaf_count
+        return root_id
+
+    @abimethod()
+    def issue_cohort_certificate(
+        self, root_id: UInt64, cert_id: UInt64, cert: CertificateV2, proof: DynamicArray[Bytes32]
+    ) -> UInt64:
+        """
+        Claim leaf cert_id of cohort root_id on-chain: its proof must hold, it passes
+        the mint_certificate_v2 checks, it is marked issued (so verify_certificate
+        accepts the ID) and appended to the recipient's index. Callable once per leaf,
+        in any order, by the admin or the certificate's recipient; returns cert_id.
+        Proof checking costs ~80 opcodes per tree level (pool budget across the group).
+        """
+        assert root_id in self.cohort_roots, "Cohort root not found"
+        assert Txn.sender == self.admin or Txn.sender.bytes == cert.recipient.bytes, "Only admin or the recipient"
+        cohort = self.cohort_roots[root_id].copy()
+        first_id = cohort.first_id.native
+        assert cert_id >= first_id and cert_id < first_id + cohort.leaf_count.native, "Certificate not in cohort"
+        assert not self._bit(Bytes(COHORT_ISSUED_BOX_PREFIX), cert_id), "Certificate already issued"
+        assert self._in_cohort(cohort, cert_id, cert, proof), "Invalid cohort proof"
+        self._check_certificate_v2(cert)
+
+        self._set_bit(Bytes(COHORT_ISSUED_BOX_PREFIX), cert_id)
+        cohort.issued = ARC4UInt64(cohort.issued.native + 1)
+        self.cohort_roots[root_id] = cohort.copy()
+        emit(CertificateMintedV2(cert_id=ARC4UInt64(cert_id), certificate=cert.copy()))
+        self._index_recipient(cert.recipient.bytes, cert_id)
+        return cert_id
+
+    @abimethod(readonly=True)
+    def get_cohort_root(self, root_id: UInt64) -> CohortRoot:
+        """Retrieve a committed cohort root"""
+        assert root_id in self.cohort_roots, "Cohort root not found"
+        return self.cohort_roots[root_id].copy()
+
+    @abimethod(readonly=True)
+    def verify_certificate_proof(
+        self, root_id: UInt64, cert_id: UInt64, cert: CertificateV2, proof: DynamicArray[Bytes32]
+    ) -> ARC4Bool:
+        """
+        Check that cert, issued as cert_id, is a leaf of cohort root_id that meets the
+        mint rules and is not revoked. Unclaimed leaves are held to the rules in force
+        now; claimed ones passed them when claimed. proof lists the sibling hashes from
+        the leaf up; the leaf's position is cert_id's offset in the cohort. Costs ~80
+        opcodes per tree level, so proofs into cohorts above ~64 certificates need
+        simulate or a group's pooled budget.
+        """
+        if root_id not in self.cohort_roots:
+            return ARC4Bool(False)
+        cohort = self.cohort_roots[root_id].copy()
+        first_id = cohort.first_id.native
+        if cert_id < first_id or cert_id >= first_id + cohort.leaf_count.native:
+            return ARC4Bool(False)
+        if not self._in_cohort(cohort, cert_id, cert, proof):
+            return ARC4Bool(False)
+        if not self._bit(Bytes(COHORT_ISSUED_BOX_PREFIX), cert_id) and not self._meets_mint_rules(cert):
+            return ARC4Bool(False)
+        return ARC4Bool(not self._is_revoked(cert_id))
+
+    @subroutine
+    def _in_cohort(
+        self, cohort: CohortRoot, cert_id: UInt64, cert: CertificateV2, proof: DynamicArray[Bytes32]
+    ) -> bool:
+        """Whether proof leads from cert's leaf at cert_id (inside the cohort's range) to its root"""
+        node = op.sha256(MERKLE_LEAF_TAG + op.itob(cert_id) + cert.bytes)
+        position = cert_id - cohort.first_id.native
+        width = cohort.leaf_count.native
+        used = UInt64(0)
+        while width > 1:
+            if position % 2 == 1:
+                assert used < proof.length, "Proof too short"
+                node = op.sha256(MERKLE_NODE_TAG + proof[used].bytes + node)
+                used += 1
+            elif position + 1 < width:
+                assert used < proof.length, "Proof too short"
+                node = op.sha256(MERKLE_NODE_TAG + node + proof[used].bytes)
+                used += 1
+            position //= 2
+            width = (width + 1) // 2
+        return used == proof.length and node == cohort.root.bytes
+
     # ────────────────────────── Skill Registry Methods ──────────────────── #
 
     @abimethod()
     def register_skill(self, skill_name: ARC4String, min_score: ARC4UInt64) -> None:
-        """Register a new verifiable skill with its minimum AI score threshold"""
+        """
+        Register a new verifiable skill with its minimum AI score threshold.
+        New names are interned to the next skill ID; registering an existing name
+        updates its threshold and keeps its ID.
+        """
         assert Txn.sender == self.admin, "Only admin can register skills"
-        self.skills[skill_name] = min_score
+        assert min_score.native <= 100, "Threshold out of range"
+        if skill_name in self.skills:
+            skill_id = self.skills[skill_name]
+        else:
+            assert self.skill_count <= 0xFFFF, "Skill registry full"
+            skill_id = ARC4UInt16(self.skill_count)
+            self.skills[skill_name] = skill_id
+            self.skill_count += UInt64(1)
+        self.skill_info[skill_id] = SkillInfo(min_score=min_score, name=skill_name)
+        emit(SkillRegistered(skill_id=skill_id, name=skill_name, min_score=min_score))
 
     @abimethod(readonly=True)
     def get_skill_threshold(self, skill_name: ARC4String) -> ARC4UInt64:
         """Get the minimum AI score required for a skill"""
-        threshold, exists = self.skills.maybe(skill_name)
+        skill_id, exists = self.skills.maybe(skill_name)
         assert exists, "Skill not registered"
-        return threshold.copy()
+        return ARC4UInt64(self._skill_min_score(skill_id))
+
+    @abimethod(readonly=True)
+    def get_skill_id(self, skill_name: ARC4String) -> ARC4UInt16:
+        """Interned ID of a registered skill (the skill_id of v2 certificates)"""
+        skill_id, exists = self.skills.maybe(skill_name)
+        assert exists, "Skill not registered"
+        return skill_id
+
+    @abimethod(readonly=True)
+    def get_skill(self, skill_id: ARC4UInt16) -> SkillInfo:
+        """Name and threshold of a skill ID (reverse lookup)"""
+        assert skill_id in self.skill_info, "Skill not registered"
+        return self.skill_info[skill_id].copy()
+
+    @subroutine
+    def _skill_min_score(self, skill_id: ARC4UInt16) -> UInt64:
+        # Reads the fixed min_score head of SkillInfo without decoding the name
+        key = self.skill_info.key_prefix + skill_id.bytes
+        return op.btoi(op.Box.extract(key, 0, 8))
+
+    # ────────────────────────── Issuer Registry Methods ─────────────────── #
+
+    @abimethod()
+    def register_issuer(self, name: ARC4String) -> ARC4UInt16:
+        """Intern an issuer name for v2 certificates; returns its ID (existing names keep theirs)"""
+        assert Txn.sender == self.admin, "Only admin can register issuers"
+        if name in self.issuer_ids:
+            return self.issuer_ids[name]
+        assert self.issuer_count <= 0xFFFF, "Issuer registry full"
+        issuer_id = ARC4UInt16(self.issuer_count)
+        self.issuers[issuer_id] = name
+        self.issuer_ids[name] = issuer_id
+        self.issuer_count += UInt64(1)
+        emit(IssuerRegistered(issuer_id=issuer_id, name=name))
+        return issuer_id
+
+    @abimethod(readonly=True)
+    def get_issuer(self, issuer_id: ARC4UInt16) -> ARC4String:
+        """Issuer name for an interned issuer ID"""
+        assert issuer_id in self.issuers, "Issuer not registered"
+        return self.issuers[issuer_id]
 
     # ────────────────────────── Admin Methods ────────────────────────────── #
 
@@ -137,6 +910,7 @@ class CertifyMe(ARC4Contract):
     def update_min_score(self, new_min: UInt64) -> None:
         """Update the global minimum AI score for certification"""
         assert Txn.sender == self.admin, "Only admin can update settings"
+        emit(MinScoreUpdated(old_score=ARC4UInt64(self.min_ai_score), new_score=ARC4UInt64(new_min)))
         self.min_ai_score = new_min
 
     @abimethod()
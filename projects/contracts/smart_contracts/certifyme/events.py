@@ -0,0 +1,149 @@
+"""
+ARC-28 events emitted by CertifyMe and a decoder for them.
+
+Every state change an indexer cares about (mints, migrations, cohort roots,
+revocations, skill and issuer registrations, threshold changes) is logged as an
+ARC-28 event: the first 4 bytes of sha512/256("Name(types)") followed by the
+ABI-encoded arguments. Decoding a block's application logs is therefore enough to follow the
+app round by round, with no box reads. ABI return values (prefix 151f7c75) and
+unknown logs are skipped.
+"""
+
+import base64
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import msgpack  # type: ignore[import-untyped]
+from algosdk import abi, encoding
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.certifyme.abi import CERTIFICATE_DATA, CERTIFICATE_V2, RECORD_FIELDS, V2_FIELDS
+
+# Event name -> (argument, ABI type) in the order of the event structs in contract.py
+EVENT_ARGS: dict[str, tuple[tuple[str, str], ...]] = {
+    "CertificateMinted": (("cert_id", "uint64"), ("certificate", CERTIFICATE_DATA)),
+    "CertificateMintedV2": (("cert_id", "uint64"), ("certificate", CERTIFICATE_V2)),
+    "CertificateMigrated": (("cert_id", "uint64"), ("certificate", CERTIFICATE_V2)),
+    "CertificateRevoked": (("cert_id", "uint64"), ("revoked_at", "uint64")),
+    "CertificatesRevoked": (("first_id", "uint64"), ("mask", "byte[]")),
+    "CohortCommitted": (("root_id", "uint64"), ("root", "byte[32]"), ("first_id", "uint64"), ("leaf_count", "uint64")),
+    "SkillRegistered": (("skill_id", "uint16"), ("name", "string"), ("min_score", "uint64")),
+    "IssuerRegistered": (("issuer_id", "uint16"), ("name", "string")),
+    "MinScoreUpdated": (("old_score", "uint64"), ("new_score", "uint64")),
+}
+
+
+def signature(name: str) -> str:
+    return f"{name}({','.join(typ for _, typ in EVENT_ARGS[name])})"
+
+
+def selector(name: str) -> bytes:
+    """The 4-byte ARC-28 prefix of an event's logs."""
+    return encoding.checksum(signature(name).encode())[:4]
+
+
+_DECODERS = {
+    selector(name): (name, abi.ABIType.from_string(f"({','.join(typ for _, typ in args)})"))
+    for name, args in EVENT_ARGS.items()
+}
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    One decoded event. round / txn_index locate it in the chain when it was read
+    from a block (txn_index counts top-level transactions; inner ones share their
+    parent's), log_index is its position among that transaction's logs.
+    """
+
+    name: str
+    args: dict[str, Any] = field(hash=False)
+    round: int | None = None
+    txn_index: int | None = None
+    log_index: int = 0
+
+
+def _value(typ: str, value: Any) -> Any:
+    if typ == CERTIFICATE_DATA:
+        return {**dict(zip(RECORD_FIELDS, value[:-1], strict=True)), "is_revoked": value[-1]}
+    if typ == CERTIFICATE_V2:
+        certificate = dict(zip(V2_FIELDS, value, strict=True))
+        certificate["evidence_hash"] = bytes(certificate["evidence_hash"])
+        certificate["metadata_hash"] = bytes(certificate["metadata_hash"])
+        return certificate
+    if typ.startswith("byte["):
+        return bytes(value)
+    return value
+
+
+def decode_log(log: bytes) -> tuple[str, dict[str, Any]] | None:
+    """The (name, args) of a CertifyMe event log, or None for any other log."""
+    decoder = _DECODERS.get(bytes(log[:4]))
+    if decoder is None:
+        return None
+    name, tuple_type = decoder
+    values = tuple_type.decode(bytes(log[4:]))
+    return name, {arg: _value(typ, value) for (arg, typ), value in zip(EVENT_ARGS[name], values, strict=True)}
+
+
+def decode_logs(logs: Sequence[bytes], round_: int | None = None, txn_index: int | None = None) -> list[Event]:
+    events = []
+    for log_index, log in enumerate(logs):
+        decoded = decode_log(log)
+        if decoded is not None:
+            events.append(Event(*decoded, round=round_, txn_index=txn_index, log_index=log_index))
+    return events
+
+
+def transaction_events(txn: Mapping[str, Any]) -> list[Event]:
+    """
+    Events of a confirmed transaction as returned by algod (pending_transaction_info)
+    or the indexer (base64 "logs", "confirmed-round"), inner transactions included.
+    """
+    logs = [base64.b64decode(log) for log in txn.get("logs", [])]
+    events = decode_logs(logs, txn.get("confirmed-round"))
+    for inner in txn.get("inner-txns", []):
+        events += transaction_events({**inner, "confirmed-round": txn.get("confirmed-round")})
+    return events
+
+
+def _stib_logs(stib: Mapping[bytes, Any], app_id: int) -> Iterator[bytes]:
+    txn = stib.get(b"txn", {})
+    apply_data = stib.get(b"dt", {})
+    # A creation call carries its new app ID in the apply data, not the transaction
+    if txn.get(b"type") == b"appl" and app_id in (txn.get(b"apid"), stib.get(b"apid")):
+        yield from apply_data.get(b"lg", [])
+    for inner in apply_data.get(b"itx", []):
+        yield from _stib_logs(inner, app_id)
+
+
+def block_events(block: Mapping[bytes, Any], app_id: int) -> list[Event]:
+    """Events app_id emitted in a msgpack block (see fetch_block), in chain order."""
+    header = block[b"block"]
+    round_ = header.get(b"rnd", 0)
+    events = []
+    for txn_index, stib in enumerate(header.get(b"txns", [])):
+        events += decode_logs(list(_stib_logs(stib, app_id)), round_, txn_index)
+    return events
+
+
+def fetch_block(algod: AlgodClient, round_: int) -> Mapping[bytes, Any]:
+    """A block in algod's msgpack form; keys stay bytes since logs are not UTF-8."""
+    raw = algod.block_info(round_, response_format="msgpack")
+    return msgpack.unpackb(raw, raw=True, strict_map_key=False)  # type: ignore[no-any-return]
+
+
+def stream(algod: AlgodClient, app_id: int, from_round: int) -> Iterator[tuple[int, list[Event]]]:
+    """
+    (round, events) for every round from from_round on, waiting for new blocks once
+    caught up. Rounds without CertifyMe events yield an empty list so callers can
+    checkpoint their progress.
+    """
+    round_ = from_round
+    while True:
+        last_round = algod.status()["last-round"]  # type: ignore[call-overload]
+        while round_ <= last_round:
+            yield round_, block_events(fetch_block(algod, round_), app_id)
+            round_ += 1
+        algod.status_after_block(last_round)
@@ -0,0 +1,485 @@
+"""
+Incremental SQLite indexer for CertifyMe.
+
+Follows the app block by block and folds its ARC-28 events (see events.py) into an
+indexed SQLite read model, so portfolio pages and employer checks are answered
+locally instead of with algod box reads. Boxes are read once, by snapshot(), when
+an index is started after the app already holds certificates.
+
+Every block is applied in one SQLite transaction together with the checkpoint
+(round, genesis hash, previous-block hash and transaction commitment), so a crash
+never leaves a half-applied round. Algorand blocks are final, so there are no
+reorgs to unwind; on resume the checkpointed block is fetched again and compared,
+which catches a reset localnet or a different network instead of silently mixing
+chains. Event handlers are idempotent, so replaying rounds after a snapshot is safe.
+"""
+
+import base64
+import json
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+import msgpack  # type: ignore[import-untyped]
+from algosdk import abi
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.certifyme import events
+from smart_contracts.certifyme.abi import (
+    CERT_BOX_PREFIX,
+    CERT_V2_BOX_PREFIX,
+    CERTIFICATE_V2_TYPE,
+    COHORT_ISSUED_BOX_PREFIX,
+    ISSUER_BOX_PREFIX,
+    REVOCATION_BOX_PREFIX,
+    ROOT_BOX_PREFIX,
+    SKILL_INFO_BOX_PREFIX,
+    V2_FIELDS,
+)
+from smart_contracts.certifyme.batching import certificate_count, global_uint
+from smart_contracts.certifyme.layout import FLAG_REVOKED, SKILL_LEVELS, decode_v1
+from smart_contracts.certifyme.revocation import SHARD_BITS
+
+SKILL_INFO_TYPE = abi.ABIType.from_string("(uint64,string)")
+COHORT_ROOT_TYPE = abi.ABIType.from_string("(byte[32],uint64,uint64,uint64,uint64)")
+_STRING = abi.ABIType.from_string("string")
+REGISTRY_PREFIXES = (SKILL_INFO_BOX_PREFIX, ISSUER_BOX_PREFIX)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    cert_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL,
+    recipient TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    ai_score INTEGER NOT NULL,
+    minted_round INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS certificates_recipient ON certificates (recipient);
+CREATE INDEX IF NOT EXISTS certificates_skill ON certificates (skill);
+CREATE TABLE IF NOT EXISTS revocations (cert_id INTEGER PRIMARY KEY, revoked_round INTEGER);
+-- Claimed cohort leaves whose record was not seen (snapshot() reads only the claim bitmap)
+CREATE TABLE IF NOT EXISTS claims (cert_id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS cohorts (
+    root_id INTEGER PRIMARY KEY,
+    root BLOB NOT NULL,
+    first_id INTEGER NOT NULL,
+    leaf_count INTEGER NOT NULL,
+    committed_round INTEGER
+);
+CREATE TABLE IF NOT EXISTS skills (skill_id INTEGER PRIMARY KEY, name TEXT NOT NULL, min_score INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS issuers (issuer_id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    round INTEGER NOT NULL,
+    genesis_hash BLOB,
+    prev BLOB,
+    txn_root BLOB
+);
+"""
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """The last block applied, with the header fields that identify it."""
+
+    round: int
+    genesis_hash: bytes | None
+    prev: bytes | None
+    txn_root: bytes | None
+
+    @classmethod
+    def of(cls, block: Mapping[bytes, Any]) -> "Checkpoint":
+        header = block[b"block"]
+        return cls(header.get(b"rnd", 0), header.get(b"gh"), header.get(b"prev"), header.get(b"txn"))
+
+
+class CertificateIndex:
+    """A CertifyMe read model in SQLite (path or ":memory:") for one app."""
+
+    def __init__(self, path: str | Path, app_id: int) -> None:
+        self.app_id = app_id
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    # ── Applying blocks ──
+
+    def checkpoint(self) -> Checkpoint | None:
+        row = self.db.execute("SELECT round, genesis_hash, prev, txn_root FROM checkpoint").fetchone()
+        return Checkpoint(*row) if row else None
+
+    def matches(self, block: Mapping[bytes, Any]) -> bool:
+        """Whether block is the checkpointed block as it was applied."""
+        return Checkpoint.of(block) == self.checkpoint()
+
+    def apply_block(self, block: Mapping[bytes, Any]) -> int:
+        """
+        Apply the next block (msgpack form, see events.fetch_block) and advance the
+        checkpoint atomically. Returns the number of CertifyMe events applied.
+        """
+        new = Checkpoint.of(block)
+        current = self.checkpoint()
+        if current is not None:
+            if new.round != current.round + 1:
+                raise ValueError(f"Expected round {current.round + 1}, got {new.round}")
+            if current.genesis_hash is not None and new.genesis_hash != current.genesis_hash:
+                raise RuntimeError(f"Round {new.round} is from a different network than the index")
+        found = events.block_events(block, self.app_id)
+        with self.db:
+            for event in found:
+                self._apply(event)
+            self._save_checkpoint(new)
+        return len(found)
+
+    def _save_checkpoint(self, checkpoint: Checkpoint) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO checkpoint (id, round, genesis_hash, prev, txn_root) VALUES (0, ?, ?, ?, ?)",
+            (checkpoint.round, checkpoint.genesis_hash, checkpoint.prev, checkpoint.txn_root),
+        )
+
+    def _apply(self, event: events.Event) -> None:
+        args = event.args
+        if event.name == "CertificateMinted":
+            self._put_v1(args["cert_id"], args["certificate"], event.round)
+        elif event.name in ("CertificateMintedV2", "CertificateMigrated"):
+            self._put_v2(args["cert_id"], args["certificate"], event.round)
+        elif event.name == "CertificateRevoked":
+            self._revoke([args["cert_id"]], event.round)
+        elif event.name == "CertificatesRevoked":
+            mask = args["mask"]
+            bits = (i for i in range(len(mask) * 8) if mask[i // 8] & (0x80 >> (i % 8)))
+            self._revoke((args["first_id"] + i for i in bits), event.round)
+        elif event.name == "CohortCommitted":
+            self.db.execute(
+                "INSERT OR REPLACE INTO cohorts VALUES (?, ?, ?, ?, ?)",
+                (args["root_id"], args["root"], args["first_id"], args["leaf_count"], event.round),
+            )
+            self._bump_count(args["first_id"] + args["leaf_count"])
+        elif event.name == "SkillRegistered":
+            self.db.execute(
+                "INSERT OR REPLACE INTO skills VALUES (?, ?, ?)", (args["skill_id"], args["name"], args["min_score"])
+            )
+        elif event.name == "IssuerRegistered":
+            self.db.execute("INSERT OR REPLACE INTO issuers VALUES (?, ?)", (args["issuer_id"], args["name"]))
+        elif event.name == "MinScoreUpdated":
+            self._set("min_ai_score", args["new_score"])
+
+    def _put(self, cert_id: int, version: int, data: dict[str, Any], round_: int | None) -> None:
+        # A migration replaces the record but keeps the original mint round
+        self.db.execute(
+            """
+            INSERT INTO certificates (cert_id, version, recipient, skill, ai_score, minted_round, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (cert_id) DO UPDATE SET version = excluded.version, recipient = excluded.recipient,
+                skill = excluded.skill, ai_score = excluded.ai_score, data = excluded.data
+            """,
+            (cert_id, version, data["recipient"], data["skill"], data["ai_score"], round_, json.dumps(data)),
+        )
+        self._bump_count(cert_id + 1)
+
+    def _put_v1(self, cert_id: int, certificate: Mapping[str, Any], round_: int | None) -> None:
+        data = dict(certificate)
+        if data.pop("is_revoked"):
+            self._revoke([cert_id], round_)
+        self._put(cert_id, 1, data, round_)
+
+    def _put_v2(self, cert_id: int, certificate: Mapping[str, Any], round_: int | None) -> None:
+        data = {
+            **certificate,
+            "skill": self._name("skills", "skill_id", certificate["skill_id"]),
+            "skill_level": SKILL_LEVELS[certificate["skill_level"]],
+            "issuer": self._name("issuers", "issuer_id", certificate["issuer_id"]),
+            "evidence_hash": bytes(certificate["evidence_hash"]).hex(),
+            "metadata_hash": bytes(certificate["metadata_hash"]).hex(),
+        }
+        if data["flags"] & FLAG_REVOKED:
+            self._revoke([cert_id], round_)
+        self._put(cert_id, 2, data, round_)
+
+    def _name(self, table: str, column: str, value: int) -> str:
+        row = self.db.execute(f"SELECT name FROM {table} WHERE {column} = ?", (value,)).fetchone()  # noqa: S608
+        return row["name"] if row else f"#{value}"
+
+    def _revoke(self, cert_ids: Iterable[int], round_: int | None) -> None:
+        self.db.executemany(
+            "INSERT OR IGNORE INTO revocations VALUES (?, ?)", ((cert_id, round_) for cert_id in cert_ids)
+        )
+
+    def _set(self, name: str, value: int) -> None:
+        self.db.execute("INSERT OR REPLACE INTO settings VALUES (?, ?)", (name, value))
+
+    def _bump_count(self, count: int) -> None:
+        self.db.execute(
+            """
+            INSERT INTO settings VALUES ('certificate_count', ?)
+            ON CONFLICT (name) DO UPDATE SET value = max(value, excluded.value)
+            """,
+            (count,),
+        )
+
+    # ── Queries ──
+
+    def certificate_count(self) -> int:
+        row = self.db.execute("SELECT value FROM settings WHERE name = 'certificate_count'").fetchone()
+        return row["value"] if row else 0
+
+    def certificate(self, cert_id: int) -> dict[str, Any] | None:
+        """
+        A certificate with its revocation state, or None if the ID was never issued.
+        Cohort certificates have no record on-chain; they come back with their root.
+        """
+        revoked = self.db.execute("SELECT 1 FROM revocations WHERE cert_id = ?", (cert_id,)).fetchone() is not None
+        row = self.db.execute("SELECT * FROM certificates WHERE cert_id = ?", (cert_id,)).fetchone()
+        if row is not None:
+            return self._record(row, revoked)
+        cohort = self.db.execute(
+            "SELECT root_id, root FROM cohorts WHERE first_id <= ? AND ? < first_id + leaf_count", (cert_id, cert_id)
+        ).fetchone()
+        if cohort is None:
+            return None
+        return {
+            "cert_id": cert_id,
+            "version": None,
+            "root_id": cohort["root_id"],
+            "root": cohort["root"].hex(),
+            "revoked": revoked,
+        }
+
+    def certificates_of(self, recipient: str) -> list[dict[str, Any]]:
+        """Every indexed certificate record of a recipient, oldest first."""
+        rows = self.db.execute(
+            """
+            SELECT c.*, r.cert_id IS NOT NULL AS revoked FROM certificates c
+            LEFT JOIN revocations r USING (cert_id) WHERE c.recipient = ? ORDER BY c.cert_id
+            """,
+            (recipient,),
+        ).fetchall()
+        return [self._record(row, bool(row["revoked"])) for row in rows]
+
+    def verify(self, cert_ids: Sequence[int]) -> list[bool]:
+        """verify_certificate for each ID: issued (cohort leaves once claimed) and not revoked."""
+        issued = self._matching("SELECT cert_id FROM certificates WHERE cert_id IN ({})", cert_ids)
+        issued |= self._matching("SELECT cert_id FROM claims WHERE cert_id IN ({})", cert_ids)
+        revoked = self._revoked(cert_ids)
+        return [cert_id in issued and cert_id not in revoked for cert_id in cert_ids]
+
+    def skill_thresholds(self) -> dict[str, int]:
+        return {row["name"]: row["min_score"] for row in self.db.execute("SELECT name, min_score FROM skills")}
+
+    def _revoked(self, cert_ids: Sequence[int]) -> set[int]:
+        return self._matching("SELECT cert_id FROM revocations WHERE cert_id IN ({})", cert_ids)
+
+    def _matching(self, query: str, cert_ids: Sequence[int]) -> set[int]:
+        """The cert_ids a query with an IN ({}) placeholder returns."""
+        found: set[int] = set()
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(cert_ids), 500):
+            chunk = cert_ids[start : start + 500]
+            rows = self.db.execute(query.format(",".join("?" * len(chunk))), chunk)
+            found.update(row["cert_id"] for row in rows)
+        return found
+
+    @staticmethod
+    def _record(row: sqlite3.Row, revoked: bool) -> dict[str, Any]:
+        return {
+            "cert_id": row["cert_id"],
+            "version": row["version"],
+            **json.loads(row["data"]),
+            "minted_round": row["minted_round"],
+            "revoked": revoked,
+        }
+
+
+# ── Following the chain ──
+
+
+def _boxes(algod: AlgodClient, app_id: int) -> Iterator[tuple[bytes, bytes]]:
+    for entry in algod.application_boxes(app_id)["boxes"]:  # type: ignore[call-overload]
+        name = base64.b64decode(entry["name"])
+        box = algod.application_box_by_name(app_id, name)
+        yield name, base64.b64decode(box["value"])  # type: ignore[call-overload]
+
+
+def snapshot(index: CertificateIndex, algod: AlgodClient) -> int:
+    """
+    Seed an empty index from the app's boxes and globals and checkpoint the round
+    before the read started; following from there replays anything that changed
+    while the boxes were read. Returns the checkpoint round.
+    """
+    if index.checkpoint() is not None:
+        raise ValueError("snapshot() needs an empty index")
+    round_ = algod.status()["last-round"] - 1  # type: ignore[call-overload]
+    # Registries first: v2 records resolve skill and issuer names as they are stored
+    boxes = sorted(_boxes(algod, index.app_id), key=lambda box: not box[0].startswith(REGISTRY_PREFIXES))
+    with index.db:
+        for name, value in boxes:
+            _load_box(index, name, value)
+        index._bump_count(certificate_count(algod, index.app_id))
+        index._set("min_ai_score", global_uint(algod, index.app_id, "min_ai_score"))
+        index._save_checkpoint(Checkpoint.of(events.fetch_block(algod, round_)))
+    return round_
+
+
+def _load_box(index: CertificateIndex, name: bytes, value: bytes) -> None:
+    def key_id(prefix: bytes) -> int:
+        return int.from_bytes(name[len(prefix) :], "big")
+
+    if name.startswith(SKILL_INFO_BOX_PREFIX):
+        min_score, skill = SKILL_INFO_TYPE.decode(value)
+        index.db.execute(
+            "INSERT OR REPLACE INTO skills VALUES (?, ?, ?)", (key_id(SKILL_INFO_BOX_PREFIX), skill, min_score)
+        )
+    elif name.startswith(ISSUER_BOX_PREFIX):
+        issuer = _STRING.decode(value)
+        index.db.execute("INSERT OR REPLACE INTO issuers VALUES (?, ?)", (key_id(ISSUER_BOX_PREFIX), issuer))
+    elif name.startswith(ROOT_BOX_PREFIX):
+        root, first_id, leaf_count, _, _ = COHORT_ROOT_TYPE.decode(value)
+        index.db.execute(
+            "INSERT OR REPLACE INTO cohorts VALUES (?, ?, ?, ?, NULL)",
+            (key_id(ROOT_BOX_PREFIX), bytes(root), first_id, leaf_count),
+        )
+    elif name.startswith(CERT_BOX_PREFIX):
+        index._put_v1(key_id(CERT_BOX_PREFIX), decode_v1(value), None)
+    elif name.startswith(CERT_V2_BOX_PREFIX):
+        certificate = dict(zip(V2_FIELDS, CERTIFICATE_V2_TYPE.decode(value), strict=True))
+        index._put_v2(key_id(CERT_V2_BOX_PREFIX), certificate, None)
+    elif name.startswith(REVOCATION_BOX_PREFIX):
+        first_id = key_id(REVOCATION_BOX_PREFIX) * SHARD_BITS
+        bits = (i for i in range(len(value) * 8) if value[i // 8] & (0x80 >> (i % 8)))
+        index._revoke((first_id + i for i in bits), None)
+    elif name.startswith(COHORT_ISSUED_BOX_PREFIX):
+        first_id = key_id(COHORT_ISSUED_BOX_PREFIX) * SHARD_BITS
+        bits = (i for i in range(len(value) * 8) if value[i // 8] & (0x80 >> (i % 8)))
+        index.db.executemany("INSERT OR IGNORE INTO claims VALUES (?)", ((first_id + i,) for i in bits))
+
+
+def follow(
+    index: CertificateIndex, algod: AlgodClient, from_round: int | None = None, until_round: int | None = None
+) -> int:
+    """
+    Apply blocks after the checkpoint (or from from_round on an empty index, e.g. the
+    app's creation round) up to until_round, or forever, waiting for new blocks once
+    caught up. Returns the last round applied.
+    """
+    checkpoint = index.checkpoint()
+    if checkpoint is None:
+        if from_round is None:
+            raise ValueError("An empty index needs from_round (or a snapshot)")
+        round_ = from_round
+    else:
+        if not index.matches(events.fetch_block(algod, checkpoint.round)):
+            raise RuntimeError(f"Block {checkpoint.round} no longer matches the index checkpoint; rebuild the index")
+        round_ = checkpoint.round + 1
+    while until_round is None or round_ <= until_round:
+        last_round = algod.status()["last-round"]  # type: ignore[call-overload]
+        if round_ > last_round:
+            algod.status_after_block(last_round)
+            continue
+        index.apply_block(events.fetch_block(algod, round_))
+        round_ += 1
+    return round_ - 1
+
+
+# ── Recorded blocks and catch-up throughput ──
+
+
+def record_blocks(algod: AlgodClient, first_round: int, last_round: int, path: str | Path) -> int:
+    """Save blocks first_round..last_round as algod returned them (msgpack), for benchmark()."""
+    with open(path, "wb") as out:
+        for round_ in range(first_round, last_round + 1):
+            out.write(msgpack.packb(algod.block_info(round_, response_format="msgpack")))
+    return last_round - first_round + 1
+
+
+def recorded_blocks(path: str | Path) -> Iterator[Mapping[bytes, Any]]:
+    with open(path, "rb") as source:
+        for raw in msgpack.Unpacker(source):
+            yield msgpack.unpackb(raw, raw=True, strict_map_key=False)
+
+
+def benchmark(index: CertificateIndex, blocks: Iterable[Mapping[bytes, Any]]) -> dict[str, Any]:
+    """
+    Catch-up throughput: apply blocks (recorded with record_blocks, or built in
+    memory) to index and report rounds and events per second.
+    """
+    rounds = applied = 0
+    started = time.perf_counter()
+    for block in blocks:
+        applied += index.apply_block(block)
+        rounds += 1
+    seconds = time.perf_counter() - started
+    return {
+        "rounds": rounds,
+        "events": applied,
+        "seconds": seconds,
+        "rounds_per_second": rounds / seconds if seconds else float("inf"),
+        "events_per_second": applied / seconds if seconds else float("inf"),
+    }
+
+
+# ── Query API ──
+
+
+def serve(path: str | Path, app_id: int, host: str = "127.0.0.1", port: int = 8980) -> HTTPServer:
+    """
+    A JSON HTTP server over the index at path (its own read connection, so it can
+    run in a thread while follow() writes). Call serve_forever() on the result.
+
+        GET /certificates/<id>
+        GET /recipients/<recipient>/certificates
+        GET /verify?ids=1,2,3
+        GET /status
+    """
+    index = CertificateIndex(path, app_id)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            url = urlparse(self.path)
+            parts = [unquote(part) for part in url.path.strip("/").split("/")]
+            try:
+                body = self._route(parts, parse_qs(url.query))
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+                return
+            if body is None:
+                self._send(404, {"error": "Not found"})
+            else:
+                self._send(200, body)
+
+        def _route(self, parts: list[str], query: dict[str, list[str]]) -> Any:
+            if parts == ["status"]:
+                checkpoint = index.checkpoint()
+                return {"round": checkpoint and checkpoint.round, "certificate_count": index.certificate_count()}
+            if len(parts) == 2 and parts[0] == "certificates":
+                return index.certificate(int(parts[1]))
+            if len(parts) == 3 and parts[0] == "recipients" and parts[2] == "certificates":
+                return index.certificates_of(parts[1])
+            if parts == ["verify"]:
+                ids = [int(value) for value in query.get("ids", [""])[0].split(",") if value]
+                return dict(zip(map(str, ids), index.verify(ids), strict=True))
+            return None
+
+        def _send(self, status: int, body: Any) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+    return HTTPServer((host, port), Handler)
@@ -0,0 +1,276 @@
+"""
+Compact v2 certificate layout for CertifyMe.
+
+Converts v1 CertificateData records (nine fields, seven of them strings) into the
+fixed-width CertificateV2 layout, compares box bytes, minimum balance and opcode
+cost of the two, and migrates existing v1 boxes in place (same certificate IDs).
+
+v2 keeps no metadata URL on-chain: metadata_hash is sha256 of the URL, so anyone
+holding the URL can check it against the certificate. Evidence hashes given as
+64 hex characters are stored raw; anything else (IPFS CIDs) is stored as its sha256.
+"""
+
+import base64
+import hashlib
+import math
+from collections.abc import Mapping, Sequence
+from datetime import UTC, date, datetime
+from typing import Any
+
+from algosdk import encoding
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionSigner
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.certifyme.abi import (
+    CERTIFICATE_DATA_TYPE,
+    CERTIFICATE_V2_TYPE,
+    GET_CERTIFICATE,
+    GET_CERTIFICATE_V2,
+    MIGRATE_CERTIFICATE,
+    MINT_CERTIFICATE,
+    MINT_CERTIFICATE_V2,
+    RECORD_FIELDS,
+    cert_box_key,
+    cert_v2_box_key,
+    issuer_box_key,
+    recipient_index_key,
+    record_values,
+    revocation_box_key,
+    skill_info_box_key,
+    v2_values,
+)
+from smart_contracts.certifyme.batching import (
+    BOX_BYTE_MBR,
+    BOX_FLAT_MBR,
+    BOX_IO_BYTES_PER_REFERENCE,
+    _simulate,
+    add_budget_calls,
+    budget_calls,
+    calls_per_group,
+    certificate_count,
+    shared_boxes,
+)
+from smart_contracts.certifyme.revocation import SHARD_BITS, revoked_ids
+
+# CertificateV2.skill_level enum, matching the LEVEL_* constants in contract.py
+SKILL_LEVELS = ("Beginner", "Intermediate", "Advanced", "Expert")
+FLAG_REVOKED = 1
+# Opcode cost of migrate_certificate (decoding the v1 address, hex evidence hash and
+# date), counted from the compiled TEAL with headroom; re-check with measure()
+MIGRATE_OPCODES = 1500
+V2_BOX_SIZE = CERTIFICATE_V2_TYPE.byte_len()
+
+Record = Mapping[str, Any]
+
+
+def skill_level_code(level: str) -> int:
+    """Enum value for a skill level name (case-insensitive)."""
+    for code, name in enumerate(SKILL_LEVELS):
+        if name.lower() == level.strip().lower():
+            return code
+    raise ValueError(f"Unknown skill level: {level!r}")
+
+
+def issued_at(issue_date: str) -> int:
+    """Unix timestamp (UTC) of an ISO issue date or datetime."""
+    try:
+        moment = datetime.fromisoformat(issue_date)
+    except ValueError:
+        moment = datetime.combine(date.fromisoformat(issue_date), datetime.min.time())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return int(moment.timestamp())
+
+
+def hash32(value: str) -> bytes:
+    """A 32-byte hash: hex digests are decoded, other identifiers are sha256-committed."""
+    text = value.strip()
+    if len(text) == 64:
+        try:
+            return bytes.fromhex(text)
+        except ValueError:
+            pass
+    return hashlib.sha256(text.encode()).digest()
+
+
+def metadata_hash(metadata_url: str) -> bytes:
+    """Commitment to the off-chain metadata URL (what migrate_certificate checks)."""
+    return hashlib.sha256(metadata_url.encode()).digest()
+
+
+def to_v2(record: Record, skill_ids: Mapping[str, int], issuer_ids: Mapping[str, int]) -> dict[str, Any]:
+    """
+    A v1 record (dict keyed by RECORD_FIELDS, optionally with is_revoked) as a v2
+    certificate. skill_ids / issuer_ids map names to their interned numeric IDs.
+    """
+    return {
+        "recipient": encoding.decode_address(record["recipient"]),
+        "skill_id": skill_ids[record["skill"]],
+        "skill_level": skill_level_code(record["skill_level"]),
+        "ai_score": int(record["ai_score"]),
+        "issuer_id": issuer_ids[record["issuer"]],
+        "issued_at": issued_at(record["issue_date"]),
+        "evidence_hash": hash32(record["evidence_hash"]),
+        "metadata_hash": metadata_hash(record["metadata_url"]),
+        "flags": FLAG_REVOKED if record.get("is_revoked") else 0,
+    }
+
+
+def encode_v2(certificate: Record) -> bytes:
+    return bytes(CERTIFICATE_V2_TYPE.encode(v2_values(certificate)))
+
+
+def decode_v1(value: bytes) -> dict[str, Any]:
+    """A v1 CertificateData box value as a record dict (with is_revoked)."""
+    decoded = CERTIFICATE_DATA_TYPE.decode(value)
+    return {**dict(zip(RECORD_FIELDS, decoded[:-1], strict=True)), "is_revoked": decoded[-1]}
+
+
+def compare_boxes(records: Sequence[Record]) -> dict[str, Any]:
+    """Box bytes and minimum balance (microAlgos) of records stored as v1 versus v2."""
+    v1_sizes = [len(CERTIFICATE_DATA_TYPE.encode([*record_values(r), bool(r.get("is_revoked"))])) for r in records]
+    v1_key, v2_key = len(cert_box_key(0)), len(cert_v2_box_key(0))
+    v1_mbr = sum(BOX_FLAT_MBR + BOX_BYTE_MBR * (v1_key + size) for size in v1_sizes)
+    v2_mbr = len(records) * (BOX_FLAT_MBR + BOX_BYTE_MBR * (v2_key + V2_BOX_SIZE))
+    count = max(len(records), 1)
+    return {
+        "certificates": len(records),
+        "v1": {"box_bytes": sum(v1_sizes), "bytes_per_certificate": sum(v1_sizes) / count, "mbr_microalgos": v1_mbr},
+        "v2": {
+            "box_bytes": V2_BOX_SIZE * len(records),
+            "bytes_per_certificate": V2_BOX_SIZE,
+            "mbr_microalgos": v2_mbr,
+        },
+        "mbr_released_microalgos": v1_mbr - v2_mbr,
+    }
+
+
+def migration_certificates(
+    algod: AlgodClient,
+    app_id: int,
+    cert_ids: Sequence[int],
+    skill_ids: Mapping[str, int],
+    issuer_ids: Mapping[str, int],
+) -> list[tuple[int, int, dict[str, Any]]]:
+    """
+    (cert_id, v1 box size, v2 certificate) for each v1 certificate. Revocations live
+    in the bitmap shards (the v1 is_revoked field is only set by legacy records), so
+    the revoked flag is read from both, as migrate_certificate checks it.
+    """
+    revoked = revoked_ids(algod, app_id, cert_ids)
+    certificates = []
+    for cert_id in cert_ids:
+        box = algod.application_box_by_name(app_id, cert_box_key(cert_id))
+        value = base64.b64decode(box["value"])  # type: ignore[call-overload]
+        record = decode_v1(value)
+        record["is_revoked"] = record["is_revoked"] or cert_id in revoked
+        certificates.append((cert_id, len(value), to_v2(record, skill_ids, issuer_ids)))
+    return certificates
+
+
+def migrate(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    cert_ids: Sequence[int],
+    skill_ids: Mapping[str, int],
+    issuer_ids: Mapping[str, int],
+    wait_rounds: int = 4,
+) -> int:
+    """
+    Rewrite v1 certificates as v2 under the same IDs, as many per atomic group as
+    the pooled opcode budget allows (padded with budget calls). Each v1 box is read
+    from algod, converted (see migration_certificates) and checked field by field
+    on-chain against the old record. Issuers must be registered first. Returns the
+    number migrated.
+    """
+    migrated = 0
+    per_group = calls_per_group(MIGRATE_OPCODES)
+    for start in range(0, len(cert_ids), per_group):
+        sp = algod.suggested_params()
+        atc = AtomicTransactionComposer()
+        group = migration_certificates(algod, app_id, cert_ids[start : start + per_group], skill_ids, issuer_ids)
+        for cert_id, v1_size, certificate in group:
+            # Box I/O quota covers the v1 box being read and deleted plus the new v2 box
+            refs = math.ceil((v1_size + V2_BOX_SIZE) / BOX_IO_BYTES_PER_REFERENCE)
+            atc.add_method_call(
+                app_id=app_id,
+                method=MIGRATE_CERTIFICATE,
+                sender=sender,
+                sp=sp,
+                signer=signer,
+                method_args=[cert_id, v2_values(certificate)],
+                boxes=[(0, cert_box_key(cert_id))] * refs
+                + [
+                    (0, cert_v2_box_key(cert_id)),
+                    (0, revocation_box_key(cert_id // SHARD_BITS)),
+                    (0, recipient_index_key(certificate["recipient"])),
+                    (0, skill_info_box_key(certificate["skill_id"])),
+                    (0, issuer_box_key(certificate["issuer_id"])),
+                ],
+            )
+        add_budget_calls(atc, app_id, sender, sp, signer, budget_calls(len(group), MIGRATE_OPCODES))
+        atc.execute(algod, wait_rounds)
+        migrated += len(group)
+    return migrated
+
+
+def measure(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    record: Record,
+    v1_id: int,
+    v2_id: int,
+    skill_ids: Mapping[str, int],
+    issuer_ids: Mapping[str, int],
+) -> dict[str, Any]:
+    """
+    Simulate the opcode cost of minting record in each layout and of reading an
+    existing certificate of each (v1_id / v2_id). Nothing is committed.
+    """
+    sp = algod.suggested_params()
+    next_id = certificate_count(algod, app_id)
+    certificate = to_v2(record, skill_ids, issuer_ids)
+
+    def cost(method: Any, args: list[Any], boxes: list[bytes]) -> int:
+        atc = AtomicTransactionComposer()
+        atc.add_method_call(
+            app_id=app_id,
+            method=method,
+            sender=sender,
+            sp=sp,
+            signer=signer,
+            method_args=args,
+            boxes=[(0, box) for box in boxes],
+        )
+        return int(_simulate(algod, atc)["app-budget-consumed"])
+
+    def shard(cert_id: int) -> bytes:
+        return revocation_box_key(cert_id // SHARD_BITS)
+
+    return {
+        "mint": {
+            "v1": cost(
+                MINT_CERTIFICATE,
+                record_values(record),
+                [cert_box_key(next_id), *shared_boxes([record], skill_ids)],
+            ),
+            "v2": cost(
+                MINT_CERTIFICATE_V2,
+                [v2_values(certificate)],
+                [
+                    cert_v2_box_key(next_id),
+                    recipient_index_key(certificate["recipient"]),
+                    skill_info_box_key(certificate["skill_id"]),
+                ],
+            ),
+        },
+        "read": {
+            "v1": cost(GET_CERTIFICATE, [v1_id], [cert_box_key(v1_id), shard(v1_id)]),
+            "v2": cost(GET_CERTIFICATE_V2, [v2_id], [cert_v2_box_key(v2_id), shard(v2_id)]),
+        },
+        "boxes": compare_boxes([record]),
+    }
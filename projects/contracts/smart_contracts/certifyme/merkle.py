@@ -0,0 +1,236 @@
+"""
+Merkle cohort issuance for CertifyMe.
+
+A cohort of v2 certificates is issued by committing one Merkle root
+(commit_cohort_root) instead of writing a box per certificate. Each certificate
+keeps a reserved ID; its leaf is sha256(0x00 || cert_id || CertificateV2) and
+internal nodes are sha256(0x01 || left || right), with a node lacking a sibling
+promoted unchanged, exactly as verify_certificate_proof recomputes them.
+
+The root reserves the IDs and issues the whole cohort in one transaction. Leaves are
+issued lazily: verify_certificate_proof applies the mint checks to a leaf when it is
+presented, so holders get their record and proof off-chain (with the certificate
+metadata) and anyone can check them locally with verify_proof or on-chain through
+simulate. A leaf is only written on-chain when it is claimed (issue_leaves, by the
+admin or the recipient): that marks its ID issued for verify_certificate and adds it
+to the recipient's index.
+"""
+
+import hashlib
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from algosdk import encoding
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, EmptySigner, TransactionSigner
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.certifyme.abi import (
+    COMMIT_COHORT_ROOT,
+    ISSUE_COHORT_CERTIFICATE,
+    MERKLE_LEAF_TYPE,
+    VERIFY_CERTIFICATE_PROOF,
+    cohort_issued_box_key,
+    recipient_index_key,
+    root_box_key,
+    skill_info_box_key,
+    v2_values,
+)
+from smart_contracts.certifyme.batching import (
+    BOX_BYTE_MBR,
+    BOX_FLAT_MBR,
+    add_budget_calls,
+    budget_calls,
+    calls_per_group,
+    certificate_count,
+    global_uint,
+)
+from smart_contracts.certifyme.revocation import SHARD_BITS
+from smart_contracts.certifyme.verification import _simulate_returns
+
+LEAF_TAG = b"\x00"
+NODE_TAG = b"\x01"
+# Root box: uint64 key, CohortRoot value (32-byte root + four uint64s)
+ROOT_BOX_MBR = BOX_FLAT_MBR + BOX_BYTE_MBR * (len(root_box_key(0)) + 32 + 4 * 8)
+# Opcode cost of issue_cohort_certificate: fixed part and per proof level, counted
+# from the compiled TEAL (with headroom)
+ISSUE_BASE_OPCODES = 350
+ISSUE_OPCODES_PER_LEVEL = 80
+
+
+def leaf_hash(cert_id: int, certificate: Mapping[str, Any]) -> bytes:
+    """Leaf of a v2 certificate (dict keyed by abi.V2_FIELDS) issued as cert_id."""
+    return hashlib.sha256(LEAF_TAG + bytes(MERKLE_LEAF_TYPE.encode([cert_id, v2_values(certificate)]))).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_TAG + left + right).digest()
+
+
+class MerkleTree:
+    """All levels of a cohort tree, leaves first."""
+
+    def __init__(self, leaves: Sequence[bytes]) -> None:
+        if not leaves:
+            raise ValueError("A cohort needs at least one certificate")
+        self.levels = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def proof(self, position: int) -> list[bytes]:
+        """Sibling hashes from leaf position up to the root (promoted levels contribute none)."""
+        siblings = []
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                siblings.append(level[sibling])
+            position //= 2
+        return siblings
+
+
+def verify_proof(
+    root: bytes, first_id: int, leaf_count: int, cert_id: int, leaf: bytes, proof: Sequence[bytes]
+) -> bool:
+    """Off-chain twin of verify_certificate_proof (without the revocation check)."""
+    if not first_id <= cert_id < first_id + leaf_count:
+        return False
+    node, position, width, used = leaf, cert_id - first_id, leaf_count, 0
+    while width > 1:
+        if position % 2 == 1 or position + 1 < width:
+            if used >= len(proof):
+                return False
+            node = node_hash(proof[used], node) if position % 2 == 1 else node_hash(node, proof[used])
+            used += 1
+        position //= 2
+        width = (width + 1) // 2
+    return used == len(proof) and node == root
+
+
+class Cohort:
+    """A cohort's certificates with their reserved IDs, tree and proofs."""
+
+    def __init__(self, certificates: Sequence[Mapping[str, Any]], first_id: int) -> None:
+        self.certificates = list(certificates)
+        self.first_id = first_id
+        self.tree = MerkleTree([leaf_hash(first_id + i, cert) for i, cert in enumerate(self.certificates)])
+
+    @property
+    def root(self) -> bytes:
+        return self.tree.root
+
+    def proof(self, cert_id: int) -> list[bytes]:
+        return self.tree.proof(cert_id - self.first_id)
+
+    def verify(self, cert_id: int) -> bool:
+        position = cert_id - self.first_id
+        leaf = self.tree.levels[0][position]
+        return verify_proof(self.root, self.first_id, len(self.certificates), cert_id, leaf, self.proof(cert_id))
+
+
+def issue_cohort(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    certificates: Sequence[Mapping[str, Any]],
+    wait_rounds: int = 4,
+) -> tuple[int, Cohort]:
+    """
+    Issue certificates under one Merkle root: a single commit_cohort_root transaction,
+    whatever the cohort size. IDs start at the current certificate count; the contract
+    rejects the commit if another mint got there first (rebuild and retry). The app
+    account must hold ROOT_BOX_MBR, plus for leaves claimed later the recipient index
+    growth (8 bytes each) and a claimed-leaves bitmap shard per SHARD_BITS IDs.
+    Returns the root ID and the cohort (for handing out proofs).
+    """
+    cohort = Cohort(certificates, certificate_count(algod, app_id))
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=COMMIT_COHORT_ROOT,
+        sender=sender,
+        sp=algod.suggested_params(),
+        signer=signer,
+        method_args=[cohort.root, cohort.first_id, len(cohort.certificates)],
+        boxes=[(0, root_box_key(global_uint(algod, app_id, "root_count")))],
+    )
+    result = atc.execute(algod, wait_rounds)
+    return int(result.abi_results[0].return_value), cohort
+
+
+def issue_opcodes(cohort: Cohort) -> int:
+    """Opcode budget one issue_cohort_certificate call into the cohort may use."""
+    return ISSUE_BASE_OPCODES + ISSUE_OPCODES_PER_LEVEL * (len(cohort.tree.levels) - 1)
+
+
+def leaves_per_group(cohort: Cohort) -> int:
+    """issue_cohort_certificate calls per group, leaving room for their budget calls."""
+    return calls_per_group(issue_opcodes(cohort))
+
+
+def issue_leaves(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    root_id: int,
+    cohort: Cohort,
+    cert_ids: Sequence[int],
+    wait_rounds: int = 4,
+) -> None:
+    """
+    Claim cohort leaves on-chain with issue_cohort_certificate (sender is the admin or,
+    for its own certificates, the recipient). Optional: unclaimed leaves already verify
+    by proof; claiming is for ID-only verification and the recipient index. Packs
+    leaves_per_group per group, topped up with get_certificate_count budget calls.
+    """
+    opcodes = issue_opcodes(cohort)
+    per_group = leaves_per_group(cohort)
+    sp = algod.suggested_params()
+    for group_start in range(0, len(cert_ids), per_group):
+        claims = cert_ids[group_start : group_start + per_group]
+        atc = AtomicTransactionComposer()
+        for cert_id in claims:
+            certificate = cohort.certificates[cert_id - cohort.first_id]
+            atc.add_method_call(
+                app_id=app_id,
+                method=ISSUE_COHORT_CERTIFICATE,
+                sender=sender,
+                sp=sp,
+                signer=signer,
+                method_args=[root_id, cert_id, v2_values(certificate), cohort.proof(cert_id)],
+                boxes=[
+                    (0, root_box_key(root_id)),
+                    (0, cohort_issued_box_key(cert_id // SHARD_BITS)),
+                    (0, skill_info_box_key(int(certificate["skill_id"]))),
+                    (0, recipient_index_key(encoding.decode_address(certificate["recipient"]))),
+                ],
+            )
+        add_budget_calls(atc, app_id, sender, sp, signer, budget_calls(len(claims), opcodes))
+        atc.execute(algod, wait_rounds)
+
+
+def verify_onchain(algod: AlgodClient, app_id: int, sender: str, root_id: int, cohort: Cohort, cert_id: int) -> bool:
+    """verify_certificate_proof through simulate (no fee, budget from simulate)."""
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=VERIFY_CERTIFICATE_PROOF,
+        sender=sender,
+        sp=algod.suggested_params(),
+        signer=EmptySigner(),
+        method_args=[
+            root_id,
+            cert_id,
+            v2_values(cohort.certificates[cert_id - cohort.first_id]),
+            cohort.proof(cert_id),
+        ],
+    )
+    return bool(_simulate_returns(algod, atc)[0])
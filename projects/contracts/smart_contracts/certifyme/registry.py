@@ -0,0 +1,39 @@
+"""
+Skill and issuer registries of a deployed CertifyMe app.
+
+Skills and issuers are interned to numeric IDs on-chain (skill_<name> -> ID,
+issid_<name> -> ID). Off-chain helpers need the name -> ID maps to build v2
+certificates and to reference the right skinfo_<id> boxes, so they are read here
+from the app's boxes.
+"""
+
+import base64
+
+from algosdk import abi
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.certifyme.abi import ISSUER_ID_BOX_PREFIX, SKILL_BOX_PREFIX
+
+_STRING = abi.ABIType.from_string("string")
+
+
+def _interned(algod: AlgodClient, app_id: int, prefix: bytes) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    boxes = algod.application_boxes(app_id)["boxes"]  # type: ignore[call-overload]
+    for entry in boxes:
+        name = base64.b64decode(entry["name"])
+        if not name.startswith(prefix):
+            continue
+        value = base64.b64decode(algod.application_box_by_name(app_id, name)["value"])  # type: ignore[call-overload]
+        ids[_STRING.decode(name[len(prefix) :])] = int.from_bytes(value, "big")
+    return ids
+
+
+def skill_ids(algod: AlgodClient, app_id: int) -> dict[str, int]:
+    """Registered skill names and their interned IDs."""
+    return _interned(algod, app_id, SKILL_BOX_PREFIX)
+
+
+def issuer_ids(algod: AlgodClient, app_id: int) -> dict[str, int]:
+    """Registered issuer names and their interned IDs."""
+    return _interned(algod, app_id, ISSUER_ID_BOX_PREFIX)
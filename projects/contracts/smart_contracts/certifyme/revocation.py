@@ -0,0 +1,140 @@
+"""
+Mass revocation for CertifyMe.
+
+Revocation state lives in a bitmap (one bit per certificate ID, MSB first) sharded
+into 1KB boxes. plan_revocations turns a list of IDs into revoke_bitmap calls, each
+OR-ing a byte-aligned mask of up to MAX_MASK_BYTES into the bitmap, so a fraud
+finding covering thousands of certificates costs one transaction per few thousand
+IDs. The bitmap can also be read straight from algod without calling the app.
+"""
+
+import base64
+from collections.abc import Iterable, Sequence
+
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionSigner
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.certifyme.abi import REVOCATION_SHARD_BYTES, REVOKE_BITMAP, revocation_box_key
+from smart_contracts.certifyme.batching import (
+    APP_CALL_OPCODE_BUDGET,
+    BOX_BYTE_MBR,
+    BOX_FLAT_MBR,
+    MAX_GROUP_SIZE,
+    MAX_REFERENCES_PER_TXN,
+)
+
+SHARD_BITS = REVOCATION_SHARD_BYTES * 8
+# revoke_bitmap ORs the mask in 64-byte chunks (the byte-math operand limit); opcode
+# cost counted from the compiled TEAL with headroom
+BITMAP_CHUNK_BYTES = 64
+BITMAP_BASE_OPCODES = 100
+BITMAP_OPCODES_PER_CHUNK = 85
+MAX_MASK_BYTES = BITMAP_CHUNK_BYTES * ((APP_CALL_OPCODE_BUDGET - BITMAP_BASE_OPCODES) // BITMAP_OPCODES_PER_CHUNK)
+
+Revocation = tuple[int, bytes]
+
+
+def shard_mbr() -> int:
+    """Minimum-balance increase (microAlgos) for one bitmap shard, created on first revocation in its range."""
+    return BOX_FLAT_MBR + BOX_BYTE_MBR * (len(revocation_box_key(0)) + REVOCATION_SHARD_BYTES)
+
+
+def mask_for(first_id: int, ids: Iterable[int]) -> bytes:
+    """Byte-aligned mask over first_id.. with the bits of ids set, trimmed after the last set byte."""
+    mask = bytearray()
+    for cert_id in ids:
+        bit = cert_id - first_id
+        if bit < 0:
+            raise ValueError(f"Certificate {cert_id} is before the mask start {first_id}")
+        if bit // 8 >= len(mask):
+            mask.extend(bytes(bit // 8 + 1 - len(mask)))
+        mask[bit // 8] |= 0x80 >> (bit % 8)
+    return bytes(mask)
+
+
+def shards(revocation: Revocation) -> list[int]:
+    """Bitmap shards a revoke_bitmap call touches (each needs a box reference)."""
+    first_id, mask = revocation
+    return list(range(first_id // SHARD_BITS, (first_id + len(mask) * 8 - 1) // SHARD_BITS + 1))
+
+
+def plan_revocations(ids: Iterable[int], max_mask_bytes: int = MAX_MASK_BYTES) -> list[Revocation]:
+    """
+    Split certificate IDs into revoke_bitmap calls (first_id, mask). Each mask starts
+    on a byte boundary at the smallest remaining ID and spans at most max_mask_bytes;
+    gaps between IDs cost zero bytes rather than extra calls.
+    """
+    revocations: list[Revocation] = []
+    window: list[int] = []
+    first_id = 0
+    for cert_id in sorted(set(ids)):
+        if window and (cert_id - first_id) // 8 >= max_mask_bytes:
+            revocations.append((first_id, mask_for(first_id, window)))
+            window = []
+        if not window:
+            first_id = cert_id - cert_id % 8
+        window.append(cert_id)
+    if window:
+        revocations.append((first_id, mask_for(first_id, window)))
+    for revocation in revocations:
+        if len(shards(revocation)) > MAX_REFERENCES_PER_TXN:
+            raise ValueError("max_mask_bytes spans more shards than one transaction can reference")
+    return revocations
+
+
+def revoke(
+    algod: AlgodClient,
+    app_id: int,
+    sender: str,
+    signer: TransactionSigner,
+    ids: Iterable[int],
+    wait_rounds: int = 4,
+) -> int:
+    """
+    Revoke ids with revoke_bitmap calls, MAX_GROUP_SIZE per atomic group. The app
+    account must hold shard_mbr() for every shard not created yet.
+    Returns the number of transactions sent.
+    """
+    revocations = plan_revocations(ids)
+    sent = 0
+    for start in range(0, len(revocations), MAX_GROUP_SIZE):
+        sp = algod.suggested_params()
+        atc = AtomicTransactionComposer()
+        for first_id, mask in revocations[start : start + MAX_GROUP_SIZE]:
+            atc.add_method_call(
+                app_id=app_id,
+                method=REVOKE_BITMAP,
+                sender=sender,
+                sp=sp,
+                signer=signer,
+                method_args=[first_id, mask],
+                boxes=[(0, revocation_box_key(shard)) for shard in shards((first_id, mask))],
+            )
+        atc.execute(algod, wait_rounds)
+        sent += atc.get_tx_count()
+    return sent
+
+
+def read_shard(algod: AlgodClient, app_id: int, shard: int) -> bytes:
+    """A bitmap shard as stored on-chain (all zeros if nothing in its range was revoked)."""
+    try:
+        box = algod.application_box_by_name(app_id, revocation_box_key(shard))
+    except AlgodHTTPError as e:
+        if e.code == 404:
+            return bytes(REVOCATION_SHARD_BYTES)
+        raise
+    return base64.b64decode(box["value"])  # type: ignore[call-overload]
+
+
+def revoked_ids(algod: AlgodClient, app_id: int, ids: Sequence[int]) -> set[int]:
+    """Which of ids are revoked, reading each bitmap shard once (no app call)."""
+    bitmaps: dict[int, bytes] = {}
+    revoked = set()
+    for cert_id in ids:
+        shard, bit = divmod(cert_id, SHARD_BITS)
+        if shard not in bitmaps:
+            bitmaps[shard] = read_shard(algod, app_id, shard)
+        if bitmaps[shard][bit // 8] & (0x80 >> (bit % 8)):
+            revoked.add(cert_id)
+    return revoked
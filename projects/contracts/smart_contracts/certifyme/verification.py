@@ -0,0 +1,165 @@
+"""
+Bulk certificate checks for CertifyMe through simulate.
+
+verify_certificates and get_certificates are read-only, so they are never sent:
+each simulate request carries a full group of calls (MAX_GROUP_SIZE transactions,
+up to MAX_IDS_PER_CALL IDs each) with unnamed resources allowed, so callers need no
+box references and pay no fees. verify_many fans an ID list out over as few
+simulate requests as possible and reports the throughput.
+"""
+
+import time
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from algosdk import encoding
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, EmptySigner
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest
+
+from smart_contracts.certifyme.abi import (
+    CERTIFICATE_DATA_TYPE,
+    CERTIFICATE_V2_TYPE,
+    GET_CERTIFICATES,
+    GET_CERTIFICATES_BY_RECIPIENT,
+    VERIFY_CERTIFICATES,
+    v1_recipient_key,
+)
+from smart_contracts.certifyme.batching import MAX_APP_ARGS_BYTES, MAX_GROUP_SIZE, certificate_count
+
+# App args: 4-byte selector + uint16 array length + 8 bytes per ID
+MAX_IDS_PER_CALL = (MAX_APP_ARGS_BYTES - 4 - 2) // 8
+# Simulate's ceiling on extra opcode budget per group; a full call checks ~255 IDs
+# at roughly 45 opcodes each
+SIMULATE_EXTRA_OPCODE_BUDGET = 320_000
+# Largest page get_certificates is asked for; it stops earlier at the return-size limit
+PAGE_SIZE = 16
+# IDs per get_certificates_by_recipient page (the contract's MAX_INDEX_PAGE)
+INDEX_PAGE_SIZE = 127
+
+
+def chunks(ids: Sequence[int], size: int) -> Iterator[Sequence[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def unpack_bits(packed: bytes, count: int) -> list[bool]:
+    """The verify_certificates result as one bool per requested ID (MSB first)."""
+    return [bool(packed[i // 8] & (0x80 >> (i % 8))) for i in range(count)]
+
+
+def _simulate_returns(algod: AlgodClient, atc: AtomicTransactionComposer) -> list[Any]:
+    request = SimulateRequest(
+        txn_groups=[],
+        allow_empty_signatures=True,
+        allow_unnamed_resources=True,
+        extra_opcode_budget=SIMULATE_EXTRA_OPCODE_BUDGET,
+    )
+    result = atc.simulate(algod, request)
+    if result.failure_message:
+        raise RuntimeError(f"Simulation failed: {result.failure_message}")
+    return [abi_result.return_value for abi_result in result.results]
+
+
+def verify_many(algod: AlgodClient, app_id: int, sender: str, ids: Sequence[int]) -> dict[str, Any]:
+    """
+    Verify every ID with verify_certificates through simulate, MAX_GROUP_SIZE calls
+    per request. sender only needs to exist (nothing is signed or sent).
+    Returns the per-ID results and throughput.
+    """
+    sp = algod.suggested_params()
+    results: dict[int, bool] = {}
+    requests = 0
+    started = time.monotonic()
+    for group in chunks(list(chunks(ids, MAX_IDS_PER_CALL)), MAX_GROUP_SIZE):
+        atc = AtomicTransactionComposer()
+        for call in group:
+            atc.add_method_call(
+                app_id=app_id,
+                method=VERIFY_CERTIFICATES,
+                sender=sender,
+                sp=sp,
+                signer=EmptySigner(),
+                method_args=[list(call)],
+            )
+        for call, packed in zip(group, _simulate_returns(algod, atc), strict=True):
+            results.update(zip(call, unpack_bits(bytes(packed), len(call)), strict=True))
+        requests += 1
+    elapsed = time.monotonic() - started
+    return {
+        "results": results,
+        "verifications": len(ids),
+        "valid": sum(results.values()),
+        "simulate_requests": requests,
+        "seconds": elapsed,
+        "verifications_per_second": len(ids) / elapsed if elapsed else 0.0,
+    }
+
+
+def decode_entry(entry: Sequence[Any]) -> dict[str, Any]:
+    """A get_certificates entry with its data decoded by layout version."""
+    cert_id, version, revoked, data = entry
+    data_type = CERTIFICATE_V2_TYPE if version == 2 else CERTIFICATE_DATA_TYPE
+    return {"cert_id": cert_id, "version": version, "revoked": revoked, "data": data_type.decode(bytes(data))}
+
+
+def iter_certificates(
+    algod: AlgodClient, app_id: int, sender: str, start: int = 0, end: int | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Page through certificates [start, end) with get_certificates via simulate,
+    following the cursor each page returns (pages over cohort IDs come back empty).
+    """
+    sp = algod.suggested_params()
+    total = certificate_count(algod, app_id)
+    end = total if end is None else min(end, total)
+    while start < end:
+        count = min(PAGE_SIZE, end - start)
+        atc = AtomicTransactionComposer()
+        atc.add_method_call(
+            app_id=app_id,
+            method=GET_CERTIFICATES,
+            sender=sender,
+            sp=sp,
+            signer=EmptySigner(),
+            method_args=[start, count],
+        )
+        cursor, page = _simulate_returns(algod, atc)[0]
+        if cursor == start:
+            raise RuntimeError(f"Certificate {start} does not fit in a get_certificates page")
+        for entry in page:
+            yield decode_entry(entry)
+        start = cursor
+
+
+def recipient_keys(address: str) -> list[bytes]:
+    """Index keys holding an address's certificates: v2 (public key) and v1 (recipient string)."""
+    return [encoding.decode_address(address), v1_recipient_key(address)]
+
+
+def certificates_of(algod: AlgodClient, app_id: int, sender: str, address: str) -> list[int]:
+    """
+    Every certificate ID issued to address, read from its index boxes via simulate
+    (one call per 127 IDs per index). Migrated certificates appear in both indexes
+    and are returned once.
+    """
+    sp = algod.suggested_params()
+    ids: set[int] = set()
+    for key in recipient_keys(address):
+        start = 0
+        while True:
+            atc = AtomicTransactionComposer()
+            atc.add_method_call(
+                app_id=app_id,
+                method=GET_CERTIFICATES_BY_RECIPIENT,
+                sender=sender,
+                sp=sp,
+                signer=EmptySigner(),
+                method_args=[key, start],
+            )
+            page = _simulate_returns(algod, atc)[0]
+            ids.update(page)
+            if len(page) < INDEX_PAGE_SIZE:
+                break
+            start += len(page)
+    return sorted(ids)
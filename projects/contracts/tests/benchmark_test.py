@@ -0,0 +1,60 @@
+import os
+import warnings
+from pathlib import Path
+
+import pytest
+from algokit_utils import AlgoAmount, AlgorandClient
+
+from smart_contracts import benchmark
+
+BASELINES = Path(__file__).parent / "benchmark_baselines.json"
+
+
+@pytest.fixture(scope="module")
+def bench(algorand_client: AlgorandClient) -> benchmark.Bench:
+    deployer = algorand_client.account.from_environment("DEPLOYER")
+    algorand_client.account.ensure_funded_from_environment(
+        account_to_fund=deployer.address, min_spending_balance=AlgoAmount.from_algo(50)
+    )
+    return benchmark.deploy(algorand_client.client.algod, deployer.address, deployer.signer)
+
+
+def test_compare_flags_growth_past_tolerance() -> None:
+    baseline = {"opcodes": 200, "box_bytes_read": 1024, "box_bytes_written": 0, "mbr_delta": 0, "fee": 1000}
+    within = {**baseline, "opcodes": 214}
+    grown = {**baseline, "opcodes": 216, "box_bytes_written": 8}
+
+    assert benchmark.compare({"a": within, "b": {**baseline, "opcodes": 150}}, {"a": baseline, "b": baseline}) == []
+    assert benchmark.compare({"a": grown, "new": baseline}, {"a": baseline}) == [
+        "a: opcodes 216 > baseline 200",
+        "a: box_bytes_written 8 > baseline 0",
+    ]
+    # A case without a baseline is reported, not failed
+    assert benchmark.unbaselined({"a": grown, "new": baseline}, {"a": baseline}) == ["new"]
+
+
+def test_every_method_has_a_case() -> None:
+    try:
+        specs = {contract: benchmark.load_spec(contract) for contract in benchmark.CONTRACTS}
+    except FileNotFoundError as e:
+        pytest.skip(str(e))
+    assert benchmark.uncovered_methods(specs) == []
+    assert len({case.key for case in benchmark.CASES}) == len(benchmark.CASES)
+
+
+def test_costs_within_baselines(request: pytest.FixtureRequest) -> None:
+    # BENCHMARK_UPDATE=1 records the current costs as the new baselines
+    update = bool(os.environ.get("BENCHMARK_UPDATE"))
+    baselines = benchmark.load_baselines(BASELINES)
+    if not baselines and not update:
+        pytest.skip(f"No recorded {BASELINES.name}; record it on LocalNet with {benchmark.UPDATE_COMMAND}")
+    bench: benchmark.Bench = request.getfixturevalue("bench")
+    results = dict(benchmark.run(bench))
+    if update:
+        benchmark.save_baselines(BASELINES, results)
+        pytest.skip(f"Baselines written to {BASELINES.name}")
+    missing = benchmark.unbaselined(results, baselines)
+    if missing:
+        warnings.warn(f"No baseline for {', '.join(missing)}; record with {benchmark.UPDATE_COMMAND}", stacklevel=1)
+    regressions = benchmark.compare(results, baselines)
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,87 @@
+import pytest
+from algosdk import abi
+
+from smart_contracts.certifyme import batching
+from smart_contracts.certifyme.abi import (
+    CERTIFICATE_DATA,
+    CERTIFICATE_DATA_TYPE,
+    cert_box_key,
+    certificate_box_size,
+    record_values,
+    skill_box_key,
+    skill_info_box_key,
+)
+
+
+def make_record(index: int, metadata_url: str = "ipfs://QmMetadata") -> dict[str, object]:
+    return {
+        "recipient": "A" * 58,
+        "skill": "Python Backend",
+        "skill_level": "Advanced",
+        "ai_score": 70 + index % 30,
+        "evidence_hash": "Qm" + "e" * 44,
+        "issuer": "CertifyMe",
+        "issue_date": "2026-10-19",
+        "metadata_url": metadata_url,
+    }
+
+
+def test_box_key_matches_boxmap_prefix() -> None:
+    assert cert_box_key(258) == b"cert_" + bytes([0, 0, 0, 0, 0, 0, 1, 2])
+
+
+def test_box_size_is_the_certificate_data_encoding() -> None:
+    record = make_record(0)
+    decoded = CERTIFICATE_DATA_TYPE.decode(CERTIFICATE_DATA_TYPE.encode([*record_values(record), False]))
+    assert decoded[-1] is False
+    assert certificate_box_size(record) == len(CERTIFICATE_DATA_TYPE.encode([*record_values(record), False]))
+
+
+def test_calls_respect_reference_and_argument_limits() -> None:
+    records = [make_record(i) for i in range(500)]
+    calls = batching.plan_calls(records)
+
+    assert [index for call in calls for index in call] == list(range(500))
+    for call in calls:
+        assert batching.call_references([records[i] for i in call]) <= batching.MAX_REFERENCES_PER_TXN
+        args = batching.BATCH_ARGS_OVERHEAD + sum(len(batching.encode_record(records[i])) + 2 for i in call)
+        assert args <= batching.MAX_APP_ARGS_BYTES
+    # ~200-byte records plus the index append and skill check: the opcode budget binds first
+    assert max(len(call) for call in calls) == 3
+
+
+def test_large_records_take_several_references() -> None:
+    record = make_record(0, metadata_url="ipfs://" + "m" * 1100)
+    assert batching.box_references(record) == 2
+
+
+def test_groups_cut_transactions_for_a_cohort() -> None:
+    records = [make_record(i) for i in range(500)]
+    groups = batching.plan_groups(records)
+
+    transactions = sum(len(group) for group in groups)
+    assert all(len(group) <= batching.MAX_GROUP_SIZE for group in groups)
+    assert transactions == 167
+    assert len(groups) == 11
+
+
+def test_distinct_recipients_and_skills_share_references() -> None:
+    records = [{**make_record(i), "recipient": f"{i:058d}"} for i in range(8)]
+
+    # 3 certificate boxes + 3 index boxes + the skill's name and info boxes
+    assert [len(call) for call in batching.plan_calls(records)] == [3, 3, 2]
+    # An unregistered skill needs only its name box
+    assert batching.call_references(records[:3], skill_ids={}) == 7
+    shared = batching.shared_boxes(records[:2], skill_ids={"Python Backend": 5})
+    assert shared[-2:] == [skill_box_key("Python Backend"), skill_info_box_key(5)]
+
+
+def test_events_share_the_log_limit() -> None:
+    record = make_record(0, metadata_url="ipfs://" + "m" * 400)
+    event_type = abi.ABIType.from_string(f"(uint64,{CERTIFICATE_DATA})")
+    assert batching.event_size(record) == 4 + len(event_type.encode([0, [*record_values(record), False]]))
+
+    # Two ~600-byte CertificateMinted events would overflow one transaction's logs
+    assert [len(call) for call in batching.plan_calls([record] * 3)] == [1, 1, 1]
+    with pytest.raises(ValueError, match="event"):
+        batching.plan_calls([make_record(0, metadata_url="ipfs://" + "m" * 1100)])
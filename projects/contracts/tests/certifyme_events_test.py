@@ -0,0 +1,61 @@
+import base64
+
+import msgpack  # type: ignore[import-untyped]
+from algosdk import abi
+
+from smart_contracts.certifyme import events
+
+APP_ID = 1001
+RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+
+def revoked_log(cert_id: int) -> bytes:
+    return events.selector("CertificateRevoked") + abi.ABIType.from_string("(uint64,uint64)").encode([cert_id, 0])
+
+
+def app_call(app_id: int, logs: list[bytes], inner: list[dict[str, object]] | None = None) -> dict[str, object]:
+    apply_data: dict[str, object] = {"lg": logs}
+    if inner:
+        apply_data["itx"] = inner
+    return {"txn": {"type": "appl", "apid": app_id}, "dt": apply_data}
+
+
+def test_selectors_follow_arc28() -> None:
+    assert events.signature("CohortCommitted") == "CohortCommitted(uint64,byte[32],uint64,uint64)"
+    selectors = {events.selector(name) for name in events.EVENT_ARGS}
+    assert len(selectors) == len(events.EVENT_ARGS)
+    assert RETURN_PREFIX not in selectors
+
+
+def test_block_events_keep_only_the_apps_logs() -> None:
+    caller = app_call(7, [revoked_log(99)], inner=[app_call(APP_ID, [revoked_log(4)])])
+    block = {
+        "block": {
+            "rnd": 512,
+            "txns": [
+                app_call(APP_ID, [revoked_log(2), RETURN_PREFIX + bytes(8), revoked_log(3)]),
+                {"txn": {"type": "pay"}},
+                caller,
+            ],
+        }
+    }
+    # Round-trip through msgpack so keys and logs come back as bytes, as from algod
+    decoded = msgpack.unpackb(msgpack.packb(block, use_bin_type=False), raw=True, strict_map_key=False)
+
+    found = events.block_events(decoded, APP_ID)
+
+    assert [(e.args["cert_id"], e.round, e.txn_index, e.log_index) for e in found] == [
+        (2, 512, 0, 0),
+        (3, 512, 0, 2),
+        (4, 512, 2, 0),
+    ]
+    assert {e.name for e in found} == {"CertificateRevoked"}
+
+
+def test_transaction_events_decode_indexer_logs() -> None:
+    log = events.selector("CertificatesRevoked") + abi.ABIType.from_string("(uint64,byte[])").encode([64, b"\xff"])
+    txn = {"confirmed-round": 9, "logs": [base64.b64encode(log).decode()]}
+
+    [event] = events.transaction_events(txn)
+
+    assert (event.name, event.round, event.args) == ("CertificatesRevoked", 9, {"first_id": 64, "mask": b"\xff"})
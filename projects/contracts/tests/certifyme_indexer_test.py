@@ -0,0 +1,148 @@
+import json
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+import msgpack  # type: ignore[import-untyped]
+import pytest
+from algosdk import abi, encoding
+
+from smart_contracts.certifyme import events, indexer
+from smart_contracts.certifyme.abi import RECORD_FIELDS
+
+APP_ID = 1001
+GENESIS = b"\x11" * 32
+ADDRESS = encoding.encode_address(bytes(range(32)))
+RECORD = {
+    "recipient": ADDRESS,
+    "skill": "Python Backend",
+    "skill_level": "Advanced",
+    "ai_score": 80,
+    "evidence_hash": "QmEvidenceHash",
+    "issuer": "CertifyMe",
+    "issue_date": "2026-10-19",
+    "metadata_url": "ipfs://QmMetadata",
+}
+
+
+def event(name: str, *values: Any) -> bytes:
+    types = ",".join(typ for _, typ in events.EVENT_ARGS[name])
+    return events.selector(name) + abi.ABIType.from_string(f"({types})").encode(list(values))
+
+
+def v2(ai_score: int) -> list[Any]:
+    return [ADDRESS, 0, 2, ai_score, 0, 1_792_368_000, b"\xee" * 32, b"\xdd" * 32, 0]
+
+
+def block(round_: int, *logs: bytes, genesis: bytes = GENESIS) -> dict[bytes, Any]:
+    """A block as events.fetch_block returns it, with one app call per log."""
+    txns = [{"txn": {"type": "appl", "apid": APP_ID}, "dt": {"lg": [log]}} for log in logs]
+    header = {"rnd": round_, "gh": genesis, "prev": round_.to_bytes(32, "big"), "txns": txns}
+    return msgpack.unpackb(msgpack.packb({"block": header}, use_bin_type=False), raw=True, strict_map_key=False)
+
+
+def history() -> list[dict[bytes, Any]]:
+    return [
+        block(
+            10,
+            event("SkillRegistered", 0, "Python Backend", 50),
+            event("IssuerRegistered", 0, "CertifyMe"),
+            event("CertificateMinted", 0, [RECORD[field] for field in RECORD_FIELDS] + [False]),
+        ),
+        block(11),
+        block(12, event("CertificateMintedV2", 1, v2(90)), event("CertificateMintedV2", 2, v2(60))),
+        block(13, event("CohortCommitted", 0, b"\x01" * 32, 3, 100), event("CertificatesRevoked", 0, b"\x20")),
+        block(14, event("CertificateMigrated", 0, v2(80)), event("CertificateRevoked", 50, 1_792_400_000)),
+        # Cohort leaf 51 claimed
+        block(15, event("CertificateMintedV2", 51, v2(75))),
+    ]
+
+
+def test_index_answers_portfolio_and_verification_queries() -> None:
+    index = indexer.CertificateIndex(":memory:", APP_ID)
+    for each in history():
+        index.apply_block(each)
+
+    assert index.certificate_count() == 103
+    # Unclaimed cohort leaves (52..102) only verify with their proof
+    assert index.verify([0, 1, 2, 50, 51, 52, 102, 103]) == [True, True, False, False, True, False, False, False]
+
+    migrated = index.certificate(0)
+    assert migrated is not None
+    assert (migrated["version"], migrated["minted_round"], migrated["skill"]) == (2, 10, "Python Backend")
+    assert (migrated["issuer"], migrated["skill_level"]) == ("CertifyMe", "Advanced")
+    # Unclaimed cohort members have no on-chain record, only their root
+    assert index.certificate(50) == {"cert_id": 50, "version": None, "root_id": 0, "root": "01" * 32, "revoked": True}
+    assert index.certificate(103) is None
+
+    portfolio = index.certificates_of(ADDRESS)
+    assert [(c["cert_id"], c["ai_score"], c["revoked"]) for c in portfolio] == [
+        (0, 80, False),
+        (1, 90, False),
+        (2, 60, True),
+        (51, 75, False),
+    ]
+
+
+def test_checkpoint_survives_restart_and_rejects_other_chains(tmp_path: Path) -> None:
+    path = tmp_path / "certifyme.sqlite"
+    blocks = history()
+    index = indexer.CertificateIndex(path, APP_ID)
+    index.apply_block(blocks[0])
+    index.apply_block(blocks[1])
+    index.close()
+
+    index = indexer.CertificateIndex(path, APP_ID)
+    checkpoint = index.checkpoint()
+    assert checkpoint is not None and checkpoint.round == 11
+    assert index.matches(blocks[1])
+    assert not index.matches(block(11, genesis=b"\x22" * 32))
+
+    with pytest.raises(ValueError, match="Expected round 12"):
+        index.apply_block(blocks[3])
+    with pytest.raises(RuntimeError, match="different network"):
+        index.apply_block(block(12, genesis=b"\x22" * 32))
+    index.apply_block(blocks[2])
+    assert index.certificate_count() == 3
+
+
+def test_catch_up_from_recorded_blocks(tmp_path: Path) -> None:
+    path = tmp_path / "blocks.msgpack"
+    # record_blocks stores algod's raw msgpack bodies one after another
+    with open(path, "wb") as out:
+        for round_ in range(1, 201):
+            log = event("CertificateMintedV2", round_, v2(70))
+            call = {"txn": {"type": "appl", "apid": APP_ID}, "dt": {"lg": [log]}}
+            body = {"block": {"rnd": round_, "gh": GENESIS, "txns": [call]}}
+            out.write(msgpack.packb(msgpack.packb(body, use_bin_type=False)))
+    index = indexer.CertificateIndex(":memory:", APP_ID)
+
+    report = indexer.benchmark(index, indexer.recorded_blocks(path))
+
+    assert (report["rounds"], report["events"]) == (200, 200)
+    assert report["rounds_per_second"] > 0
+    assert index.certificate_count() == 201
+    assert len(index.certificates_of(ADDRESS)) == 200
+
+
+def test_http_query_api(tmp_path: Path) -> None:
+    path = tmp_path / "certifyme.sqlite"
+    index = indexer.CertificateIndex(path, APP_ID)
+    for each in history():
+        index.apply_block(each)
+    server = indexer.serve(path, APP_ID, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(route: str) -> Any:
+        with urllib.request.urlopen(base + route) as response:  # noqa: S310
+            return json.load(response)
+
+    try:
+        assert get("/status") == {"round": 15, "certificate_count": 103}
+        assert get("/verify?ids=1,2") == {"1": True, "2": False}
+        assert get("/certificates/1")["ai_score"] == 90
+        assert len(get(f"/recipients/{ADDRESS}/certificates")) == 4
+    finally:
+        server.shutdown()
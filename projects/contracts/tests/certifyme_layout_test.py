@@ -0,0 +1,59 @@
+import hashlib
+
+from algosdk import account
+
+from smart_contracts.certifyme import layout
+from smart_contracts.certifyme.abi import CERTIFICATE_V2_TYPE
+
+
+def make_record(**overrides: object) -> dict[str, object]:
+    record: dict[str, object] = {
+        "recipient": account.generate_account()[1],
+        "skill": "Python Backend",
+        "skill_level": "Advanced",
+        "ai_score": 82,
+        "evidence_hash": "Qm" + "e" * 44,
+        "issuer": "CertifyMe",
+        "issue_date": "2026-10-19",
+        "metadata_url": "ipfs://QmMetadata",
+    }
+    return {**record, **overrides}
+
+
+def test_v1_record_converts_to_fixed_width_v2() -> None:
+    record = make_record(is_revoked=True)
+    certificate = layout.to_v2(record, {"Python Backend": 3}, {"CertifyMe": 0})
+
+    encoded = layout.encode_v2(certificate)
+    assert len(encoded) == layout.V2_BOX_SIZE == 111
+    decoded = CERTIFICATE_V2_TYPE.decode(encoded)
+    assert decoded[0] == record["recipient"]
+    assert decoded[1:6] == [3, 2, 82, 0, 1_792_368_000]
+    assert bytes(decoded[6]) == hashlib.sha256(b"Qm" + b"e" * 44).digest()
+    assert bytes(decoded[7]) == hashlib.sha256(b"ipfs://QmMetadata").digest()
+    assert decoded[8] == layout.FLAG_REVOKED
+
+
+def test_hex_hashes_are_stored_raw() -> None:
+    digest = hashlib.sha256(b"evidence").hexdigest()
+    assert layout.hash32(digest) == bytes.fromhex(digest)
+    assert layout.hash32("not-hex-" * 8) == hashlib.sha256(b"not-hex-" * 8).digest()
+
+
+def test_skill_levels_and_dates() -> None:
+    assert layout.skill_level_code("expert") == 3
+    assert layout.issued_at("2026-10-19T12:00:00+00:00") == 1_792_368_000 + 12 * 3600
+    try:
+        layout.skill_level_code("Guru")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown level accepted")
+
+
+def test_v2_boxes_are_smaller() -> None:
+    comparison = layout.compare_boxes([make_record(), make_record(metadata_url="ipfs://" + "m" * 120)])
+
+    assert comparison["v2"]["bytes_per_certificate"] == 111
+    assert comparison["v1"]["bytes_per_certificate"] > 2 * comparison["v2"]["bytes_per_certificate"]
+    assert comparison["mbr_released_microalgos"] > 0
@@ -0,0 +1,55 @@
+import hashlib
+
+from smart_contracts.certifyme import merkle
+
+
+def make_certificate(index: int) -> dict[str, object]:
+    return {
+        "recipient": index.to_bytes(32, "big"),
+        "skill_id": 0,
+        "skill_level": 2,
+        "ai_score": 60 + index % 40,
+        "issuer_id": 0,
+        "issued_at": 1_792_368_000,
+        "evidence_hash": hashlib.sha256(str(index).encode()).digest(),
+        "metadata_hash": hashlib.sha256(f"ipfs://{index}".encode()).digest(),
+        "flags": 0,
+    }
+
+
+def test_every_proof_verifies() -> None:
+    for size in (1, 2, 3, 7, 8, 13):
+        cohort = merkle.Cohort([make_certificate(i) for i in range(size)], first_id=40)
+        assert all(cohort.verify(40 + i) for i in range(size)), size
+
+
+def test_proofs_bind_record_and_id() -> None:
+    cohort = merkle.Cohort([make_certificate(i) for i in range(10)], first_id=100)
+    proof = cohort.proof(103)
+
+    forged = merkle.leaf_hash(103, {**make_certificate(3), "ai_score": 99})
+    assert not merkle.verify_proof(cohort.root, 100, 10, 103, forged, proof)
+    moved = merkle.leaf_hash(104, make_certificate(3))
+    assert not merkle.verify_proof(cohort.root, 100, 10, 104, moved, proof)
+    assert not merkle.verify_proof(cohort.root, 100, 10, 110, cohort.tree.levels[0][3], proof)
+
+
+def test_ten_thousand_certificates_share_one_root() -> None:
+    cohort = merkle.Cohort([make_certificate(i) for i in range(10_000)], first_id=0)
+
+    assert len(cohort.root) == 32
+    assert len(cohort.proof(9_999)) <= 14
+    assert cohort.verify(9_999) and cohort.verify(4_321)
+
+
+def test_issue_groups_pool_enough_budget() -> None:
+    for size in (1, 2, 64, 1000, 100_000):
+        cohort = merkle.Cohort([make_certificate(i % 50) for i in range(size)], first_id=0)
+        opcodes = merkle.issue_opcodes(cohort)
+        issues = merkle.leaves_per_group(cohort)
+        calls = issues + merkle.budget_calls(issues, opcodes)
+        assert calls <= 16
+        assert calls * 700 >= issues * opcodes, size
+    # 10 levels: nine claims and six budget calls per group
+    cohort = merkle.Cohort([make_certificate(i) for i in range(1000)], first_id=0)
+    assert (merkle.leaves_per_group(cohort), merkle.budget_calls(9, merkle.issue_opcodes(cohort))) == (9, 6)
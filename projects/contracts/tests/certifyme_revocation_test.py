@@ -0,0 +1,33 @@
+from smart_contracts.certifyme import revocation
+
+
+def covered(revocations: list[revocation.Revocation]) -> list[int]:
+    ids = []
+    for first_id, mask in revocations:
+        ids += [first_id + bit for bit in range(len(mask) * 8) if mask[bit // 8] & (0x80 >> (bit % 8))]
+    return ids
+
+
+def test_masks_cover_exactly_the_ids() -> None:
+    ids = [3, 4, 700, 701, 9000, 12, 3]
+    revocations = revocation.plan_revocations(ids)
+
+    assert sorted(covered(revocations)) == sorted(set(ids))
+    assert all(first_id % 8 == 0 and mask[-1] for first_id, mask in revocations)
+    # Gaps inside a window cost zero bytes, not extra calls
+    assert [first_id for first_id, _ in revocations] == [0, 9000 - 9000 % 8]
+    assert revocations[0][1] == revocation.mask_for(0, [3, 4, 12, 700, 701])
+
+
+def test_contiguous_ids_take_one_call_per_few_thousand() -> None:
+    revocations = revocation.plan_revocations(range(10_000))
+
+    assert revocation.MAX_MASK_BYTES * 8 >= 3000
+    assert len(revocations) == 3
+    assert all(len(mask) <= revocation.MAX_MASK_BYTES for _, mask in revocations)
+    assert covered(revocations) == list(range(10_000))
+
+
+def test_shards_referenced_per_call() -> None:
+    assert revocation.shards((8192 - 16, bytes(3))) == [0, 1]
+    assert revocation.shards((0, bytes(1))) == [0]
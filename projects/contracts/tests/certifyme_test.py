@@ -0,0 +1,608 @@
+import base64
+import typing
+from collections.abc import Iterator
+
+import pytest
+from algopy import Account, Bytes, UInt64, arc4
+from algopy_testing import AlgopyTestContext, algopy_testing_context
+from algosdk import encoding
+from algosdk.error import AlgodHTTPError
+
+from smart_contracts.certifyme import events, merkle, revocation
+from smart_contracts.certifyme.abi import (
+    CERTIFICATE_RECORD_TYPE,
+    CERTIFICATE_V2_TYPE,
+    RECORD_FIELDS,
+    V2_FIELDS,
+    revocation_box_key,
+    v2_values,
+)
+from smart_contracts.certifyme.contract import Bytes32, CertificateRecord, CertificateV2, CertifyMe
+from smart_contracts.certifyme.layout import encode_v2, metadata_hash, migration_certificates, to_v2
+
+ADDRESS = encoding.encode_address(bytes(range(32)))
+
+
+@pytest.fixture()
+def context() -> Iterator[AlgopyTestContext]:
+    with algopy_testing_context() as ctx:
+        yield ctx
+
+
+def make_record(ai_score: int = 80, skill: str = "Python Backend") -> CertificateRecord:
+    return CertificateRecord(
+        recipient=arc4.String("RECIPIENTADDRESS"),
+        skill=arc4.String(skill),
+        skill_level=arc4.String("Advanced"),
+        ai_score=arc4.UInt64(ai_score),
+        evidence_hash=arc4.String("QmEvidenceHash"),
+        issuer=arc4.String("CertifyMe"),
+        issue_date=arc4.String("2026-10-19"),
+        metadata_url=arc4.String("ipfs://QmMetadata"),
+    )
+
+
+def mint(contract: CertifyMe, record: CertificateRecord) -> UInt64:
+    return contract.mint_certificate(
+        record.recipient,
+        record.skill,
+        record.skill_level,
+        record.ai_score,
+        record.evidence_hash,
+        record.issuer,
+        record.issue_date,
+        record.metadata_url,
+    )
+
+
+def test_mint_and_verify(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+
+    cert_id = mint(contract, make_record())
+
+    assert cert_id == 0
+    assert contract.get_certificate_count() == 1
+    certificate = contract.get_certificate(cert_id)
+    assert certificate.skill == "Python Backend"
+    assert certificate.ai_score == 80
+    assert certificate.metadata_url == "ipfs://QmMetadata"
+    assert not certificate.is_revoked.native
+    assert contract.verify_certificate(cert_id).native
+
+
+def test_batch_mint_assigns_consecutive_ids(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    mint(contract, make_record())
+
+    first_id = contract.mint_certificates_batch(
+        arc4.DynamicArray(make_record(70, "Rust"), make_record(90, "Go"), make_record(60, "SQL"))
+    )
+
+    assert first_id == 1
+    assert contract.get_certificate_count() == 4
+    assert [contract.get_certificate(UInt64(i)).skill for i in range(1, 4)] == ["Rust", "Go", "SQL"]
+    # Stored exactly as a single mint would store it
+    single = CertifyMe()
+    single_id = mint(single, make_record(90, "Go"))
+    assert contract.get_certificate(UInt64(2)).bytes == single.get_certificate(single_id).bytes
+
+
+def test_batch_mint_rejects_low_scores(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+
+    with pytest.raises(AssertionError, match="below minimum"):
+        contract.mint_certificates_batch(arc4.DynamicArray(make_record(80), make_record(10)))
+
+
+def test_batch_mint_is_admin_only(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+
+    with context.txn.create_group(active_txn_overrides={"sender": context.any.account()}):
+        with pytest.raises(AssertionError, match="Only admin"):
+            contract.mint_certificates_batch(arc4.DynamicArray(make_record()))
+
+
+def make_v2(ai_score: int = 80, issuer_id: int = 0, level: int = 2, flags: int = 0) -> CertificateV2:
+    return CertificateV2(
+        recipient=arc4.Address(bytes(range(32))),
+        skill_id=arc4.UInt16(0),
+        skill_level=arc4.UInt8(level),
+        ai_score=arc4.UInt8(ai_score),
+        issuer_id=arc4.UInt16(issuer_id),
+        issued_at=arc4.UInt64(1_792_368_000),
+        evidence_hash=arc4.StaticArray[arc4.Byte, typing.Literal[32]].from_bytes(b"\xee" * 32),
+        metadata_hash=arc4.StaticArray[arc4.Byte, typing.Literal[32]].from_bytes(metadata_hash("ipfs://QmMetadata")),
+        flags=arc4.UInt8(flags),
+    )
+
+
+def register_v2(contract: CertifyMe) -> None:
+    """Registry entries make_v2 refers to: issuer 0 and skill 0"""
+    contract.register_issuer(arc4.String("CertifyMe"))
+    contract.register_skill(arc4.String("Python Backend"), arc4.UInt64(50))
+
+
+def test_v2_mint_verify_and_revoke(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    assert contract.register_issuer(arc4.String("CertifyMe")) == 0
+    assert contract.register_issuer(arc4.String("CertifyMe")) == 0
+    contract.register_skill(arc4.String("Python Backend"), arc4.UInt64(50))
+    mint(contract, make_record())
+
+    # (mint_certificates_batch_v2 is not exercised here: algopy_testing mis-sizes
+    # arrays of static structs)
+    first_id = contract.mint_certificate_v2(make_v2())
+    contract.mint_certificate_v2(make_v2(95))
+    cert_id = contract.mint_certificate_v2(make_v2(60))
+
+    # v1 and v2 certificates share one ID sequence
+    assert (first_id, cert_id) == (1, 3)
+    assert contract.get_certificate_v2(UInt64(2)).ai_score == 95
+    assert len(contract.get_certificate_v2(cert_id).bytes) == 111
+    assert contract.verify_certificate(cert_id).native
+
+    contract.revoke_certificate(cert_id)
+
+    assert not contract.verify_certificate(cert_id).native
+    assert contract.get_certificate_v2(cert_id).flags == 1
+    assert contract.verify_certificate(UInt64(2)).native
+
+
+def test_v2_mint_validates_fields(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+
+    with pytest.raises(AssertionError, match="Issuer not registered"):
+        contract.mint_certificate_v2(make_v2(issuer_id=1))
+    with pytest.raises(AssertionError, match="Unknown skill level"):
+        contract.mint_certificate_v2(make_v2(level=4))
+    with pytest.raises(AssertionError, match="below minimum"):
+        contract.mint_certificate_v2(make_v2(10))
+    with pytest.raises(AssertionError, match="cannot carry flags"):
+        contract.mint_certificate_v2(make_v2(flags=1))
+
+
+def addressed_record(**fields: str) -> CertificateRecord:
+    """make_record() for a real address (what migration needs), with string fields replaced"""
+    record = make_record()
+    record.recipient = arc4.String(ADDRESS)
+    for field, value in fields.items():
+        setattr(record, field, arc4.String(value))
+    return record
+
+
+def as_v2(record: CertificateRecord, **changes: object) -> CertificateV2:
+    """record converted by layout.to_v2 (register_v2's IDs), with v2 fields replaced"""
+    values = dict(zip(RECORD_FIELDS, CERTIFICATE_RECORD_TYPE.decode(record.bytes.value), strict=True))
+    certificate = {**to_v2(values, {"Python Backend": 0}, {"CertifyMe": 0}), **changes}
+    return CertificateV2.from_bytes(encode_v2(certificate))
+
+
+def test_migration_replaces_v1_box(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    record = addressed_record()
+    cert_id = mint(contract, record)
+    contract.revoke_certificate(cert_id)
+
+    with pytest.raises(AssertionError, match="Revocation flag"):
+        contract.migrate_certificate(cert_id, as_v2(record))
+    with pytest.raises(AssertionError, match="AI score"):
+        contract.migrate_certificate(cert_id, as_v2(record, ai_score=81, flags=1))
+    contract.migrate_certificate(cert_id, as_v2(record, flags=1))
+
+    assert cert_id not in contract.certificates
+    assert contract.get_certificate_v2(cert_id).flags == 1
+    assert not contract.verify_certificate(cert_id).native
+    with pytest.raises(AssertionError, match="not found"):
+        contract.migrate_certificate(cert_id, as_v2(record, flags=1))
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {},
+        {"skill_level": "advanced", "issue_date": "2026-10-19T08:30:15.250Z"},
+        {"issue_date": "2026-10-19T14:00:15+05:30", "evidence_hash": "ab" * 32},
+        {"issue_date": "2024-02-29 23:59", "evidence_hash": "0123456789ABCDEF" * 4},
+        {"issue_date": "1999-12-31T12:00-08:00", "skill_level": "Expert"},
+    ],
+)
+def test_migration_accepts_converted_fields(context: AlgopyTestContext, fields: dict[str, str]) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    record = addressed_record(**fields)
+    cert_id = mint(contract, record)
+
+    contract.migrate_certificate(cert_id, as_v2(record))
+
+    assert contract.get_certificate_v2(cert_id).bytes == as_v2(record).bytes
+
+
+@pytest.mark.parametrize(
+    "changes, error",
+    [
+        ({"recipient": bytes(32)}, "Recipient does not match"),
+        ({"recipient": bytes(range(1, 33))}, "Recipient does not match"),
+        ({"skill_level": 1}, "Skill level does not match"),
+        ({"issuer_id": 1}, "Issuer does not match"),
+        ({"issued_at": 1_792_368_001}, "Issue date does not match"),
+        ({"evidence_hash": b"\xee" * 32}, "Evidence hash does not match"),
+        ({"metadata_hash": b"\xdd" * 32}, "Metadata hash mismatch"),
+    ],
+)
+def test_migration_checks_every_field(context: AlgopyTestContext, changes: dict[str, object], error: str) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    contract.register_issuer(arc4.String("Partner Academy"))
+    record = addressed_record()
+    cert_id = mint(contract, record)
+
+    with pytest.raises(AssertionError, match=error):
+        contract.migrate_certificate(cert_id, as_v2(record, **changes))
+
+
+class EmulatorAlgod:
+    """The algod box reads layout.migration_certificates makes, served from the test ledger."""
+
+    def __init__(self, context: AlgopyTestContext, contract: CertifyMe) -> None:
+        self.context, self.contract = context, contract
+
+    def application_box_by_name(self, app_id: int, name: bytes) -> dict[str, str]:
+        if not self.context.ledger.box_exists(self.contract, name):
+            raise AlgodHTTPError("box not found", 404)
+        return {"value": base64.b64encode(self.context.ledger.get_box(self.contract, name)).decode()}
+
+
+def test_bitmap_revoked_certificate_migrates(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    record = make_record()
+    record.recipient = arc4.String(encoding.encode_address(bytes(range(32))))
+    revoked_id, active_id = (int(mint(contract, record)) for _ in range(2))
+    contract.revoke_certificate(UInt64(revoked_id))
+    # Revocation lives in the bitmap; the v1 record itself is untouched
+    assert not contract.certificates[UInt64(revoked_id)].is_revoked.native
+
+    planned = migration_certificates(
+        EmulatorAlgod(context, contract), 0, [revoked_id, active_id], {"Python Backend": 0}, {"CertifyMe": 0}
+    )
+    for cert_id, _, certificate in planned:
+        contract.migrate_certificate(UInt64(cert_id), CertificateV2.from_bytes(encode_v2(certificate)))
+
+    assert contract.get_certificate_v2(UInt64(revoked_id)).flags == 1
+    assert contract.get_certificate_v2(UInt64(active_id)).flags == 0
+    assert not contract.verify_certificate(UInt64(revoked_id)).native
+    assert contract.verify_certificate(UInt64(active_id)).native
+
+
+def test_revoke_batch_sets_bitmap_bits(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    ids = [mint(contract, make_record()) for _ in range(5)]
+
+    contract.revoke_batch(arc4.DynamicArray(arc4.UInt64(1), arc4.UInt64(3)))
+
+    assert [contract.verify_certificate(cert_id).native for cert_id in ids] == [True, False, True, False, True]
+    assert contract.get_certificate(UInt64(3)).is_revoked.native
+    assert not contract.verify_certificate(UInt64(5)).native
+    with pytest.raises(AssertionError, match="not found"):
+        contract.revoke_batch(arc4.DynamicArray(arc4.UInt64(5)))
+
+
+def bitmap_revoked(context: AlgopyTestContext, contract: CertifyMe, cert_id: int) -> bool:
+    """cert_id's bit in the revocation bitmap, read from the shard box"""
+    shard = context.ledger.get_box(contract, revocation_box_key(cert_id // revocation.SHARD_BITS))
+    bit = cert_id % revocation.SHARD_BITS
+    return bool(shard) and bool(shard[bit // 8] & (0x80 >> (bit % 8)))
+
+
+def test_revoke_batch_logs_one_event(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    contract.certificate_count = UInt64(9000)
+    # 40 IDs (more logs than one transaction allows) across the shard 0 / 1 boundary
+    ids = list(range(8295, 8100, -5))
+
+    contract.revoke_batch(arc4.DynamicArray(*(arc4.UInt64(i) for i in ids)))
+
+    assert emitted(context) == [("CertificatesRevoked", {"first_id": 8104, "mask": revocation.mask_for(8104, ids)})]
+    # The counter stands in for minted certificates, so read the bitmap itself
+    assert all(bitmap_revoked(context, contract, i) for i in ids)
+    assert not bitmap_revoked(context, contract, 8106)
+    with pytest.raises(AssertionError, match="too far apart"):
+        contract.revoke_batch(arc4.DynamicArray(arc4.UInt64(8), arc4.UInt64(8 + 1008 * 8)))
+    contract.revoke_batch(arc4.DynamicArray(arc4.UInt64(8), arc4.UInt64(7 + 1008 * 8)))
+    [(_, args)] = emitted(context)
+    assert len(args["mask"]) == 1008
+
+
+def test_revoke_bitmap_spans_shards(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    # Stand-in for 9000 minted certificates: revocation only checks the counter
+    contract.certificate_count = UInt64(9000)
+    first_id = 8192 - 16  # last two bytes of shard 0, first of shard 1
+    mask = bytes([0x80, 0x01, 0xFF])
+
+    contract.revoke_bitmap(UInt64(first_id), Bytes(mask))
+
+    window = range(first_id - 8, first_id + 32)
+    revoked = [cert_id for cert_id in window if bitmap_revoked(context, contract, cert_id)]
+    assert revoked == [first_id, first_id + 15, *range(8192, 8200)]
+
+
+def test_revoke_bitmap_rejects_unissued_ids(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    contract.certificate_count = UInt64(10)
+
+    with pytest.raises(AssertionError, match="multiple of 8"):
+        contract.revoke_bitmap(UInt64(4), Bytes(b"\x80"))
+    with pytest.raises(AssertionError, match="not found"):
+        contract.revoke_bitmap(UInt64(8), Bytes(b"\x20"))
+
+    contract.revoke_bitmap(UInt64(8), Bytes(b"\xc0"))
+    assert bitmap_revoked(context, contract, 9)
+
+
+def test_revoke_bitmap_mask_fits_one_event(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    contract.certificate_count = UInt64(20_000)
+
+    with pytest.raises(AssertionError, match="too long for one event"):
+        contract.revoke_bitmap(UInt64(0), Bytes(b"\x01" * 1009))
+    contract.revoke_bitmap(UInt64(0), Bytes(b"\x01" * 1008))
+    [(_, args)] = emitted(context)
+    assert len(args["mask"]) == 1008
+
+
+def test_verify_certificates_packs_bits(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    for _ in range(10):
+        mint(contract, make_record())
+    contract.revoke_certificate(UInt64(2))
+
+    ids = [0, 2, 9, 10, 1, 3, 4, 5, 6]
+    packed = contract.verify_certificates(arc4.DynamicArray(*(arc4.UInt64(i) for i in ids)))
+
+    assert packed == Bytes(bytes([0b10101111, 0b10000000]))
+
+
+def test_get_certificates_pages_mixed_layouts(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    for _ in range(3):
+        mint(contract, make_record())
+    for _ in range(9):
+        contract.mint_certificate_v2(make_v2())
+    contract.revoke_certificate(UInt64(4))
+
+    cursor, page = contract.get_certificates(UInt64(1), UInt64(5))
+
+    assert cursor == 6
+    assert [entry.cert_id.native for entry in page] == [1, 2, 3, 4, 5]
+    assert [entry.version.native for entry in page] == [1, 1, 2, 2, 2]
+    assert [entry.revoked.native for entry in page] == [False, False, False, True, False]
+    assert page[2].data.bytes[2:] == contract.get_certificate_v2(UInt64(3)).bytes
+    # Capped by the return log size (cursor, array offset and entries), not by count
+    cursor, full = contract.get_certificates(UInt64(3), UInt64(100))
+    assert 0 < 8 + 2 + len(full.bytes) <= 1020
+    assert [entry.cert_id.native for entry in full] == list(range(3, 10))
+    assert cursor == 10
+    cursor, empty = contract.get_certificates(UInt64(12), UInt64(5))
+    assert (cursor, empty.length) == (12, 0)
+
+
+def test_recipient_index_lists_certificates(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    mint(contract, make_record())
+    mint(contract, addressed_record())
+    contract.mint_certificates_batch(arc4.DynamicArray(make_record(), make_record()))
+    contract.mint_certificate_v2(make_v2())
+
+    def by_recipient(key: bytes, start: int = 0) -> list[int]:
+        return [cert_id.native for cert_id in contract.get_certificates_by_recipient(Bytes(key), UInt64(start))]
+
+    assert by_recipient(b"RECIPIENTADDRESS") == [0, 2, 3]
+    assert by_recipient(ADDRESS.encode()) == [1]
+    assert by_recipient(bytes(range(32))) == [4]
+    assert by_recipient(b"RECIPIENTADDRESS", 2) == [3]
+    assert by_recipient(b"NOBODY") == []
+
+    contract.migrate_certificate(UInt64(1), as_v2(addressed_record()))
+    assert by_recipient(bytes(range(32))) == [4, 1]
+
+
+def test_recipient_index_pages(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    for _ in range(130):
+        contract.mint_certificate_v2(make_v2())
+
+    first = contract.get_certificates_by_recipient(Bytes(bytes(range(32))), UInt64(0))
+    rest = contract.get_certificates_by_recipient(Bytes(bytes(range(32))), first.length)
+
+    assert first.length == 127
+    assert [cert_id.native for cert_id in rest] == [127, 128, 129]
+
+
+def test_skills_are_interned(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    contract.register_skill(arc4.String("Rust"), arc4.UInt64(60))
+    contract.register_skill(arc4.String("Go"), arc4.UInt64(55))
+    contract.register_skill(arc4.String("Rust"), arc4.UInt64(70))
+
+    assert contract.get_skill_id(arc4.String("Rust")) == 0
+    assert contract.get_skill_id(arc4.String("Go")) == 1
+    assert contract.get_skill_threshold(arc4.String("Rust")) == 70
+    skill = contract.get_skill(arc4.UInt16(1))
+    assert (skill.name, skill.min_score) == ("Go", 55)
+    with pytest.raises(AssertionError, match="Skill not registered"):
+        contract.get_skill(arc4.UInt16(2))
+    with pytest.raises(AssertionError, match="out of range"):
+        contract.register_skill(arc4.String("SQL"), arc4.UInt64(101))
+
+
+def test_mint_enforces_skill_threshold(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    contract.register_skill(arc4.String("Rust"), arc4.UInt64(75))
+
+    # Unregistered skills only need the global minimum
+    mint(contract, make_record(50, "Haskell"))
+    with pytest.raises(AssertionError, match="below skill threshold"):
+        mint(contract, make_record(70, "Rust"))
+    with pytest.raises(AssertionError, match="below skill threshold"):
+        contract.mint_certificates_batch(arc4.DynamicArray(make_record(80, "Rust"), make_record(74, "Rust")))
+    mint(contract, make_record(75, "Rust"))
+
+    rust = make_v2(70)
+    rust.skill_id = arc4.UInt16(1)
+    with pytest.raises(AssertionError, match="below skill threshold"):
+        contract.mint_certificate_v2(rust)
+    rust.skill_id = arc4.UInt16(2)
+    with pytest.raises(AssertionError, match="Skill not registered"):
+        contract.mint_certificate_v2(rust)
+
+
+def cohort_of(contract: CertifyMe, *certs: CertificateV2) -> tuple[UInt64, merkle.Cohort]:
+    """Commit certs as a cohort starting at the next ID"""
+    certificates = [dict(zip(V2_FIELDS, CERTIFICATE_V2_TYPE.decode(cert.bytes.value))) for cert in certs]
+    cohort = merkle.Cohort(certificates, first_id=int(contract.get_certificate_count()))
+    root_id = contract.commit_cohort_root(
+        Bytes32.from_bytes(cohort.root), UInt64(cohort.first_id), UInt64(len(certificates))
+    )
+    return root_id, cohort
+
+
+def leaf(cohort: merkle.Cohort, cert_id: int) -> tuple[CertificateV2, arc4.DynamicArray[Bytes32]]:
+    values = v2_values(cohort.certificates[cert_id - cohort.first_id])
+    cert = CertificateV2.from_bytes(CERTIFICATE_V2_TYPE.encode(values))
+    return cert, arc4.DynamicArray[Bytes32](*(Bytes32.from_bytes(node) for node in cohort.proof(cert_id)))
+
+
+def test_cohort_root_issuance(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    mint(contract, make_record())
+    certificates = [dict(zip(V2_FIELDS, CERTIFICATE_V2_TYPE.decode(make_v2(60 + i).bytes.value))) for i in range(11)]
+    cohort = merkle.Cohort(certificates, first_id=1)
+
+    with pytest.raises(AssertionError, match="IDs moved"):
+        contract.commit_cohort_root(Bytes32.from_bytes(cohort.root), UInt64(0), UInt64(11))
+    root_id = contract.commit_cohort_root(Bytes32.from_bytes(cohort.root), UInt64(1), UInt64(11))
+
+    assert root_id == 0
+    assert contract.get_certificate_count() == 12
+
+    def verify(cert_id: int, proof: list[bytes]) -> bool:
+        cert, _ = leaf(cohort, cert_id)
+        nodes = arc4.DynamicArray[Bytes32](*(Bytes32.from_bytes(node) for node in proof))
+        return contract.verify_certificate_proof(root_id, UInt64(cert_id), cert, nodes).native
+
+    def claim(cert_id: int, proof_of: int | None = None) -> UInt64:
+        cert, _ = leaf(cohort, cert_id)
+        _, proof = leaf(cohort, cert_id if proof_of is None else proof_of)
+        return contract.issue_cohort_certificate(root_id, UInt64(cert_id), cert, proof)
+
+    # The commit issues every leaf: each verifies by proof before anything else is sent
+    assert all(verify(cert_id, cohort.proof(cert_id)) for cert_id in range(1, 12))
+    assert not verify(5, cohort.proof(6))
+    # ID-only verification knows a cohort leaf once it is claimed
+    assert not contract.verify_certificate(UInt64(6)).native
+    assert contract.verify_certificates(arc4.DynamicArray(*(arc4.UInt64(i) for i in range(8)))) == b"\x80"
+
+    with pytest.raises(AssertionError, match="Invalid cohort proof"):
+        claim(6, proof_of=7)
+    with pytest.raises(AssertionError, match="not in cohort"):
+        contract.issue_cohort_certificate(root_id, UInt64(12), *leaf(cohort, 11))
+    stranger = context.any.account()
+    with context.txn.create_group(active_txn_overrides={"sender": stranger}):
+        with pytest.raises(AssertionError, match="Only admin or the recipient"):
+            claim(6)
+    # Leaves are claimed in any order, by the admin or their recipient
+    assert claim(9) == 9
+    with context.txn.create_group(active_txn_overrides={"sender": Account(ADDRESS)}):
+        assert claim(6) == 6
+    [(name, args)] = emitted(context)
+    assert (name, args["cert_id"], args["certificate"]["ai_score"]) == ("CertificateMintedV2", 6, 65)
+    with pytest.raises(AssertionError, match="already issued"):
+        claim(6)
+    assert contract.get_cohort_root(root_id).issued == 2
+
+    assert contract.verify_certificate(UInt64(6)).native
+    assert not contract.verify_certificate(UInt64(7)).native
+    contract.revoke_certificate(UInt64(5))
+    assert not verify(5, cohort.proof(5))
+    contract.revoke_certificate(UInt64(9))
+    assert not contract.verify_certificate(UInt64(9)).native
+    recipient = Bytes(bytes(range(32)))
+    assert [i.native for i in contract.get_certificates_by_recipient(recipient, UInt64(0))] == [9, 6]
+
+
+@pytest.mark.parametrize(
+    "cert, error",
+    [
+        (make_v2(40), "below minimum threshold"),
+        (make_v2(48), "below skill threshold"),
+        (make_v2(80, issuer_id=5), "Issuer not registered"),
+        (make_v2(80, level=7), "Unknown skill level"),
+        (make_v2(80, flags=1), "cannot carry flags"),
+    ],
+)
+def test_cohort_leaves_pass_the_mint_checks(context: AlgopyTestContext, cert: CertificateV2, error: str) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    root_id, cohort = cohort_of(contract, cert)
+
+    with pytest.raises(AssertionError, match=error):
+        contract.issue_cohort_certificate(root_id, UInt64(0), *leaf(cohort, 0))
+    assert not contract.verify_certificate_proof(root_id, UInt64(0), *leaf(cohort, 0)).native
+    assert not contract.verify_certificate(UInt64(0)).native
+
+
+def test_get_certificates_cursor_passes_cohorts(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    register_v2(contract)
+    contract.mint_certificate_v2(make_v2())
+    cohort_of(contract, *(make_v2(60 + i) for i in range(20)))
+    contract.mint_certificate_v2(make_v2(90))
+
+    # A page entirely inside the cohort is empty but still moves the cursor on
+    cursor, page = contract.get_certificates(UInt64(1), UInt64(16))
+    assert (cursor, page.length) == (17, 0)
+    cursor, page = contract.get_certificates(cursor, UInt64(16))
+    assert cursor == 22
+    assert [entry.cert_id.native for entry in page] == [21]
+
+
+def emitted(context: AlgopyTestContext) -> list[tuple[str, dict[str, object]]]:
+    txn = context.txn.last_active
+    logs = [txn.logs(i) for i in range(txn.num_logs)]
+    return [(event.name, event.args) for event in events.decode_logs(logs)]
+
+
+def test_state_changes_emit_events(context: AlgopyTestContext) -> None:
+    contract = CertifyMe()
+    contract.register_issuer(arc4.String("CertifyMe"))
+    assert emitted(context) == [("IssuerRegistered", {"issuer_id": 0, "name": "CertifyMe"})]
+    contract.register_skill(arc4.String("Python Backend"), arc4.UInt64(50))
+    assert emitted(context) == [("SkillRegistered", {"skill_id": 0, "name": "Python Backend", "min_score": 50})]
+
+    mint(contract, make_record())
+    [(name, args)] = emitted(context)
+    assert (name, args["cert_id"]) == ("CertificateMinted", 0)
+    assert args["certificate"]["metadata_url"] == "ipfs://QmMetadata"
+    assert args["certificate"]["is_revoked"] is False
+
+    contract.mint_certificate_v2(make_v2(95))
+    [(name, args)] = emitted(context)
+    assert (name, args["cert_id"], args["certificate"]["ai_score"]) == ("CertificateMintedV2", 1, 95)
+    assert args["certificate"]["evidence_hash"] == b"\xee" * 32
+
+    contract.revoke_batch(arc4.DynamicArray(arc4.UInt64(1), arc4.UInt64(0)))
+    assert emitted(context) == [("CertificatesRevoked", {"first_id": 0, "mask": b"\xc0"})]
+
+    contract.revoke_bitmap(UInt64(0), Bytes(b"\xc0"))
+    assert emitted(context) == [("CertificatesRevoked", {"first_id": 0, "mask": b"\xc0"})]
+
+    contract.update_min_score(UInt64(70))
+    assert emitted(context) == [("MinScoreUpdated", {"old_score": 45, "new_score": 70})]
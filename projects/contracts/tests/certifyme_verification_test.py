@@ -0,0 +1,48 @@
+import hashlib
+
+from algosdk import account, encoding
+
+from smart_contracts.certifyme import verification
+from smart_contracts.certifyme.abi import VERIFY_CERTIFICATES, v1_recipient_key
+
+
+def test_full_call_fits_app_args() -> None:
+    ids = list(range(verification.MAX_IDS_PER_CALL))
+    encoded = VERIFY_CERTIFICATES.args[0].type.encode(ids)
+
+    assert len(VERIFY_CERTIFICATES.get_selector()) + len(encoded) <= 2048
+    assert verification.MAX_IDS_PER_CALL == 255
+
+
+def test_fan_out_uses_full_groups() -> None:
+    ids = list(range(10_000))
+    calls = list(verification.chunks(ids, verification.MAX_IDS_PER_CALL))
+    groups = list(verification.chunks(calls, 16))
+
+    assert len(calls) == 40
+    assert len(groups) == 3
+    assert [i for call in calls for i in call] == ids
+
+
+def test_unpack_bits() -> None:
+    assert verification.unpack_bits(bytes([0b10100000, 0b10000000]), 9) == [
+        True,
+        False,
+        True,
+        False,
+        False,
+        False,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_recipient_keys_cover_both_layouts() -> None:
+    _, address = account.generate_account()
+
+    v2_key, v1_key = verification.recipient_keys(address)
+
+    assert v2_key == encoding.decode_address(address)
+    assert v1_key == address.encode()
+    assert v1_recipient_key("x" * 61) == hashlib.sha256(b"x" * 61).digest()
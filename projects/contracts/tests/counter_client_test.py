@@ -36,20 +36,15 @@ def counter_client(
     return client
 
 
-def test_says_hello(counter_client: CounterClient) -> None:
-    result = counter_client.send.hello(args=("World",))
-    assert result.abi_return == "Hello, World"
+def test_incr_counter(counter_client: CounterClient) -> None:
+    before = counter_client.send.incr_counter().abi_return
+    after = counter_client.send.incr_counter().abi_return
+    assert after == before + 1
 
 
-def test_simulate_says_hello_with_correct_budget_consumed(
+def test_simulate_incr_counter_with_correct_budget_consumed(
     counter_client: CounterClient,
 ) -> None:
-    result = (
-        counter_client.new_group()
-        .hello(args=("World",))
-        .hello(args=("Jane",))
-        .simulate()
-    )
-    assert result.returns[0].value == "Hello, World"
-    assert result.returns[1].value == "Hello, Jane"
+    result = counter_client.new_group().incr_counter().incr_counter().simulate()
+    assert result.returns[1].value == result.returns[0].value + 1
     assert result.simulate_response["txn-groups"][0]["app-budget-consumed"] < 100
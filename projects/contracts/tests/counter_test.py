@@ -12,13 +12,14 @@ def context() -> Iterator[AlgopyTestContext]:
         yield ctx
 
 
-def test_hello(context: AlgopyTestContext) -> None:
+def test_incr_counter(context: AlgopyTestContext) -> None:
     # Arrange
-    dummy_input = context.any.string(length=10)
     contract = Counter()
 
     # Act
-    output = contract.hello(dummy_input)
+    first = contract.incr_counter()
+    second = contract.incr_counter()
 
     # Assert
-    assert output == f"Hello, {dummy_input}"
+    assert (first, second) == (1, 2)
+    assert contract.count == 2